@@ -5,22 +5,31 @@ Design goals:
 - Efficient scanning via `os.scandir()`
 - Deterministic ordering for readable output and exact cache resume points
 - Atomic `/tmp` cache checkpoints that survive normal interruption signals
+- Append-only checkpoint journal so each checkpoint costs only its delta
 - Clear CLI help and robust error handling
 """
 
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import hashlib
 import json
 import os
 import signal
+import sqlite3
 import sys
 import time
+import uuid
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation, ROUND_CEILING, ROUND_FLOOR
 from pathlib import Path
-from typing import Iterable, Sequence
+from typing import Iterable, Sequence, TextIO
+
+try:
+    import video_library
+except ImportError:
+    video_library = None
 
 
 DEFAULT_EXTENSIONS = (
@@ -38,9 +47,12 @@ DEFAULT_EXTENSIONS = (
     "m2ts",
 )
 CHECKPOINT_ENTRY_INTERVAL = 250
-CACHE_VERSION = 1
+CACHE_VERSION = 4
 CACHE_DIR = Path("/tmp")
 CACHE_PREFIX = "find_largest_videos_cache"
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_COMPACT_MIN_BYTES = 4 * 1024 * 1024
+PARALLEL_POLL_SECONDS = 0.2
 DECIMAL_BYTES_PER_MIB = Decimal("1048576")
 
 
@@ -108,6 +120,19 @@ def parse_size_mb(value: str) -> Decimal:
     return size_mb
 
 
+def parse_jobs(value: str) -> int:
+    """Parse a positive worker count."""
+    try:
+        jobs = int(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("jobs must be a positive integer, for example: 8") from exc
+
+    if jobs < 1:
+        raise argparse.ArgumentTypeError("jobs must be a positive integer, for example: 8")
+
+    return jobs
+
+
 def format_decimal(value: Decimal) -> str:
     """Format a Decimal without scientific notation or trailing zero noise."""
     rendered = format(value, "f")
@@ -197,15 +222,25 @@ def build_initial_state(config: dict[str, object]) -> dict[str, object]:
         "config": config,
         "pending_dirs": [config["root_dir"]],
         "current_dir": None,
+        "in_flight": [],
         "directories_scanned": 0,
+        "directories_reused": 0,
         "files_seen": 0,
         "matches": {},
+        "dir_index": {},
         "warnings": [],
+        "journal_id": uuid.uuid4().hex,
+        "journal_seq": 0,
         "created_at": now,
         "updated_at": now,
     }
 
 
+def journal_path_for_cache(cache_path: Path) -> Path:
+    """Return the append-only journal path that accompanies a cache snapshot."""
+    return cache_path.with_suffix(JOURNAL_SUFFIX)
+
+
 def write_cache_atomic(cache_path: Path, state: dict[str, object]) -> None:
     """Atomically write the cache so interruption never leaves a partial JSON file."""
     state["updated_at"] = time.time()
@@ -219,8 +254,105 @@ def write_cache_atomic(cache_path: Path, state: dict[str, object]) -> None:
     os.replace(temp_path, cache_path)
 
 
+def apply_journal_record(state: dict[str, object], record: dict[str, object]) -> None:
+    """Apply one journal delta to a state loaded from the snapshot.
+
+    Pops are applied before pushes because a directory is always popped and
+    checkpointed before any of its subdirectories are queued.
+    """
+    pending_dirs = state["pending_dirs"]
+    matches = state["matches"]
+    warnings = state["warnings"]
+    if not isinstance(pending_dirs, list) or not isinstance(warnings, list):
+        raise ValueError("cache state contains invalid collections")
+    if not isinstance(matches, dict):
+        raise ValueError("cache state 'matches' must be a dict")
+
+    for directory_string in record.get("pop", ()):
+        if not pending_dirs or pending_dirs[-1] != directory_string:
+            raise ValueError(
+                f"journal pop of {directory_string!r} does not match pending directories"
+            )
+        pending_dirs.pop()
+
+    if "current_dir" in record:
+        state["current_dir"] = record["current_dir"]
+
+    pending_dirs.extend(record.get("push", ()))
+    matches.update(record.get("matches", {}))
+    dir_index = state["dir_index"]
+    if not isinstance(dir_index, dict):
+        raise ValueError("cache state 'dir_index' must be a dict")
+    dir_index.update(record.get("dirs", {}))
+    warnings.extend(record.get("warnings", ()))
+    if "in_flight" in record:
+        state["in_flight"] = record["in_flight"]
+
+    if "next_index" in record:
+        current_dir = state["current_dir"]
+        if not isinstance(current_dir, dict):
+            raise ValueError("journal advances a directory that is not in progress")
+        current_dir["next_index"] = record["next_index"]
+
+    for key in (
+        "files_seen",
+        "directories_scanned",
+        "directories_reused",
+        "status",
+        "updated_at",
+    ):
+        state[key] = record[key]
+
+    if "interrupted_by" in record:
+        state["interrupted_by"] = record["interrupted_by"]
+    else:
+        state.pop("interrupted_by", None)
+
+    state["journal_seq"] = record["seq"]
+
+
+def replay_journal(state: dict[str, object], journal_path: Path) -> int:
+    """Replay journal records newer than the snapshot and return how many applied.
+
+    A journal whose header names a different snapshot is ignored, and replay
+    stops at the first torn or out-of-sequence line left by a hard crash.
+    """
+    try:
+        handle = journal_path.open("r", encoding="utf-8")
+    except FileNotFoundError:
+        return 0
+
+    applied = 0
+    with handle:
+        try:
+            header = json.loads(handle.readline())
+        except json.JSONDecodeError:
+            return 0
+        if not isinstance(header, dict) or header.get("journal_id") != state.get("journal_id"):
+            return 0
+
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if not isinstance(record, dict) or not isinstance(record.get("seq"), int):
+                break
+
+            expected_seq = int(state["journal_seq"]) + 1
+            if record["seq"] < expected_seq:
+                continue
+            if record["seq"] != expected_seq:
+                break
+
+            apply_journal_record(state, record)
+            applied += 1
+
+    return applied
+
+
 def load_cache(cache_path: Path) -> dict[str, object]:
-    """Load and validate a cache file."""
+    """Load and validate a cache snapshot, then replay its journal."""
     with cache_path.open("r", encoding="utf-8") as handle:
         state = json.load(handle)
 
@@ -229,38 +361,195 @@ def load_cache(cache_path: Path) -> dict[str, object]:
             f"unsupported cache version {state.get('version')!r}; expected {CACHE_VERSION}"
         )
 
+    replay_journal(state, journal_path_for_cache(cache_path))
     return state
 
 
-def list_directory_entries(directory: Path, warnings: list[str]) -> list[dict[str, str]]:
-    """Snapshot a directory into a deterministic list of file and directory entries."""
-    entries: list[dict[str, str]] = []
+def list_directory_entries(
+    directory: Path,
+    warnings: list[str],
+    filters: ScanFilters,
+) -> list[dict[str, object]]:
+    """Snapshot a directory into a deterministic list of file and directory entries.
+
+    Candidate videos also carry the size and mtime from the scandir entry's
+    stat, so matching and resuming never stat the file a second time.
+    """
+    entries: list[dict[str, object]] = []
 
     with os.scandir(directory) as scan_entries:
         for entry in scan_entries:
             try:
                 if entry.is_dir(follow_symlinks=False):
-                    kind = "dir"
-                elif entry.is_file(follow_symlinks=False):
-                    kind = "file"
-                else:
+                    entries.append({"name": entry.name, "kind": "dir"})
+                    continue
+                if not entry.is_file(follow_symlinks=False):
                     continue
-                entries.append({"name": entry.name, "kind": kind})
             except OSError as exc:
                 warnings.append(f"{entry.path}: {exc.strerror or exc}")
+                continue
+
+            item: dict[str, object] = {"name": entry.name, "kind": "file"}
+            entries.append(item)
+            if not filters.is_candidate(entry.name):
+                continue
+
+            try:
+                entry_stat = entry.stat(follow_symlinks=False)
+            except OSError as exc:
+                warnings.append(f"{entry.path}: {exc.strerror or exc}")
+            else:
+                item["size"] = entry_stat.st_size
+                item["mtime_ns"] = entry_stat.st_mtime_ns
 
-    entries.sort(key=lambda item: item["name"].casefold())
+    entries.sort(key=lambda item: str(item["name"]).casefold())
     return entries
 
 
+class CheckpointJournal:
+    """Append-only log of scan-state deltas layered over the JSON snapshot.
+
+    Each checkpoint appends one compact JSON line holding only what changed
+    since the previous checkpoint. Once the journal outgrows the snapshot it
+    is folded back in by rewriting the snapshot, which keeps the amortized
+    checkpoint cost proportional to the delta rather than the whole state.
+    """
+
+    def __init__(self, cache_path: Path) -> None:
+        self.cache_path = cache_path
+        self.path = journal_path_for_cache(cache_path)
+        self.handle: TextIO | None = None
+        self.bytes_written = 0
+        self.snapshot_bytes = 0
+        self.popped_dirs: list[str] = []
+        self.pushed_dirs: list[str] = []
+        self.new_matches: dict[str, list[int]] = {}
+        self.new_directories: dict[str, dict[str, object]] = {}
+        self.warnings_logged = 0
+        self.logged_current_dir: object = None
+        self.logged_in_flight: list[str] = []
+
+    def note_pop(self, directory_string: str) -> None:
+        """Record that a directory was taken off the pending stack."""
+        self.popped_dirs.append(directory_string)
+
+    def note_push(self, directory_string: str) -> None:
+        """Record that a directory was queued on the pending stack."""
+        self.pushed_dirs.append(directory_string)
+
+    def note_match(self, path_string: str, size_bytes: int, mtime_ns: int) -> None:
+        """Record a new or updated match."""
+        self.new_matches[path_string] = [size_bytes, mtime_ns]
+
+    def note_directory(self, directory_string: str, record: dict[str, object]) -> None:
+        """Record a finished directory's refresh index entry."""
+        self.new_directories[directory_string] = record
+
+    def compaction_due(self) -> bool:
+        """Return True when the journal should be folded into the snapshot."""
+        if self.handle is None:
+            return True
+        return self.bytes_written >= max(JOURNAL_COMPACT_MIN_BYTES, self.snapshot_bytes)
+
+    def append(self, state: dict[str, object]) -> None:
+        """Append the delta accumulated since the last checkpoint."""
+        state["updated_at"] = time.time()
+        state["journal_seq"] = int(state["journal_seq"]) + 1
+        record: dict[str, object] = {
+            "seq": state["journal_seq"],
+            "status": state["status"],
+            "files_seen": state["files_seen"],
+            "directories_scanned": state["directories_scanned"],
+            "directories_reused": state["directories_reused"],
+            "updated_at": state["updated_at"],
+        }
+        if "interrupted_by" in state:
+            record["interrupted_by"] = state["interrupted_by"]
+        if self.popped_dirs:
+            record["pop"] = self.popped_dirs
+        if self.pushed_dirs:
+            record["push"] = self.pushed_dirs
+        if self.new_matches:
+            record["matches"] = self.new_matches
+        if self.new_directories:
+            record["dirs"] = self.new_directories
+
+        warnings = state["warnings"]
+        if isinstance(warnings, list) and len(warnings) > self.warnings_logged:
+            record["warnings"] = warnings[self.warnings_logged:]
+
+        in_flight = state.get("in_flight", [])
+        if in_flight != self.logged_in_flight:
+            record["in_flight"] = in_flight
+
+        current_dir = state["current_dir"]
+        if current_dir is not self.logged_current_dir:
+            record["current_dir"] = current_dir
+        elif isinstance(current_dir, dict):
+            record["next_index"] = current_dir["next_index"]
+
+        self._write_line(record)
+        self._mark_logged(state)
+
+    def compact(self, state: dict[str, object], *, final: bool = False) -> None:
+        """Rewrite the snapshot and start an empty journal.
+
+        The snapshot is replaced before the journal is truncated; records it
+        already covers are skipped on replay by their sequence number.
+        """
+        self.close()
+        write_cache_atomic(self.cache_path, state)
+        self.snapshot_bytes = self.cache_path.stat().st_size
+        self.bytes_written = 0
+
+        if final:
+            self.path.unlink(missing_ok=True)
+        else:
+            self.handle = self.path.open("w", encoding="utf-8")
+            self._write_line({"journal_id": state["journal_id"]})
+
+        self._mark_logged(state)
+
+    def discard(self) -> None:
+        """Delete the snapshot and journal for this scan configuration."""
+        self.close()
+        self.cache_path.unlink(missing_ok=True)
+        self.path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Close the journal file if it is open."""
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+    def _write_line(self, payload: dict[str, object]) -> None:
+        if self.handle is None:
+            raise RuntimeError("checkpoint journal is not open")
+        line = json.dumps(payload, separators=(",", ":")) + "\n"
+        self.handle.write(line)
+        self.handle.flush()
+        self.bytes_written += len(line)
+
+    def _mark_logged(self, state: dict[str, object]) -> None:
+        self.popped_dirs = []
+        self.pushed_dirs = []
+        self.new_matches = {}
+        self.new_directories = {}
+        warnings = state["warnings"]
+        self.warnings_logged = len(warnings) if isinstance(warnings, list) else 0
+        self.logged_current_dir = state["current_dir"]
+        self.logged_in_flight = list(state.get("in_flight", []))
+
+
 def checkpoint_state(
     state: dict[str, object],
-    cache_path: Path,
+    journal: CheckpointJournal,
     *,
     status: str | None = None,
     interrupted_by: str | None = None,
+    compact: bool = False,
 ) -> None:
-    """Persist the current scan state."""
+    """Persist the current scan state as a journal delta or a fresh snapshot."""
     if status is not None:
         state["status"] = status
 
@@ -269,7 +558,12 @@ def checkpoint_state(
     else:
         state["interrupted_by"] = interrupted_by
 
-    write_cache_atomic(cache_path, state)
+    if state["status"] == "complete":
+        journal.compact(state, final=True)
+    elif compact or journal.compaction_due():
+        journal.compact(state)
+    else:
+        journal.append(state)
 
 
 def install_stop_handlers(stop_state: StopState) -> dict[int, object]:
@@ -315,12 +609,19 @@ def within_size_bounds(
     return True
 
 
-def record_match(state: dict[str, object], path: Path, size_bytes: int) -> None:
-    """Record or update a matched file in the cache state."""
+def record_match(
+    state: dict[str, object],
+    journal: CheckpointJournal,
+    path_string: str,
+    size_bytes: int,
+    mtime_ns: int,
+) -> None:
+    """Record or update a matched file as [size, mtime_ns] in the cache state."""
     matches = state["matches"]
     if not isinstance(matches, dict):
         raise TypeError("cache state 'matches' must be a dict")
-    matches[str(path)] = size_bytes
+    matches[path_string] = [size_bytes, mtime_ns]
+    journal.note_match(path_string, size_bytes, mtime_ns)
 
 
 def sorted_matches_from_state(state: dict[str, object]) -> list[VideoMatch]:
@@ -331,32 +632,362 @@ def sorted_matches_from_state(state: dict[str, object]) -> list[VideoMatch]:
 
     result = [
         VideoMatch(path=Path(path_string), size_bytes=int(size_bytes))
-        for path_string, size_bytes in matches.items()
+        for path_string, (size_bytes, _mtime_ns) in matches.items()
     ]
     result.sort(key=lambda match: (-match.size_bytes, str(match.path).lower()))
     return result
 
 
-def run_scan(
+def library_candidates(
+    library: video_library.VideoLibrary,
+    config: dict[str, object],
+) -> list[video_library.VideoRecord]:
+    """Return indexed files under the scan root that this configuration would match."""
+    filters = ScanFilters.from_config(config)
+    return [
+        record
+        for record in library.query(
+            str(config["root_dir"]),
+            recursive=filters.recurse,
+            extensions=filters.extensions,
+        )
+        if filters.is_candidate(os.path.basename(record.path))
+        and within_size_bounds(record.size_bytes, filters.min_size_bytes, filters.max_size_bytes)
+    ]
+
+
+def sorted_matches_from_library(
+    library: video_library.VideoLibrary,
+    config: dict[str, object],
+) -> list[VideoMatch]:
+    """Answer the scan from the shared library index without touching the tree."""
+    result = [
+        VideoMatch(path=Path(record.path), size_bytes=record.size_bytes)
+        for record in library_candidates(library, config)
+    ]
+    result.sort(key=lambda match: (-match.size_bytes, str(match.path).lower()))
+    return result
+
+
+def sync_library(library: video_library.VideoLibrary, state: dict[str, object]) -> int:
+    """Record a complete scan in the shared library and return how many rows it retired.
+
+    Only rows this scan's filters would have matched can be disproved by it;
+    files other tools indexed under different rules are left alone.
+    """
+    config = state["config"]
+    matches = state["matches"]
+    if not isinstance(config, dict) or not isinstance(matches, dict):
+        raise TypeError("cache state contains invalid collections")
+
+    library.update_files(
+        (path_string, int(size_bytes), int(mtime_ns))
+        for path_string, (size_bytes, mtime_ns) in matches.items()
+    )
+    stale = [
+        record.path
+        for record in library_candidates(library, config)
+        if record.path not in matches
+    ]
+    return library.forget(stale)
+
+
+@dataclass(frozen=True, slots=True)
+class ScanFilters:
+    """Match rules unpacked once from the cache config."""
+
+    recurse: bool
+    extensions: frozenset[str]
+    exclude_text: str
+    min_size_bytes: int | None
+    max_size_bytes: int | None
+
+    @classmethod
+    def from_config(cls, config: dict[str, object]) -> ScanFilters:
+        min_size_bytes = config["min_size_bytes"]
+        max_size_bytes = config["max_size_bytes"]
+        return cls(
+            recurse=bool(config["recurse"]),
+            extensions=frozenset(str(extension) for extension in config["extensions"]),
+            exclude_text=str(config["exclude_text"]),
+            min_size_bytes=int(min_size_bytes) if min_size_bytes is not None else None,
+            max_size_bytes=int(max_size_bytes) if max_size_bytes is not None else None,
+        )
+
+    def is_candidate(self, name: str) -> bool:
+        """Return True when a filename passes the extension and exclusion rules."""
+        suffix = os.path.splitext(name)[1].lower().lstrip(".")
+        return suffix in self.extensions and not should_exclude(name, self.exclude_text)
+
+
+@dataclass(slots=True)
+class DirectoryResult:
+    """Everything learned about one directory, applied in one step."""
+
+    path: str
+    mtime_ns: int | None
+    subdirs: list[str]
+    matches: list[tuple[str, int, int]]
+    files_seen: int
+    warnings: list[str]
+    reused: bool = False
+
+
+@dataclass(slots=True)
+class ReuseIndex:
+    """Per-directory results from the last complete scan, used by --refresh."""
+
+    dirs: dict[str, dict[str, object]]
+    matches_by_dir: dict[str, list[tuple[str, int, int]]]
+
+    @classmethod
+    def from_state(cls, state: dict[str, object]) -> ReuseIndex:
+        previous = state.get("previous")
+        if not isinstance(previous, dict):
+            return cls(dirs={}, matches_by_dir={})
+
+        matches_by_dir: dict[str, list[tuple[str, int, int]]] = {}
+        for path_string, (size_bytes, mtime_ns) in previous["matches"].items():
+            parent = os.path.dirname(path_string)
+            matches_by_dir.setdefault(parent, []).append(
+                (path_string, int(size_bytes), int(mtime_ns))
+            )
+        return cls(dirs=previous["dirs"], matches_by_dir=matches_by_dir)
+
+    def lookup(self, directory_string: str, mtime_ns: int | None) -> DirectoryResult | None:
+        """Return the cached result for an unchanged directory, or None."""
+        if mtime_ns is None:
+            return None
+        record = self.dirs.get(directory_string)
+        if record is None or record["mtime_ns"] != mtime_ns:
+            return None
+
+        return DirectoryResult(
+            path=directory_string,
+            mtime_ns=mtime_ns,
+            subdirs=[os.path.join(directory_string, name) for name in record["subdirs"]],
+            matches=list(self.matches_by_dir.get(directory_string, ())),
+            files_seen=int(record["files"]),
+            warnings=[],
+            reused=True,
+        )
+
+
+def directory_mtime_ns(directory_string: str) -> int | None:
+    """Return a directory's mtime before it is listed, or None if it cannot be read.
+
+    Taking the mtime first means a change made during listing still bumps it
+    past the recorded value, so the next --refresh rescans that directory.
+    """
+    try:
+        return os.stat(directory_string).st_mtime_ns
+    except OSError:
+        return None
+
+
+def match_file_entry(
+    entry: dict[str, object],
+    filters: ScanFilters,
+) -> int | None:
+    """Return the size of a listed file that passes every filter, or None.
+
+    Candidates carry the size captured during listing, so this never stats.
+    """
+    size_bytes = entry.get("size")
+    if size_bytes is None:
+        return None
+    if not within_size_bounds(int(size_bytes), filters.min_size_bytes, filters.max_size_bytes):
+        return None
+    return int(size_bytes)
+
+
+def scan_directory(
+    directory_string: str,
+    filters: ScanFilters,
+    reuse: ReuseIndex,
+) -> DirectoryResult:
+    """Scan one whole directory without touching shared state."""
+    mtime_ns = directory_mtime_ns(directory_string)
+    reused = reuse.lookup(directory_string, mtime_ns)
+    if reused is not None:
+        return reused
+
+    directory_path = Path(directory_string)
+    result = DirectoryResult(
+        path=directory_string,
+        mtime_ns=mtime_ns,
+        subdirs=[],
+        matches=[],
+        files_seen=0,
+        warnings=[],
+    )
+
+    try:
+        entries = list_directory_entries(directory_path, result.warnings, filters)
+    except OSError as exc:
+        result.warnings.append(f"{directory_path}: {exc.strerror or exc}")
+        result.mtime_ns = None
+        return result
+
+    for entry in entries:
+        entry_path = os.path.join(directory_string, str(entry["name"]))
+        if entry["kind"] == "dir":
+            result.subdirs.append(entry_path)
+        else:
+            result.files_seen += 1
+            size_bytes = match_file_entry(entry, filters)
+            if size_bytes is not None:
+                result.matches.append((entry_path, size_bytes, int(entry["mtime_ns"])))
+
+    return result
+
+
+def record_directory(
     state: dict[str, object],
-    cache_path: Path,
+    journal: CheckpointJournal,
+    directory_string: str,
+    mtime_ns: int | None,
+    subdir_names: list[str],
+    files_seen: int,
+) -> None:
+    """Remember a finished directory so a later --refresh can reuse it."""
+    if mtime_ns is None:
+        return
+    record = {"mtime_ns": mtime_ns, "subdirs": subdir_names, "files": files_seen}
+    dir_index = state["dir_index"]
+    if not isinstance(dir_index, dict):
+        raise TypeError("cache state 'dir_index' must be a dict")
+    dir_index[directory_string] = record
+    journal.note_directory(directory_string, record)
+
+
+def apply_directory_result(
+    state: dict[str, object],
+    journal: CheckpointJournal,
+    result: DirectoryResult,
+    filters: ScanFilters,
+) -> None:
+    """Fold a finished directory into the state."""
+    pending_dirs = state["pending_dirs"]
+    warnings = state["warnings"]
+    if not isinstance(pending_dirs, list) or not isinstance(warnings, list):
+        raise TypeError("cache state contains invalid collections")
+
+    if filters.recurse:
+        for subdir in result.subdirs:
+            pending_dirs.append(subdir)
+            journal.note_push(subdir)
+    for path_string, size_bytes, mtime_ns in result.matches:
+        record_match(state, journal, path_string, size_bytes, mtime_ns)
+    warnings.extend(result.warnings)
+
+    record_directory(
+        state,
+        journal,
+        result.path,
+        result.mtime_ns,
+        [os.path.basename(subdir) for subdir in result.subdirs],
+        result.files_seen,
+    )
+    state["files_seen"] = int(state["files_seen"]) + result.files_seen
+    state["directories_scanned"] = int(state["directories_scanned"]) + 1
+    if result.reused:
+        state["directories_reused"] = int(state["directories_reused"]) + 1
+
+
+def checkpoint_interrupted(
+    state: dict[str, object],
+    journal: CheckpointJournal,
     stop_state: StopState,
 ) -> str:
-    """Run or resume the scan until completion or interruption."""
-    config = state["config"]
-    if not isinstance(config, dict):
-        raise TypeError("cache state 'config' must be a dict")
+    """Checkpoint an interrupted scan and return the final status."""
+    checkpoint_state(
+        state,
+        journal,
+        status="interrupted",
+        interrupted_by=stop_state.reason or "INTERRUPTED",
+    )
+    return "interrupted"
+
+
+def checkpoint_complete(state: dict[str, object], journal: CheckpointJournal) -> str:
+    """Drop refresh-only data and write the final snapshot."""
+    state.pop("previous", None)
+    checkpoint_state(state, journal, status="complete", interrupted_by=None)
+    return "complete"
+
+
+def scan_current_dir(
+    state: dict[str, object],
+    journal: CheckpointJournal,
+    stop_state: StopState,
+    filters: ScanFilters,
+) -> bool:
+    """Finish the serial directory snapshot in `current_dir`.
+
+    Returns False when a stop was requested part-way through.
+    """
+    pending_dirs = state["pending_dirs"]
+    current_dir = state["current_dir"]
+    if not isinstance(current_dir, dict):
+        raise TypeError("cache state 'current_dir' must be a dict or null")
+
+    directory_string = str(current_dir["path"])
+    entries = current_dir["entries"]
+    if not isinstance(entries, list):
+        raise TypeError("cache state 'current_dir.entries' must be a list")
 
-    recurse = bool(config["recurse"])
-    extensions = frozenset(str(extension) for extension in config["extensions"])
-    exclude_text = str(config["exclude_text"])
-    min_size_bytes = config["min_size_bytes"]
-    max_size_bytes = config["max_size_bytes"]
-    if min_size_bytes is not None:
-        min_size_bytes = int(min_size_bytes)
-    if max_size_bytes is not None:
-        max_size_bytes = int(max_size_bytes)
+    since_checkpoint = 0
+    while int(current_dir["next_index"]) < len(entries):
+        if stop_state.requested:
+            return False
+
+        entry = entries[int(current_dir["next_index"])]
+        if not isinstance(entry, dict):
+            raise TypeError("cache entry snapshot must be a dict")
+
+        entry_kind = str(entry["kind"])
+        entry_path = os.path.join(directory_string, str(entry["name"]))
+
+        if entry_kind == "dir":
+            if filters.recurse:
+                pending_dirs.append(entry_path)
+                journal.note_push(entry_path)
+        elif entry_kind == "file":
+            state["files_seen"] = int(state["files_seen"]) + 1
+            size_bytes = match_file_entry(entry, filters)
+            if size_bytes is not None:
+                record_match(state, journal, entry_path, size_bytes, int(entry["mtime_ns"]))
+
+        current_dir["next_index"] = int(current_dir["next_index"]) + 1
+        since_checkpoint += 1
+
+        if since_checkpoint >= CHECKPOINT_ENTRY_INTERVAL:
+            checkpoint_state(state, journal, status="in_progress")
+            since_checkpoint = 0
+
+    record_directory(
+        state,
+        journal,
+        directory_string,
+        current_dir.get("mtime_ns"),
+        [str(entry["name"]) for entry in entries if entry["kind"] == "dir"],
+        sum(1 for entry in entries if entry["kind"] == "file"),
+    )
+    state["current_dir"] = None
+    state["directories_scanned"] = int(state["directories_scanned"]) + 1
+    checkpoint_state(state, journal, status="in_progress")
+    return True
 
+
+def run_scan_serial(
+    state: dict[str, object],
+    journal: CheckpointJournal,
+    stop_state: StopState,
+    filters: ScanFilters,
+    reuse: ReuseIndex,
+) -> str:
+    """Scan one directory at a time, checkpointing inside large directories."""
     pending_dirs = state["pending_dirs"]
     warnings = state["warnings"]
     if not isinstance(pending_dirs, list) or not isinstance(warnings, list):
@@ -364,90 +995,133 @@ def run_scan(
 
     while state["current_dir"] is not None or pending_dirs:
         if stop_state.requested:
-            checkpoint_state(
-                state,
-                cache_path,
-                status="interrupted",
-                interrupted_by=stop_state.reason or "INTERRUPTED",
-            )
-            return "interrupted"
+            return checkpoint_interrupted(state, journal, stop_state)
 
         if state["current_dir"] is None:
             directory_string = pending_dirs.pop()
-            current_dir_path = Path(directory_string)
+            journal.note_pop(directory_string)
+            mtime_ns = directory_mtime_ns(directory_string)
 
+            reused = reuse.lookup(directory_string, mtime_ns)
+            if reused is not None:
+                apply_directory_result(state, journal, reused, filters)
+                checkpoint_state(state, journal, status="in_progress")
+                continue
+
+            current_dir_path = Path(directory_string)
             try:
-                entries = list_directory_entries(current_dir_path, warnings)
+                entries = list_directory_entries(current_dir_path, warnings, filters)
             except OSError as exc:
                 warnings.append(f"{current_dir_path}: {exc.strerror or exc}")
                 state["directories_scanned"] = int(state["directories_scanned"]) + 1
-                checkpoint_state(state, cache_path, status="in_progress")
+                checkpoint_state(state, journal, status="in_progress")
                 continue
 
             state["current_dir"] = {
                 "path": str(current_dir_path),
+                "mtime_ns": mtime_ns,
                 "entries": entries,
                 "next_index": 0,
             }
-            checkpoint_state(state, cache_path, status="in_progress")
+            checkpoint_state(state, journal, status="in_progress")
 
-        current_dir = state["current_dir"]
-        if not isinstance(current_dir, dict):
-            raise TypeError("cache state 'current_dir' must be a dict or null")
+        if not scan_current_dir(state, journal, stop_state, filters):
+            return checkpoint_interrupted(state, journal, stop_state)
+
+    return checkpoint_complete(state, journal)
+
+
+def run_scan_parallel(
+    state: dict[str, object],
+    journal: CheckpointJournal,
+    stop_state: StopState,
+    filters: ScanFilters,
+    reuse: ReuseIndex,
+    jobs: int,
+) -> str:
+    """Scan up to `jobs` directories at once on a thread pool.
+
+    A directory is recorded as in flight when it leaves the pending stack and
+    its whole result is applied in one checkpoint when it finishes, so an
+    interrupted run only has to rescan the directories that were in flight.
+    """
+    pending_dirs = state["pending_dirs"]
+    in_flight = state["in_flight"]
+    if not isinstance(pending_dirs, list) or not isinstance(in_flight, list):
+        raise TypeError("cache state contains invalid collections")
 
-        directory_path = Path(str(current_dir["path"]))
-        entries = current_dir["entries"]
-        if not isinstance(entries, list):
-            raise TypeError("cache state 'current_dir.entries' must be a list")
+    if state["current_dir"] is not None:
+        if not scan_current_dir(state, journal, stop_state, filters):
+            return checkpoint_interrupted(state, journal, stop_state)
 
-        since_checkpoint = 0
-        while int(current_dir["next_index"]) < len(entries):
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+    futures: dict[concurrent.futures.Future[DirectoryResult], str] = {}
+    try:
+        while pending_dirs or futures:
             if stop_state.requested:
-                checkpoint_state(
-                    state,
-                    cache_path,
-                    status="interrupted",
-                    interrupted_by=stop_state.reason or "INTERRUPTED",
-                )
-                return "interrupted"
-
-            entry = entries[int(current_dir["next_index"])]
-            if not isinstance(entry, dict):
-                raise TypeError("cache entry snapshot must be a dict")
-
-            entry_name = str(entry["name"])
-            entry_kind = str(entry["kind"])
-            entry_path = directory_path / entry_name
-
-            if entry_kind == "dir":
-                if recurse:
-                    pending_dirs.append(str(entry_path))
-            elif entry_kind == "file":
-                state["files_seen"] = int(state["files_seen"]) + 1
-                suffix = entry_path.suffix.lower().lstrip(".")
-
-                if suffix in extensions and not should_exclude(entry_name, exclude_text):
-                    try:
-                        size_bytes = entry_path.stat().st_size
-                    except OSError as exc:
-                        warnings.append(f"{entry_path}: {exc.strerror or exc}")
-                    else:
-                        if within_size_bounds(size_bytes, min_size_bytes, max_size_bytes):
-                            record_match(state, entry_path, size_bytes)
-
-            current_dir["next_index"] = int(current_dir["next_index"]) + 1
-            since_checkpoint += 1
-
-            if since_checkpoint >= CHECKPOINT_ENTRY_INTERVAL:
-                checkpoint_state(state, cache_path, status="in_progress")
-                since_checkpoint = 0
-
-        state["current_dir"] = None
-        state["directories_scanned"] = int(state["directories_scanned"]) + 1
-        checkpoint_state(state, cache_path, status="in_progress")
-
-    checkpoint_state(state, cache_path, status="complete", interrupted_by=None)
-    return "complete"
+                return checkpoint_interrupted(state, journal, stop_state)
+
+            submitted = False
+            while pending_dirs and len(futures) < jobs:
+                directory_string = pending_dirs.pop()
+                journal.note_pop(directory_string)
+                in_flight.append(directory_string)
+                future = executor.submit(scan_directory, directory_string, filters, reuse)
+                futures[future] = directory_string
+                submitted = True
+            if submitted:
+                checkpoint_state(state, journal, status="in_progress")
+
+            done, _ = concurrent.futures.wait(
+                futures,
+                timeout=PARALLEL_POLL_SECONDS,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            if not done:
+                continue
+
+            for future in done:
+                in_flight.remove(futures.pop(future))
+                apply_directory_result(state, journal, future.result(), filters)
+            checkpoint_state(state, journal, status="in_progress")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return checkpoint_complete(state, journal)
+
+
+def run_scan(
+    state: dict[str, object],
+    journal: CheckpointJournal,
+    stop_state: StopState,
+    jobs: int = 1,
+) -> str:
+    """Run or resume the scan until completion or interruption."""
+    config = state["config"]
+    if not isinstance(config, dict):
+        raise TypeError("cache state 'config' must be a dict")
+    filters = ScanFilters.from_config(config)
+    reuse = ReuseIndex.from_state(state)
+
+    pending_dirs = state["pending_dirs"]
+    in_flight = state["in_flight"]
+    if not isinstance(pending_dirs, list) or not isinstance(in_flight, list):
+        raise TypeError("cache state contains invalid collections")
+
+    # Directories that were in flight when a parallel run stopped produced no
+    # recorded results, so they go back on the stack to be scanned from scratch.
+    # Checkpoint the re-queue on its own: replay applies a record's pops before
+    # its pushes, so these pushes must not share a record with their pops.
+    if in_flight:
+        while in_flight:
+            directory_string = in_flight.pop()
+            pending_dirs.append(directory_string)
+            journal.note_push(directory_string)
+        checkpoint_state(state, journal, status="in_progress")
+
+    if jobs > 1:
+        return run_scan_parallel(state, journal, stop_state, filters, reuse, jobs)
+    return run_scan_serial(state, journal, stop_state, filters, reuse)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -464,11 +1138,22 @@ def build_parser() -> argparse.ArgumentParser:
   python find_largest_videos.py -d . -r --exclude-text " (x265)"
   python find_largest_videos.py -d /mnt/media -r --min-size 1024 --max-size 2048
   python find_largest_videos.py -d /mnt/media -r -b
+  python find_largest_videos.py -d /mnt/smb-share -r -j 16
+  python find_largest_videos.py -d /mnt/media -r --refresh
+  python find_largest_videos.py -d /mnt/media -r --library
+  python find_largest_videos.py -d /mnt/media -r --library-only --min-size 4096
 
 Cache behavior:
   A scan-specific JSON cache is stored under /tmp and reused automatically.
+  Progress is appended to a .journal file beside it and folded into the
+  JSON snapshot periodically and when the scan completes.
   Partial cache state resumes on the next run after SIGINT, SIGTERM, or SIGHUP.
   Use -b/--bypass-cache to discard any existing cache and rescan.
+  Use --refresh to update a complete cache; only directories whose mtime
+  changed are listed again. A file resized in place without being renamed
+  does not change its directory's mtime, so use -b after in-place edits.
+  With -j/--jobs, directories still being scanned when the run stops are
+  rescanned on resume; finished directories are never scanned twice.
 
 Extension matching is case-insensitive, and both 'mp4' and '.mp4' are accepted.
 Default extensions: {format_extensions(DEFAULT_EXTENSIONS)}
@@ -529,6 +1214,45 @@ Default extensions: {format_extensions(DEFAULT_EXTENSIONS)}
         dest="bypass_cache",
         help="Ignore and overwrite any existing cache for this scan configuration.",
     )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help=(
+            "Rescan a complete cache, reusing results for directories whose mtime "
+            "is unchanged since it was written."
+        ),
+    )
+    parser.add_argument(
+        "--library",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="INDEX",
+        help=(
+            "Record the matches in the shared video library index used by the other "
+            "FFmpeg tools. Default INDEX: ~/.cache/video-library/index.sqlite3 "
+            "or $VIDEO_LIBRARY_INDEX."
+        ),
+    )
+    parser.add_argument(
+        "--library-only",
+        action="store_true",
+        help=(
+            "Answer from the video library index without scanning. Results are as "
+            "fresh as the last tool that indexed these files."
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=parse_jobs,
+        default=1,
+        metavar="N",
+        help=(
+            "Scan up to N directories at once. Helps most on network mounts where "
+            "each stat is a round trip. Default: 1."
+        ),
+    )
     return parser
 
 
@@ -566,21 +1290,42 @@ def resolve_size_filters(
     return min_size_bytes, max_size_bytes
 
 
+def open_library(
+    parser: argparse.ArgumentParser,
+    index_path: str | None,
+) -> video_library.VideoLibrary:
+    """Open the shared video library index or exit with a parser error."""
+    if video_library is None:
+        parser.error("--library needs video_library.py next to this script")
+
+    path = index_path or video_library.DEFAULT_INDEX_PATH
+    try:
+        return video_library.VideoLibrary(path)
+    except (OSError, ValueError, sqlite3.Error) as exc:
+        parser.error(f"cannot open video library {path}: {exc}")
+
+
 def prepare_state(
     config: dict[str, object],
-    cache_path: Path,
+    journal: CheckpointJournal,
     bypass_cache: bool,
+    refresh: bool = False,
 ) -> tuple[dict[str, object], str]:
-    """Create, resume, or reuse a cache state."""
+    """Create, resume, or reuse a cache state.
+
+    Every path except a reused complete cache starts from a freshly compacted
+    snapshot, which also drops any torn journal tail left by a hard crash.
+    """
+    cache_path = journal.cache_path
     if bypass_cache:
-        cache_path.unlink(missing_ok=True)
+        journal.discard()
         state = build_initial_state(config)
-        checkpoint_state(state, cache_path, status="in_progress")
+        checkpoint_state(state, journal, status="in_progress", compact=True)
         return state, "fresh-bypass"
 
     if not cache_path.exists():
         state = build_initial_state(config)
-        checkpoint_state(state, cache_path, status="in_progress")
+        checkpoint_state(state, journal, status="in_progress", compact=True)
         return state, "fresh"
 
     try:
@@ -591,7 +1336,7 @@ def prepare_state(
             file=sys.stderr,
         )
         state = build_initial_state(config)
-        checkpoint_state(state, cache_path, status="in_progress")
+        checkpoint_state(state, journal, status="in_progress", compact=True)
         return state, "fresh-rebuilt"
 
     if state.get("config") != config:
@@ -600,14 +1345,20 @@ def prepare_state(
             file=sys.stderr,
         )
         state = build_initial_state(config)
-        checkpoint_state(state, cache_path, status="in_progress")
+        checkpoint_state(state, journal, status="in_progress", compact=True)
         return state, "fresh-rebuilt"
 
     if state.get("status") == "complete":
-        return state, "reused-complete"
+        if not refresh:
+            return state, "reused-complete"
+
+        previous = {"dirs": state["dir_index"], "matches": state["matches"]}
+        state = build_initial_state(config)
+        state["previous"] = previous
+        checkpoint_state(state, journal, status="in_progress", compact=True)
+        return state, "refreshed"
 
-    state["status"] = "in_progress"
-    checkpoint_state(state, cache_path, status="in_progress")
+    checkpoint_state(state, journal, status="in_progress", compact=True)
     return state, "resumed"
 
 
@@ -619,6 +1370,8 @@ def describe_cache_mode(cache_mode: str) -> str:
         "fresh-rebuilt": "cache rebuilt from scratch",
         "reused-complete": "complete cache reused",
         "resumed": "partial cache resumed",
+        "refreshed": "complete cache refreshed (unchanged directories reused)",
+        "library-only": "answered from the video library index without scanning",
     }
     return labels.get(cache_mode, cache_mode)
 
@@ -634,8 +1387,9 @@ def print_results(
     max_size_bytes: int | None,
     matches: list[VideoMatch],
     warnings: list[str],
-    directories_scanned: int,
-    files_seen: int,
+    directories_scanned: int | None,
+    directories_reused: int,
+    files_seen: int | None,
     cache_path: Path,
     cache_mode: str,
 ) -> None:
@@ -651,8 +1405,12 @@ def print_results(
     print(f"Max size    : {format_size_filter(max_size_mb, max_size_bytes)}")
     print(f"Cache file  : {cache_path}")
     print(f"Cache mode  : {describe_cache_mode(cache_mode)}")
-    print(f"Directories : {directories_scanned}")
-    print(f"Files seen  : {files_seen}")
+    if directories_scanned is not None:
+        print(f"Directories : {directories_scanned}")
+    if directories_reused:
+        print(f"Reused dirs : {directories_reused}")
+    if files_seen is not None:
+        print(f"Files seen  : {files_seen}")
     print(f"Matches     : {len(matches)}")
     print(f"Total size  : {human_size(total_size)}")
 
@@ -689,16 +1447,44 @@ def main(argv: Sequence[str] | None = None) -> int:
         min_size_bytes=min_size_bytes,
         max_size_bytes=max_size_bytes,
     )
+    use_library = args.library is not None or args.library_only
+    if use_library and video_library is None:
+        parser.error("--library needs video_library.py next to this script")
+
+    if args.library_only:
+        with open_library(parser, args.library) as library:
+            matches = sorted_matches_from_library(library, config)
+        print_results(
+            root_dir=root_dir,
+            recurse=args.recurse,
+            extensions=args.extensions,
+            exclude_text=args.exclude_text,
+            min_size_mb=args.min_size,
+            max_size_mb=args.max_size,
+            min_size_bytes=min_size_bytes,
+            max_size_bytes=max_size_bytes,
+            matches=matches,
+            warnings=[],
+            directories_scanned=None,
+            directories_reused=0,
+            files_seen=None,
+            cache_path=library.path,
+            cache_mode="library-only",
+        )
+        return 0
+
     cache_path = cache_path_for_config(config)
-    state, cache_mode = prepare_state(config, cache_path, args.bypass_cache)
+    journal = CheckpointJournal(cache_path)
+    state, cache_mode = prepare_state(config, journal, args.bypass_cache, args.refresh)
 
     if cache_mode != "reused-complete":
         stop_state = StopState()
         previous_handlers = install_stop_handlers(stop_state)
         try:
-            final_status = run_scan(state, cache_path, stop_state)
+            final_status = run_scan(state, journal, stop_state, args.jobs)
         finally:
             restore_stop_handlers(previous_handlers)
+            journal.close()
 
         if final_status != "complete":
             print(
@@ -722,10 +1508,23 @@ def main(argv: Sequence[str] | None = None) -> int:
         matches=matches,
         warnings=warnings,
         directories_scanned=int(state.get("directories_scanned", 0)),
+        directories_reused=int(state.get("directories_reused", 0)),
         files_seen=int(state.get("files_seen", 0)),
         cache_path=cache_path,
         cache_mode=cache_mode,
     )
+
+    if use_library:
+        with open_library(parser, args.library) as library:
+            try:
+                retired = sync_library(library, state)
+            except sqlite3.Error as exc:
+                print(f"Warning: could not update video library {library.path}: {exc}", file=sys.stderr)
+            else:
+                print(
+                    f"\nLibrary     : {len(matches)} matches recorded in {library.path}"
+                    f" ({retired} stale entries removed)"
+                )
     return 0
 
 
@@ -5,18 +5,29 @@ import sys
 import argparse
 import ffmpeg
 import logging
+import sqlite3
 import multiprocessing
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 
-def search_file(file_path, search_terms):
+try:
+    import video_library
+except ImportError:
+    video_library = None
+
+def search_file(file_path, search_terms, library=None, probe=None):
     matches = []
     try:
         file_name = os.path.basename(file_path)
         if any(term in file_name.lower() for term in search_terms):
             matches.append(f"Found in file name: {file_path}")
         else:
-            metadata = ffmpeg.probe(file_path, show_entries='format_tags=*')
+            if library is not None:
+                # The index holds the full ffprobe JSON, format tags included, and
+                # only re-probes files whose size or mtime changed.
+                metadata = probe if probe is not None else library.probe(file_path)
+            else:
+                metadata = ffmpeg.probe(file_path, show_entries='format_tags=*')
             if any(term in str(metadata['format']['tags']).lower() for term in search_terms):
                 matches.append(f"Found in metadata: {file_path}")
     except ffmpeg.Error as e:
@@ -27,14 +38,21 @@ def search_file(file_path, search_terms):
         logging.error(f"Error message: {str(e)}")
     return matches
 
-def search_files(directory, search_terms, output_file, max_workers=None):
-    mp4_files = [os.path.join(root, file) for root, dirs, files in os.walk(directory) for file in files if file.endswith(".mp4")]
+def search_files(directory, search_terms, output_file, max_workers=None, library=None, library_only=False):
+    if library_only:
+        records = [record for record in library.query(directory) if record.path.endswith(".mp4")]
+        mp4_files = [record.path for record in records]
+        probes = [record.probe for record in records]
+    else:
+        mp4_files = [os.path.join(root, file) for root, dirs, files in os.walk(directory) for file in files if file.endswith(".mp4")]
+        probes = [None] * len(mp4_files)
 
     if max_workers is None:
         max_workers = multiprocessing.cpu_count()
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(search_file, file_path, search_terms) for file_path in mp4_files]
+        futures = [executor.submit(search_file, file_path, search_terms, library, probe)
+                   for file_path, probe in zip(mp4_files, probes)]
         matches = []
         with tqdm(total=len(mp4_files), desc='Processing files', unit='file') as progress_bar:
             for future in as_completed(futures):
@@ -60,6 +78,11 @@ def main():
                         help='path to the output file (optional)')
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='enable verbose logging')
+    parser.add_argument('--library', nargs='?', const='', default=None, metavar='INDEX',
+                        help='reuse and update metadata in the shared video library index '
+                             '(default: ~/.cache/video-library/index.sqlite3 or $VIDEO_LIBRARY_INDEX)')
+    parser.add_argument('--library-only', action='store_true',
+                        help='search the .mp4 files already in the video library index instead of walking the directory')
     args = parser.parse_args()
 
     if args.verbose:
@@ -70,7 +93,21 @@ def main():
     search_terms = [term.strip().lower() for term in args.search_terms.split(',')]
     current_directory = os.path.dirname(os.path.abspath(__file__))
 
-    search_files(current_directory, search_terms, args.output)
+    library = None
+    if args.library is not None or args.library_only:
+        if video_library is None:
+            parser.error('--library needs video_library.py next to this script')
+        try:
+            library = video_library.VideoLibrary(args.library or video_library.DEFAULT_INDEX_PATH)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            parser.error(f'cannot open video library: {e}')
+
+    try:
+        search_files(current_directory, search_terms, args.output,
+                     library=library, library_only=args.library_only)
+    finally:
+        if library is not None:
+            library.close()
 
 if __name__ == '__main__':
     main()
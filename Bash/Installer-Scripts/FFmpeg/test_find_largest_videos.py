@@ -0,0 +1,81 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+if sys.version_info < (3, 10):
+    pytest.skip("find_largest_videos.py needs Python 3.10+", allow_module_level=True)
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import find_largest_videos as flv  # noqa: E402
+
+
+def make_tree(root):
+    for top in range(6):
+        for sub in range(4):
+            directory = root / f"d{top}" / f"s{sub}"
+            directory.mkdir(parents=True)
+            for index in range(2):
+                (directory / f"v{index}.mp4").write_bytes(b"x" * (top * 100 + sub * 10 + index + 1))
+
+
+def run_once(config, jobs, stop_after=None, monkeypatch=None):
+    """Run or resume a scan, requesting a stop after `stop_after` directories.
+
+    A worker thread that requests the stop waits until the interruption is
+    checkpointed, so its directory is reliably still in flight.
+    """
+    journal = flv.CheckpointJournal(flv.cache_path_for_config(config))
+    state, cache_mode = flv.prepare_state(config, journal, bypass_cache=False)
+    stop_state = flv.StopState()
+
+    if stop_after is not None:
+        directory_mtime_ns = flv.directory_mtime_ns
+        calls = []
+
+        def stopping_mtime_ns(directory_string):
+            calls.append(directory_string)
+            if len(calls) >= stop_after:
+                stop_state.requested = True
+                stop_state.reason = "SIGINT"
+                if threading.current_thread() is not threading.main_thread():
+                    deadline = time.monotonic() + 5
+                    while state["status"] != "interrupted" and time.monotonic() < deadline:
+                        time.sleep(0.01)
+            return directory_mtime_ns(directory_string)
+
+        monkeypatch.setattr(flv, "directory_mtime_ns", stopping_mtime_ns)
+
+    try:
+        status = flv.run_scan(state, journal, stop_state, jobs)
+    finally:
+        journal.close()
+        if stop_after is not None:
+            monkeypatch.setattr(flv, "directory_mtime_ns", directory_mtime_ns)
+    return status, cache_mode, state
+
+
+@pytest.mark.parametrize("resume_jobs", [1, 4])
+def test_interrupted_resume_resumes_again(tmp_path, monkeypatch, resume_jobs):
+    monkeypatch.setattr(flv, "CACHE_DIR", tmp_path / "cache")
+    (tmp_path / "cache").mkdir()
+    root = tmp_path / "videos"
+    make_tree(root)
+    config = flv.make_scan_config(root, True, flv.DEFAULT_EXTENSIONS, "", None, None)
+
+    status, _, state = run_once(config, 4, stop_after=3, monkeypatch=monkeypatch)
+    assert status == "interrupted"
+    assert state["in_flight"]
+
+    status, cache_mode, _ = run_once(config, resume_jobs, stop_after=4, monkeypatch=monkeypatch)
+    assert (status, cache_mode) == ("interrupted", "resumed")
+
+    status, cache_mode, state = run_once(config, 4)
+    assert (status, cache_mode) == ("complete", "resumed")
+
+    expected = {str(path): path.stat().st_size for path in root.rglob("*.mp4")}
+    assert {path: size for path, (size, _mtime) in state["matches"].items()} == expected
+    assert state["files_seen"] == len(expected)
@@ -4,10 +4,16 @@ import os
 import argparse
 import subprocess
 import re
+import sqlite3
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import urllib.parse
 
+try:
+    import video_library
+except ImportError:
+    video_library = None
+
 def is_wsl():
     try:
         with open('/proc/version', 'r') as f:
@@ -42,24 +48,50 @@ def get_video_quality(file_path, verbose=False):
         codec_name = re.search(r'codec_name=(\w+)', output).group(1)
         duration = float(re.search(r'duration=(\d+\.?\d*)', output).group(1))
 
-        # Calculate frame rate
-        num, denom = map(int, frame_rate.split('/'))
-        frame_rate = num / denom if denom != 0 else 0
+        return file_path, quality_score(width, height, frame_rate, bit_rate, codec_name), duration
+    except subprocess.CalledProcessError as e:
+        if verbose:
+            print(f"Error processing {file_path}: {e}")
+        return file_path, 0, 0
 
-        # A more sophisticated metric for quality
-        # Factors: Resolution, Bit Rate, Frame Rate, Codec
-        quality = (width * height * frame_rate * bit_rate) / 1_000_000  # Adjusted metric for quality
+def quality_score(width, height, frame_rate, bit_rate, codec_name):
+    # Calculate frame rate
+    num, denom = map(int, frame_rate.split('/'))
+    frame_rate = num / denom if denom != 0 else 0
 
-        # Adjust quality score based on codec (example adjustment)
-        if codec_name in ["h265", "hevc"]:
-            quality *= 1.5  # H.265/HEVC has better quality at lower bit rates
-        elif codec_name in ["h264", "avc"]:
-            quality *= 1.2  # H.264/AVC is very efficient
-        elif codec_name in ["vp9"]:
-            quality *= 1.3  # VP9 is also very efficient
+    # A more sophisticated metric for quality
+    # Factors: Resolution, Bit Rate, Frame Rate, Codec
+    quality = (width * height * frame_rate * bit_rate) / 1_000_000  # Adjusted metric for quality
 
-        return file_path, quality, duration
-    except subprocess.CalledProcessError as e:
+    # Adjust quality score based on codec (example adjustment)
+    if codec_name in ["h265", "hevc"]:
+        quality *= 1.5  # H.265/HEVC has better quality at lower bit rates
+    elif codec_name in ["h264", "avc"]:
+        quality *= 1.2  # H.264/AVC is very efficient
+    elif codec_name in ["vp9"]:
+        quality *= 1.3  # VP9 is also very efficient
+
+    return quality
+
+def get_indexed_video_quality(file_path, library, verbose=False, probe=None):
+    # Same fields as get_video_quality, read from the shared library index. ffprobe
+    # only runs when the file is new or its size/mtime changed since it was indexed.
+    if verbose:
+        print(f"Processing video: {file_path}")
+    try:
+        if probe is None:
+            probe = library.probe(file_path)
+        stream = video_library.first_video_stream(probe)
+        if stream is None:
+            raise ValueError("no video stream")
+        width = int(stream['width'])
+        height = int(stream['height'])
+        bit_rate = int(stream['bit_rate'])
+        frame_rate = stream['avg_frame_rate']
+        codec_name = stream['codec_name']
+        duration = float(stream['duration'])
+        return file_path, quality_score(width, height, frame_rate, bit_rate, codec_name), duration
+    except (OSError, subprocess.CalledProcessError, ValueError, KeyError, sqlite3.Error) as e:
         if verbose:
             print(f"Error processing {file_path}: {e}")
         return file_path, 0, 0
@@ -151,6 +183,11 @@ def main():
     parser.add_argument('-f', '--force-linux-path', action='store_true', help="Force output to use Linux paths even if running under WSL")
     parser.add_argument('-c', '--create-playlist', action='store_true', help="Create and run a Bash script to create a VLC playlist file from results.txt")
     parser.add_argument('-v', '--verbose', action='store_true', help="Enable verbose output")
+    parser.add_argument('--library', nargs='?', const='', default=None, metavar='INDEX',
+                        help="Reuse and update ffprobe results in the shared video library index "
+                             "(default: ~/.cache/video-library/index.sqlite3 or $VIDEO_LIBRARY_INDEX)")
+    parser.add_argument('--library-only', action='store_true',
+                        help="Rank the MP4 files already in the video library index instead of walking root_dir")
     args = parser.parse_args()
 
     root_dir = args.root_dir
@@ -160,15 +197,36 @@ def main():
     create_playlist_flag = args.create_playlist
     verbose = args.verbose
 
-    mp4_files = find_mp4_files(root_dir, verbose)
+    library = None
+    if args.library is not None or args.library_only:
+        if video_library is None:
+            parser.error("--library needs video_library.py next to this script")
+        try:
+            library = video_library.VideoLibrary(args.library or video_library.DEFAULT_INDEX_PATH)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            parser.error(f"cannot open video library: {e}")
 
     video_qualities = []
     with ThreadPoolExecutor() as executor:
-        future_to_file = {executor.submit(get_video_quality, file, verbose): file for file in mp4_files}
+        if args.library_only:
+            records = library.query(os.path.abspath(root_dir), extensions=['mp4'])
+            if verbose:
+                print(f"Found {len(records)} MP4 files in the video library index.")
+            future_to_file = {executor.submit(get_indexed_video_quality, record.path, library, verbose, record.probe): record.path
+                              for record in records}
+        elif library is not None:
+            mp4_files = find_mp4_files(root_dir, verbose)
+            future_to_file = {executor.submit(get_indexed_video_quality, file, library, verbose): file for file in mp4_files}
+        else:
+            mp4_files = find_mp4_files(root_dir, verbose)
+            future_to_file = {executor.submit(get_video_quality, file, verbose): file for file in mp4_files}
         for future in as_completed(future_to_file):
             file, quality, duration = future.result()
             video_qualities.append((file, quality, duration))
 
+    if library is not None:
+        library.close()
+
     video_qualities.sort(key=lambda x: x[1], reverse=True)
 
     wsl = is_wsl() and not force_linux_path
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""Shared on-disk index of video files, their sizes, and their ffprobe metadata.
+
+`find_largest_videos.py`, `video-quality-ranker.py`,
+`scan-video-metadata-for-keywords.py` and `VLC/vlc_playlist_creator.py` all
+walk the same media trees and probe the same files. This module keeps one
+SQLite index that any of them can update incrementally and query later:
+
+- Rows are keyed by path and carry the size and mtime seen when they were
+  written, so a cached probe is only reused while both still match.
+- The full `ffprobe -show_format -show_streams` JSON is stored, and each tool
+  derives its own fields from it.
+- Paths are stored as filesystem bytes so undecodable names round-trip.
+
+Run it directly to print a short summary of an index.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Sequence
+
+
+DEFAULT_INDEX_PATH = Path(
+    os.environ.get("VIDEO_LIBRARY_INDEX", "~/.cache/video-library/index.sqlite3")
+).expanduser()
+SCHEMA_VERSION = 1
+FFPROBE_COMMAND = (
+    "ffprobe",
+    "-v",
+    "error",
+    "-print_format",
+    "json",
+    "-show_format",
+    "-show_streams",
+)
+
+
+@dataclass(frozen=True)
+class VideoRecord:
+    """One indexed file and, when it has been probed, its ffprobe JSON."""
+
+    path: str
+    size_bytes: int
+    mtime_ns: int
+    probe: dict[str, object] | None
+
+
+def run_ffprobe(path: str | os.PathLike[str]) -> dict[str, object]:
+    """Run ffprobe and return its parsed JSON.
+
+    Raises `subprocess.CalledProcessError` when ffprobe fails and
+    `ValueError` when its output is not a JSON object.
+    """
+    result = subprocess.run(
+        [*FFPROBE_COMMAND, os.fspath(path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    data = json.loads(result.stdout)
+    if not isinstance(data, dict):
+        raise ValueError("ffprobe did not return a JSON object")
+    return data
+
+
+def first_video_stream(probe: dict[str, object]) -> dict[str, object] | None:
+    """Return the first video stream in an ffprobe result, like `-select_streams v:0`."""
+    for stream in probe.get("streams", ()):
+        if isinstance(stream, dict) and stream.get("codec_type") == "video":
+            return stream
+    return None
+
+
+def extension_of(path_string: str) -> str:
+    """Return the lowercase extension without its dot."""
+    return os.path.splitext(path_string)[1].lower().lstrip(".")
+
+
+def _path_key(path_string: str) -> bytes:
+    return os.fsencode(os.path.abspath(path_string))
+
+
+def _prefix_bounds(root: str) -> tuple[bytes, bytes]:
+    """Return the key range covering every path below `root`."""
+    prefix = _path_key(root).rstrip(b"/") + b"/"
+    # "0" is the byte after "/", so [prefix, upper) is exactly the subtree.
+    return prefix, prefix[:-1] + b"0"
+
+
+class VideoLibrary:
+    """SQLite-backed index shared by the video tools.
+
+    A single connection is shared by the calling threads and serialized with a
+    lock, which is plenty for workloads dominated by ffprobe subprocesses.
+    """
+
+    def __init__(self, path: str | os.PathLike[str] = DEFAULT_INDEX_PATH) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS videos (
+                path BLOB PRIMARY KEY,
+                dir BLOB NOT NULL,
+                ext TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                probe TEXT,
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS videos_dir ON videos (dir);
+            CREATE INDEX IF NOT EXISTS videos_size ON videos (size);
+            """
+        )
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if row is None:
+            self._db.execute(
+                "INSERT INTO meta (key, value) VALUES ('schema', ?)", (str(SCHEMA_VERSION),)
+            )
+        elif row[0] != str(SCHEMA_VERSION):
+            raise ValueError(
+                f"unsupported video library schema {row[0]!r} in {self.path}; "
+                f"expected {SCHEMA_VERSION}"
+            )
+        self._db.commit()
+
+    def __enter__(self) -> VideoLibrary:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+    def lookup(self, path_string: str, size_bytes: int, mtime_ns: int) -> VideoRecord | None:
+        """Return the row for a file only if its size and mtime are unchanged."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, probe FROM videos WHERE path = ?",
+                (_path_key(path_string),),
+            ).fetchone()
+        if row is None or row[0] != size_bytes or row[1] != mtime_ns:
+            return None
+        return VideoRecord(
+            path=path_string,
+            size_bytes=row[0],
+            mtime_ns=row[1],
+            probe=json.loads(row[2]) if row[2] is not None else None,
+        )
+
+    def update_files(self, files: Iterable[tuple[str, int, int]]) -> None:
+        """Upsert (path, size, mtime_ns) rows, dropping probes for changed files."""
+        now = time.time()
+        rows = [
+            (
+                _path_key(path_string),
+                os.fsencode(os.path.dirname(os.path.abspath(path_string))),
+                extension_of(path_string),
+                int(size_bytes),
+                int(mtime_ns),
+                now,
+            )
+            for path_string, size_bytes, mtime_ns in files
+        ]
+        with self._lock:
+            self._db.executemany(
+                """
+                INSERT INTO videos (path, dir, ext, size, mtime_ns, probe, updated_at)
+                VALUES (?, ?, ?, ?, ?, NULL, ?)
+                ON CONFLICT (path) DO UPDATE SET
+                    probe = CASE
+                        WHEN size = excluded.size AND mtime_ns = excluded.mtime_ns THEN probe
+                        ELSE NULL
+                    END,
+                    size = excluded.size,
+                    mtime_ns = excluded.mtime_ns,
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+            self._db.commit()
+
+    def store_probe(
+        self,
+        path_string: str,
+        size_bytes: int,
+        mtime_ns: int,
+        probe: dict[str, object],
+    ) -> None:
+        """Record a file together with the ffprobe result taken at this size and mtime."""
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT OR REPLACE INTO videos (path, dir, ext, size, mtime_ns, probe, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    _path_key(path_string),
+                    os.fsencode(os.path.dirname(os.path.abspath(path_string))),
+                    extension_of(path_string),
+                    size_bytes,
+                    mtime_ns,
+                    json.dumps(probe, separators=(",", ":")),
+                    time.time(),
+                ),
+            )
+            self._db.commit()
+
+    def forget(self, paths: Iterable[str]) -> int:
+        """Delete rows for files that no longer exist and return how many went."""
+        keys = [(_path_key(path_string),) for path_string in paths]
+        with self._lock:
+            before = self._db.total_changes
+            self._db.executemany("DELETE FROM videos WHERE path = ?", keys)
+            self._db.commit()
+            return self._db.total_changes - before
+
+    def probe(self, path: str | os.PathLike[str]) -> dict[str, object]:
+        """Return ffprobe JSON for a file, running ffprobe only if the index is stale.
+
+        Raises `OSError` if the file cannot be statted, plus whatever
+        `run_ffprobe` raises when a fresh probe is needed.
+        """
+        path_string = os.fspath(path)
+        file_stat = os.stat(path_string)
+        record = self.lookup(path_string, file_stat.st_size, file_stat.st_mtime_ns)
+        if record is not None and record.probe is not None:
+            return record.probe
+
+        probe = run_ffprobe(path_string)
+        self.store_probe(path_string, file_stat.st_size, file_stat.st_mtime_ns, probe)
+        return probe
+
+    def query(
+        self,
+        root: str | os.PathLike[str],
+        *,
+        recursive: bool = True,
+        extensions: Iterable[str] | None = None,
+    ) -> list[VideoRecord]:
+        """Return indexed files below `root` without touching the filesystem.
+
+        The rows reflect whatever the last tool to see each file recorded, so
+        they can be stale; tools that need certainty should walk and stat.
+        """
+        root_string = os.fspath(root)
+        if recursive:
+            lower, upper = _prefix_bounds(root_string)
+            sql = "SELECT path, ext, size, mtime_ns, probe FROM videos WHERE path >= ? AND path < ?"
+            params: tuple[object, ...] = (lower, upper)
+        else:
+            sql = "SELECT path, ext, size, mtime_ns, probe FROM videos WHERE dir = ?"
+            params = (_path_key(root_string),)
+
+        wanted = {extension.lower().lstrip(".") for extension in extensions} if extensions else None
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+
+        return [
+            VideoRecord(
+                path=os.fsdecode(path_key),
+                size_bytes=size_bytes,
+                mtime_ns=mtime_ns,
+                probe=json.loads(probe) if probe is not None else None,
+            )
+            for path_key, ext, size_bytes, mtime_ns, probe in rows
+            if wanted is None or ext in wanted
+        ]
+
+    def summary(self) -> tuple[int, int, int]:
+        """Return (files, probed files, total bytes)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COUNT(*), COUNT(probe), COALESCE(SUM(size), 0) FROM videos"
+            ).fetchone()
+        return int(row[0]), int(row[1]), int(row[2])
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Print a summary of an index."""
+    parser = argparse.ArgumentParser(
+        prog="video_library.py",
+        description="Summarize the shared video library index.",
+    )
+    parser.add_argument(
+        "index",
+        nargs="?",
+        default=str(DEFAULT_INDEX_PATH),
+        help=f"Index file to summarize. Default: {DEFAULT_INDEX_PATH} (or $VIDEO_LIBRARY_INDEX).",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        with VideoLibrary(args.index) as library:
+            files, probed, total_bytes = library.summary()
+    except (OSError, ValueError, sqlite3.Error) as exc:
+        print(f"Error: cannot read video library {args.index}: {exc}", file=sys.stderr)
+        return 1
+
+    print(f"Index       : {args.index}")
+    print(f"Files       : {files}")
+    print(f"Probed      : {probed}")
+    print(f"Total bytes : {total_bytes:,}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
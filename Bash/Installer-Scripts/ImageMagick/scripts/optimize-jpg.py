@@ -3,18 +3,24 @@
 # GitHub: https://github.com/slyfox1186/script-repo/blob/main/Bash/Installer-Scripts/ImageMagick/scripts/optimize-jpg.py
 
 import argparse
+import bisect
 import concurrent.futures
+import hashlib
+import io
+import itertools
+import json
 import logging
 import os
 import re
 import shutil
+import sqlite3
 import subprocess
 import sys
 import tempfile
 import threading
 import time
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 try:
     from termcolor import colored
@@ -22,10 +28,56 @@ except ImportError:
     def colored(text, color=None, on_color=None, attrs=None):
         return text
 
+# Optional in-process engines. Pillow-SIMD installs as PIL, so it is picked up here too.
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
+
+# Only needed for --target-ssim.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Constants
 MAX_THREADS = os.cpu_count()
 DEFAULT_THREADS = MAX_THREADS
 MAX_WIDTH, MAX_HEIGHT = 8000, 6000
+# Shrink-only geometry: fit within MAX_WIDTH x MAX_HEIGHT, keeping the aspect
+# ratio, and leave smaller images alone. Lets magick resize in the same pass.
+RESIZE_GEOMETRY = f'{MAX_WIDTH}x{MAX_HEIGHT}>'
+
+# -posterize levels in the JPEG pipeline, shared by every backend.
+POSTERIZE_LEVELS = 136
+# Images timed per backend by --benchmark.
+BENCHMARK_IMAGES = 200
+# Manifest of optimized images, so re-runs skip work that is already done.
+DEFAULT_MANIFEST_PATH = Path(
+    os.environ.get('OPTIMIZE_JPG_MANIFEST', '~/.cache/optimize-jpg/manifest.sqlite3')
+).expanduser()
+MANIFEST_HASH_BLOCK = 1024 * 1024
+MANIFEST_COMMIT_EVERY = 500
+# Lowest quality --target-ssim and --target-size will try (see --min-quality).
+DEFAULT_MIN_QUALITY = 50
+# SSIM is scored over JPEG-sized blocks, this many block rows at a time.
+SSIM_BLOCK = 8
+SSIM_STRIP_BLOCKS = 256
+# Jobs are admitted largest first against --memory-budget, using estimates
+# from the image dimensions; files are pinged in batches of IDENTIFY_BATCH.
+IDENTIFY_BATCH = 256
+# Default budget as a share of the memory available at startup.
+MEMORY_BUDGET_SHARE = 0.75
+# Smallest -limit memory handed to a magick job.
+MIN_JOB_MEMORY = 64 * 1024 ** 2
+# Bytes per pixel in a Q16 HDRI pixel cache: four float channels.
+MAGICK_PIXEL_BYTES = 16
+FORMAT_SUFFIXES = {'jpg': ('.jpg', '.jpeg'), 'png': ('.png',), 'tiff': ('.tif', '.tiff')}
 
 MAGICK_LIMITS = {
     'MAGICK_AREA_LIMIT': '1GP',
@@ -54,6 +106,8 @@ def parse_arguments() -> argparse.Namespace:
             "  %(prog)s -d ./photos -q 90\n"
             "  %(prog)s -d ./photos -o -n --dry-run\n"
             "  %(prog)s -d ./photos -r -f png -t 4\n"
+            "  %(prog)s -d ./photos -q 90 --target-ssim 0.985\n"
+            "  %(prog)s -d ./photos --benchmark\n"
         )
     )
     parser.add_argument('-d', '--dir', type=Path, default=Path.cwd(),
@@ -80,9 +134,46 @@ def parse_arguments() -> argparse.Namespace:
                         help='Also log output to image_processing.log.')
     parser.add_argument('--dry-run', action='store_true',
                         help='Show what would be processed without making changes.')
+    parser.add_argument('--single-pass', action=argparse.BooleanOptionalAction, default=True,
+                        help='Resize and optimize each image in one magick command (default). '
+                             'Use --no-single-pass for the older identify/resize/encode pipeline.')
+    parser.add_argument('--backend', choices=['auto', *BACKENDS], default='auto',
+                        help='Image engine: pyvips or Pillow in a process pool, or magick subprocesses '
+                             '(default: auto, the first of vips, pillow, magick that is installed).')
+    parser.add_argument('--target-ssim', type=float, metavar='SSIM',
+                        help='Per JPEG, use the lowest quality between --min-quality and -q whose SSIM '
+                             'against the unencoded image is at least SSIM, e.g. 0.98 (needs numpy).')
+    parser.add_argument('--target-size', type=parse_size, metavar='BYTES',
+                        help='Per JPEG, use the highest quality between --min-quality and -q that fits in '
+                             'BYTES (suffixes K, M, G). Combined with --target-ssim, the size wins.')
+    parser.add_argument('--min-quality', type=int, default=DEFAULT_MIN_QUALITY,
+                        help=f'Lowest quality the target search may pick (default: {DEFAULT_MIN_QUALITY}).')
+    parser.add_argument('--memory-budget', type=parse_size, metavar='BYTES',
+                        help=f'Memory the running jobs may use together, estimated from image dimensions '
+                             f'(suffixes K, M, G; default: {MEMORY_BUDGET_SHARE * 100:.0f}%% of available memory). '
+                             'Larger images are started first; one bigger than the budget runs alone.')
+    parser.add_argument('--manifest', type=Path, default=DEFAULT_MANIFEST_PATH,
+                        help=f'Database of optimized images and their settings (default: {DEFAULT_MANIFEST_PATH}, '
+                             'or $OPTIMIZE_JPG_MANIFEST). Unchanged images already optimized with the same '
+                             'settings are skipped, even without the -IM suffix.')
+    parser.add_argument('--no-manifest', action='store_true',
+                        help='Neither read nor update the manifest.')
+    parser.add_argument('--force', action='store_true',
+                        help='Process images even if the manifest says they are done (still updates it).')
+    parser.add_argument('--benchmark', action='store_true',
+                        help=f'Time every installed backend on up to {BENCHMARK_IMAGES} of the images, '
+                             'writing to a temporary directory, and exit.')
     return parser.parse_args()
 
 
+def parse_size(text: str) -> int:
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?)i?B?\s*', text, re.IGNORECASE)
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r} (expected e.g. 250000, 300K or 1.5M)")
+    number, unit = match.groups()
+    return int(float(number) * 1024 ** ' KMG'.index(unit.upper() or ' '))
+
+
 def setup_logging(log_to_file: bool, verbose: bool) -> None:
     handlers = [logging.StreamHandler()]
     if log_to_file:
@@ -123,6 +214,109 @@ def check_system_dependencies() -> None:
         sys.exit(1)
 
 
+def default_memory_budget() -> Optional[int]:
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(int(line.split()[1]) * 1024 * MEMORY_BUDGET_SHARE)
+    except OSError:
+        pass
+    try:
+        return int(os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') * MEMORY_BUDGET_SHARE)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _identify_batch(files: List[Path]) -> Dict[str, int]:
+    # Pixel counts from one 'identify -ping' over many files. Unreadable files
+    # are reported on stderr and left out; multi-frame files keep their largest frame.
+    result = subprocess.run(
+        ['identify', '-ping', '-format', '%w %h %i\n', *map(str, files)],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors='surrogateescape',
+    )
+    pixels = {}
+    for line in result.stdout.splitlines():
+        parts = line.split(' ', 2)
+        if len(parts) == 3 and parts[0].isdigit() and parts[1].isdigit():
+            pixels[parts[2]] = max(pixels.get(parts[2], 0), int(parts[0]) * int(parts[1]))
+    return pixels
+
+
+def _pillow_pixels(infile: Path) -> int:
+    # Image.open only parses the header.
+    try:
+        with Image.open(infile) as img:
+            return img.width * img.height
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return 0
+
+
+def read_pixel_counts(image_files: List[Path], workers: int) -> Dict[Path, int]:
+    # identify -ping when ImageMagick is installed, Pillow headers otherwise.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        if shutil.which('identify'):
+            batches = [image_files[i:i + IDENTIFY_BATCH] for i in range(0, len(image_files), IDENTIFY_BATCH)]
+            pixels = {}
+            for batch_pixels in executor.map(_identify_batch, batches):
+                pixels.update(batch_pixels)
+            return {infile: pixels.get(str(infile), 0) for infile in image_files}
+        if Image is not None:
+            return dict(zip(image_files, executor.map(_pillow_pixels, image_files)))
+    return {}
+
+
+def schedule_jobs(
+    image_files: List[Path], estimates: Dict[Path, int], workers: int, budget: Optional[int], submit,
+) -> Iterator[Tuple[Path, concurrent.futures.Future]]:
+    # Start the largest images first so the big ones are not the tail, keeping
+    # the estimated memory of running jobs within budget. When the largest
+    # waiting job does not fit, the largest one that does fills the worker. A
+    # job bigger than the whole budget runs when nothing else is.
+    # submit(infile, estimate, threads) returns a future; yields (infile, future)
+    # as jobs finish.
+    budget = float('inf') if budget is None else budget
+    waiting = sorted(image_files, key=lambda infile: estimates.get(infile, 0))
+    sizes = [estimates.get(infile, 0) for infile in waiting]
+    running = {}
+    in_use = 0
+
+    while waiting or running:
+        while waiting and len(running) < workers:
+            index = len(waiting) - 1
+            if running and sizes[index] > budget - in_use:
+                index = bisect.bisect_right(sizes, budget - in_use) - 1
+                if index < 0:
+                    break
+            infile, estimate = waiting.pop(index), sizes.pop(index)
+            # Share the cores among the jobs that can run side by side, so the
+            # last few images get more threads each.
+            threads = max(1, MAX_THREADS // min(workers, len(running) + 1 + len(waiting)))
+            running[submit(infile, estimate, threads)] = (infile, estimate)
+            in_use += estimate
+
+        done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            infile, estimate = running.pop(future)
+            in_use -= estimate
+            yield infile, future
+
+
+def magick_limit_args(job_limits: Optional[Tuple[int, int]]) -> List[str]:
+    # Per-job memory and thread limits; past the memory limit ImageMagick
+    # moves the pixel cache to disk instead of growing.
+    if job_limits is None:
+        return []
+    memory, threads = job_limits
+    memory = max(memory, MIN_JOB_MEMORY)
+    return [
+        '-limit', 'memory', str(memory),
+        '-limit', 'map', str(memory * 2),
+        '-limit', 'area', str(memory // MAGICK_PIXEL_BYTES),
+        '-limit', 'thread', str(threads),
+    ]
+
+
 def get_image_dimensions(filepath: Path) -> Tuple[int, int]:
     output = subprocess.check_output(
         ['identify', '-ping', '-format', '%wx%h', str(filepath)]
@@ -190,113 +384,266 @@ def process_image(
     recursive_mode: bool,
     base_dir: Path,
     dry_run: bool = False,
-) -> None:
+    single_pass: bool = True,
+    backend_name: str = 'magick',
+    manifest_path: Optional[Path] = None,
+    settings: str = '',
+    force: bool = False,
+    target_ssim: Optional[float] = None,
+    target_size: Optional[int] = None,
+    min_quality: int = DEFAULT_MIN_QUALITY,
+    job_limits: Optional[Tuple[int, int]] = None,
+) -> Tuple[str, int, Optional[tuple]]:
+    # Returns (status, bytes saved, manifest record). Progress and the manifest
+    # are updated in the main process because workers may be separate processes.
     if infile.stem.endswith('-IM'):
         logging.debug(colored(f"  Skipped (already optimized): {infile.name}", 'blue'))
-        update_progress('skipped')
-        return
+        return 'skipped', 0, None
+
+    # The main process already skipped files whose size and mtime are in the
+    # manifest; this catches copied, touched or renamed files by content.
+    input_entry = None
+    if manifest_path is not None:
+        input_stat = infile.stat()
+        input_hash = content_hash(infile)
+        input_entry = (os.path.abspath(infile), input_stat.st_size, input_stat.st_mtime_ns, input_hash)
+        if not force and _worker_manifest(manifest_path).is_done(input_hash, settings):
+            logging.debug(colored(f"  Skipped (unchanged since last run): {infile.name}", 'blue'))
+            return 'skipped', 0, ([input_entry], None)
 
     if dry_run:
         outfile_suffix = '' if no_append_text else '-IM'
         outfile = infile.parent / f"{infile.stem}{outfile_suffix}.{output_format}"
         rel = outfile.relative_to(base_dir) if recursive_mode else outfile.name
         logging.info(colored(f"  [DRY RUN] Would process: {infile.name} -> {rel}", 'cyan'))
-        update_progress('processed')
-        return
+        return 'processed', 0, None
 
     original_size = infile.stat().st_size
-    base_name = infile.stem
-    output_dir = infile.parent
-
-    with tempfile.TemporaryDirectory() as temp_dir:
-        resized_image_path = Path(temp_dir) / infile.name
+    outfile_suffix = '' if no_append_text else '-IM'
+    outfile = infile.parent / f"{infile.stem}{outfile_suffix}.{output_format}"
+
+    if backup:
+        backup_path = infile.with_suffix(f'.bak{infile.suffix}')
+        shutil.copy2(str(infile), str(backup_path))
+        logging.debug(colored(f"  Backup: {backup_path.name}", 'yellow'))
+
+    # Encode next to the output and only then move it into place, so the
+    # original survives when the new file turns out larger.
+    partial = outfile.with_name(f".{outfile.stem}.partial-IM{outfile.suffix}")
+    backend = get_backend(backend_name)
+    try:
+        if target_ssim is not None or target_size is not None:
+            try:
+                data, chosen = _encode_to_target(backend, infile, quality, min_quality, preserve_metadata,
+                                                 target_ssim, target_size)
+            except backend.errors as e:
+                logging.error(colored(f"  Error processing {infile.name}: {e}", 'red'))
+                return 'failed', 0, None
+            logging.debug(f"  {infile.name}: quality {chosen}, {format_bytes(len(data))}")
+            partial.write_bytes(data)
+        elif single_pass or backend.in_process:
+            # One pass decodes, shrinks if needed and encodes, with no identify
+            # calls and no intermediate file.
+            if not _encode_image(backend, infile, partial, output_format, quality, preserve_metadata,
+                                 verbose_mode, resize=True, job_limits=job_limits):
+                return 'failed', 0, None
+        else:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                resized_image_path = _resize_to_temp(infile, Path(temp_dir), verbose_mode, job_limits)
+                if resized_image_path is None or not _encode_image(
+                    backend, resized_image_path, partial, output_format, quality, preserve_metadata, verbose_mode,
+                    job_limits=job_limits,
+                ):
+                    return 'failed', 0, None
+        if partial.exists():
+            _keep_smaller(infile, partial, outfile, original_size, output_format)
+    finally:
+        partial.unlink(missing_ok=True)
+
+    status, saved = _report_result(infile, outfile, original_size, recursive_mode, base_dir, overwrite_mode)
+    if status != 'processed' or input_entry is None:
+        return status, saved, None
+
+    output_stat = outfile.stat()
+    output_hash = content_hash(outfile)
+    output_path = os.path.abspath(outfile)
+    entries = [input_entry] if infile.exists() and outfile != infile else []
+    entries.append((output_path, output_stat.st_size, output_stat.st_mtime_ns, output_hash))
+    return status, saved, (entries, (input_hash, output_path, output_hash))
+
+
+# Two-pass mode: shrink oversized images into temp_dir and return the image to encode.
+def _resize_to_temp(infile: Path, temp_dir: Path, verbose_mode: bool,
+                    job_limits: Optional[Tuple[int, int]] = None) -> Optional[Path]:
+    try:
+        orig_width, orig_height = get_image_dimensions(infile)
+    except subprocess.CalledProcessError as e:
+        logging.error(colored(f"  Error reading dimensions for {infile.name}: {e}", 'red'))
+        return None
+
+    new_width, new_height = calculate_resize_dimensions(orig_width, orig_height)
+    if new_width == orig_width and new_height == orig_height:
+        return infile
+
+    logging.debug(f"  Resizing {infile.name}: {orig_width}x{orig_height} -> {new_width}x{new_height}")
+    resized_image_path = temp_dir / infile.name
+    run_command(
+        ['magick', *magick_limit_args(job_limits), str(infile), '-resize', f'{new_width}x{new_height}',
+         str(resized_image_path)],
+        verbose_mode,
+    )
+    return resized_image_path
 
-        if backup:
-            backup_path = infile.with_suffix(f'.bak{infile.suffix}')
-            shutil.copy2(str(infile), str(backup_path))
-            logging.debug(colored(f"  Backup: {backup_path.name}", 'yellow'))
 
-        # Resize if dimensions exceed limits
-        try:
-            orig_width, orig_height = get_image_dimensions(infile)
-            new_width, new_height = calculate_resize_dimensions(orig_width, orig_height)
-
-            if new_width != orig_width or new_height != orig_height:
-                logging.debug(
-                    f"  Resizing {infile.name}: {orig_width}x{orig_height} -> {new_width}x{new_height}"
-                )
-                run_command(
-                    ['magick', str(infile), '-resize', f'{new_width}x{new_height}', str(resized_image_path)],
-                    verbose_mode,
-                )
-            else:
-                resized_image_path = infile
-        except subprocess.CalledProcessError as e:
-            logging.error(colored(f"  Error reading dimensions for {infile.name}: {e}", 'red'))
-            update_progress('failed')
-            return
-
-        outfile_suffix = '' if no_append_text else '-IM'
-        outfile = output_dir / f"{base_name}{outfile_suffix}.{output_format}"
+def _encode_image(
+    backend,
+    infile: Path,
+    outfile: Path,
+    output_format: str,
+    quality: int,
+    preserve_metadata: bool,
+    verbose_mode: bool,
+    resize: bool = False,
+    job_limits: Optional[Tuple[int, int]] = None,
+) -> bool:
+    try:
+        backend.encode(infile, outfile, output_format, quality, preserve_metadata, verbose_mode, resize,
+                       job_limits)
+    except backend.errors as e:
+        logging.error(colored(f"  Error processing {infile.name}: {e}", 'red'))
+        return False
+    return True
+
+
+def _report_result(
+    infile: Path, outfile: Path, original_size: int, recursive_mode: bool, base_dir: Path, overwrite_mode: bool
+) -> Tuple[str, int]:
+    # Calculate size difference
+    if outfile.exists():
+        new_size = outfile.stat().st_size
+        saved = original_size - new_size
+        saved_str = format_bytes(abs(saved))
+        if saved > 0:
+            pct = (saved / original_size * 100) if original_size > 0 else 0
+            size_info = colored(f"-{saved_str} ({pct:.1f}%)", 'green')
+        elif saved < 0:
+            size_info = colored(f"+{saved_str} (larger)", 'yellow')
+        else:
+            size_info = "same size"
+
+        rel_path = outfile.relative_to(base_dir) if recursive_mode else outfile.name
+        # Print on a new line so the progress bar doesn't clobber it
+        sys.stdout.write('\r' + ' ' * 100 + '\r')
+        logging.info(
+            colored(f"  Processed: ", 'green')
+            + f"{rel_path}  [{format_bytes(original_size)} -> {format_bytes(new_size)}] {size_info}"
+        )
+    else:
+        logging.error(colored(f"  Output file not created for {infile.name}", 'red'))
+        return 'failed', 0
+
+    if overwrite_mode and outfile != infile:
+        infile.unlink()
+        logging.debug(colored(f"  Removed original: {infile.name}", 'yellow'))
+    return 'processed', max(saved, 0)
+
+
+def _keep_smaller(infile: Path, partial: Path, outfile: Path, original_size: int, output_format: str) -> None:
+    # Move the new encode into place, unless re-encoding to the same format
+    # made it larger; then the output is the original bytes.
+    if (partial.stat().st_size >= original_size
+            and infile.suffix.lower() in FORMAT_SUFFIXES.get(output_format.lower(), ())):
+        logging.debug(colored(f"  Kept original bytes: re-encoding {infile.name} did not make it smaller", 'yellow'))
+        if outfile != infile:
+            shutil.copy2(infile, outfile)
+        return
+    os.replace(partial, outfile)
 
-        try:
-            if output_format.lower() in ('jpg', 'jpeg'):
-                _process_jpg(resized_image_path, outfile, quality, preserve_metadata, verbose_mode)
-            else:
-                _process_other(resized_image_path, outfile, output_format, quality, preserve_metadata, verbose_mode)
-        except subprocess.CalledProcessError as e:
-            logging.error(colored(f"  Error processing {infile.name}: {e}", 'red'))
-            update_progress('failed')
-            return
 
-        # Calculate size difference
-        if outfile.exists():
-            new_size = outfile.stat().st_size
-            saved = original_size - new_size
-            saved_str = format_bytes(abs(saved))
-            if saved > 0:
-                pct = (saved / original_size * 100) if original_size > 0 else 0
-                size_info = colored(f"-{saved_str} ({pct:.1f}%)", 'green')
-            elif saved < 0:
-                size_info = colored(f"+{saved_str} (larger)", 'yellow')
-            else:
-                size_info = "same size"
-
-            rel_path = outfile.relative_to(base_dir) if recursive_mode else outfile.name
-            # Print on a new line so the progress bar doesn't clobber it
-            sys.stdout.write('\r' + ' ' * 100 + '\r')
-            logging.info(
-                colored(f"  Processed: ", 'green')
-                + f"{rel_path}  [{format_bytes(original_size)} -> {format_bytes(new_size)}] {size_info}"
-            )
-            update_progress('processed', bytes_saved=max(saved, 0))
+def _lowest_passing(low: int, high: int, passes) -> Optional[int]:
+    # Binary search for the smallest value in [low, high] where passes() holds,
+    # assuming it keeps holding above it. None if it fails even at high.
+    found = None
+    while low <= high:
+        middle = (low + high) // 2
+        if passes(middle):
+            found, high = middle, middle - 1
         else:
-            logging.error(colored(f"  Output file not created for {infile.name}", 'red'))
-            update_progress('failed')
-            return
-
-        if overwrite_mode and outfile != infile:
-            infile.unlink()
-            logging.debug(colored(f"  Removed original: {infile.name}", 'yellow'))
+            low = middle + 1
+    return found
+
+
+def block_ssim(reference, candidate) -> float:
+    # Mean SSIM of two luma arrays over 8x8 blocks, the unit JPEG quantizes.
+    # Scored a strip at a time so huge images do not need several float copies.
+    height = reference.shape[0] - reference.shape[0] % SSIM_BLOCK
+    width = reference.shape[1] - reference.shape[1] % SSIM_BLOCK
+    if height == 0 or width == 0:
+        return float(np.array_equal(reference, candidate))
+
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    total = 0.0
+    strip = SSIM_BLOCK * SSIM_STRIP_BLOCKS
+    for top in range(0, height, strip):
+        bottom = min(top + strip, height)
+        rows = (bottom - top) // SSIM_BLOCK
+        x, y = (
+            plane[top:bottom, :width].astype(np.float32)
+            .reshape(rows, SSIM_BLOCK, -1, SSIM_BLOCK).swapaxes(1, 2)
+            .reshape(-1, SSIM_BLOCK * SSIM_BLOCK)
+            for plane in (reference, candidate)
+        )
+        mean_x, mean_y = x.mean(axis=1), y.mean(axis=1)
+        covariance = (x * y).mean(axis=1) - mean_x * mean_y
+        ssim = ((2 * mean_x * mean_y + c1) * (2 * covariance + c2)
+                / ((mean_x ** 2 + mean_y ** 2 + c1) * (x.var(axis=1) + y.var(axis=1) + c2)))
+        total += float(ssim.sum(dtype=np.float64))
+    return total / ((height // SSIM_BLOCK) * (width // SSIM_BLOCK))
+
+
+def _encode_to_target(
+    backend, infile: Path, max_quality: int, min_quality: int, preserve_metadata: bool,
+    target_ssim: Optional[float], target_size: Optional[int],
+) -> Tuple[bytes, int]:
+    # Decode and filter once, then binary-search the JPEG quality with every
+    # candidate encoded in memory. Returns the chosen encode and its quality.
+    image = backend.prepare(infile, 'jpg', preserve_metadata, resize=True, in_memory=True)
+    candidates = {}
+
+    def encoded(quality: int) -> bytes:
+        if quality not in candidates:
+            candidates[quality] = backend.encode_jpeg(image, quality, preserve_metadata)
+        return candidates[quality]
+
+    quality = max_quality
+    if target_ssim is not None:
+        reference = backend.luma(image)
+        passing = _lowest_passing(
+            min_quality, max_quality,
+            lambda q: block_ssim(reference, backend.decoded_luma(encoded(q))) >= target_ssim,
+        )
+        quality = max_quality if passing is None else passing
+    if target_size is not None and len(encoded(quality)) > target_size:
+        too_big = _lowest_passing(min_quality, quality, lambda q: len(encoded(q)) > target_size)
+        quality = max(min_quality, too_big - 1)
+    return encoded(quality), quality
 
 
 def _process_jpg(
-    infile: Path, outfile: Path, quality: int, preserve_metadata: bool, verbose: bool
+    infile: Path, outfile: Path, quality: int, preserve_metadata: bool, verbose: bool,
+    geometry: Optional[str] = None, job_limits: Optional[Tuple[int, int]] = None,
 ) -> None:
-    try:
-        dimensions = f"{get_image_dimensions(infile)[0]}x{get_image_dimensions(infile)[1]}"
-    except subprocess.CalledProcessError:
-        dimensions = subprocess.check_output(
-            ['identify', '-ping', '-format', '%wx%h', str(infile)]
-        ).decode('utf-8').strip()
+    # Without a geometry the image was already resized, so thumbnail it to its own size.
+    if geometry is None:
+        geometry = '{}x{}'.format(*get_image_dimensions(infile))
 
     opts = [
         '-filter', 'Triangle',
         '-define', 'filter:support=2',
-        '-thumbnail', dimensions,
+        '-thumbnail', geometry,
         '-unsharp', '0.25x0.08+8.3+0.045',
         '-dither', 'None',
-        '-posterize', '136',
+        '-posterize', str(POSTERIZE_LEVELS),
         '-quality', str(quality),
         '-define', 'jpeg:fancy-upsampling=off',
         '-auto-level',
@@ -308,10 +655,12 @@ def _process_jpg(
     if not preserve_metadata:
         opts.insert(0, '-strip')
 
+    limits = magick_limit_args(job_limits)
+
     # First attempt with sampling factor
     try:
         subprocess.run(
-            ['magick', str(infile)] + opts + ['-sampling-factor', '2x2', '-limit', 'area', '0', str(outfile)],
+            ['magick', *limits, str(infile)] + opts + ['-sampling-factor', '2x2', str(outfile)],
             check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
         )
         return
@@ -321,17 +670,20 @@ def _process_jpg(
 
     # Fallback without sampling factor
     subprocess.run(
-        ['magick', str(infile)] + opts + [str(outfile)],
+        ['magick', *limits, str(infile)] + opts + [str(outfile)],
         check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
     )
 
 
 def _process_other(
-    infile: Path, outfile: Path, output_format: str, quality: int, preserve_metadata: bool, verbose: bool
+    infile: Path, outfile: Path, output_format: str, quality: int, preserve_metadata: bool, verbose: bool,
+    geometry: Optional[str] = None, job_limits: Optional[Tuple[int, int]] = None,
 ) -> None:
     interlace = 'none' if output_format.lower() in ('png', 'tiff', 'tif') else 'JPEG'
 
-    cmd = ['magick', str(infile)]
+    cmd = ['magick', *magick_limit_args(job_limits), str(infile)]
+    if geometry is not None:
+        cmd += ['-resize', geometry]
     if not preserve_metadata:
         cmd.append('-strip')
     cmd += ['-interlace', interlace, '-quality', f'{quality}', str(outfile)]
@@ -339,6 +691,319 @@ def _process_other(
     run_command(cmd, verbose)
 
 
+def _tone_lut(low: int, high: int) -> List[int]:
+    # '-posterize 136' followed by '-auto-level' as a single 256-entry lookup
+    # table, given the darkest and brightest channel values in the image.
+    step = 255 / (POSTERIZE_LEVELS - 1)
+    posterized = [round(round(value / step) * step) for value in range(256)]
+    low, high = posterized[low], posterized[high]
+    if high <= low:
+        return posterized
+    return [min(255, max(0, round((value - low) * 255 / (high - low)))) for value in posterized]
+
+
+class MagickBackend:
+    # Runs magick (and identify) as subprocesses; always available as the fallback.
+    name = 'magick'
+    in_process = False
+    errors = (subprocess.CalledProcessError, OSError)
+    # Peak memory per source pixel: the source and the result pixel caches.
+    bytes_per_pixel = 2 * MAGICK_PIXEL_BYTES
+
+    @staticmethod
+    def available() -> bool:
+        return shutil.which('magick') is not None
+
+    def encode(self, infile: Path, outfile: Path, output_format: str, quality: int,
+               preserve_metadata: bool, verbose: bool, resize: bool = False,
+               job_limits: Optional[Tuple[int, int]] = None) -> None:
+        geometry = RESIZE_GEOMETRY if resize else None
+        if output_format.lower() in ('jpg', 'jpeg'):
+            _process_jpg(infile, outfile, quality, preserve_metadata, verbose, geometry, job_limits)
+        else:
+            _process_other(infile, outfile, output_format, quality, preserve_metadata, verbose, geometry,
+                           job_limits)
+
+
+class PillowBackend:
+    # Reproduces the magick pipeline in-process. The tiny '-unsharp 0.25x0.08'
+    # (sigma 0.08 is below a pixel) and '-enhance' denoise have no Pillow
+    # equivalent and are left out, so output is close to, not identical with, magick's.
+    name = 'pillow'
+    in_process = True
+    errors = (OSError, ValueError) + ((Image.DecompressionBombError,) if Image else ())
+    # 8-bit RGBA, decoded plus the filtered copy.
+    bytes_per_pixel = 8
+
+    @staticmethod
+    def available() -> bool:
+        return Image is not None
+
+    def prepare(self, infile: Path, output_format: str, preserve_metadata: bool, resize: bool = False,
+                in_memory: bool = False):
+        # Decode, shrink and tone-map; returns (image, save options for metadata).
+        is_jpg = output_format.lower() in ('jpg', 'jpeg')
+        with Image.open(infile) as source:
+            metadata = {}
+            if preserve_metadata:
+                metadata = {key: source.info[key] for key in ('exif', 'icc_profile') if source.info.get(key)}
+
+            img = source
+            if is_jpg and img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            elif output_format.lower() == 'png' and img.mode in ('CMYK', 'YCbCr', 'LAB', 'HSV'):
+                img = img.convert('RGB')
+            if resize:
+                # Shrink-only fit, like 'WxH>'; Triangle is bilinear, and -resize defaults to Lanczos.
+                img.thumbnail((MAX_WIDTH, MAX_HEIGHT),
+                              Image.Resampling.BILINEAR if is_jpg else Image.Resampling.LANCZOS)
+
+            if is_jpg:
+                extrema = img.getextrema()
+                if img.mode == 'L':
+                    extrema = (extrema,)
+                lut = _tone_lut(min(low for low, _ in extrema), max(high for _, high in extrema))
+                img = img.point(lut * len(img.getbands()))
+            elif img is source:
+                img = img.copy()
+        return img, metadata
+
+    def encode_jpeg(self, prepared, quality: int, preserve_metadata: bool) -> bytes:
+        img, metadata = prepared
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', quality=quality, progressive=False, subsampling=2, **metadata)
+        return buffer.getvalue()
+
+    def luma(self, prepared):
+        return np.asarray(prepared[0].convert('L'))
+
+    def decoded_luma(self, data: bytes):
+        with Image.open(io.BytesIO(data)) as img:
+            return np.asarray(img.convert('L'))
+
+    def encode(self, infile: Path, outfile: Path, output_format: str, quality: int,
+               preserve_metadata: bool, verbose: bool, resize: bool = False,
+               job_limits: Optional[Tuple[int, int]] = None) -> None:
+        # job_limits only applies to magick; each worker process runs one job at a time.
+        if output_format.lower() in ('jpg', 'jpeg'):
+            outfile.write_bytes(self.encode_jpeg(self.prepare(infile, output_format, preserve_metadata, resize),
+                                                 quality, preserve_metadata))
+            return
+
+        img, metadata = self.prepare(infile, output_format, preserve_metadata, resize)
+        if output_format.lower() == 'png':
+            # magick's PNG quality: the tens digit is the zlib level.
+            img.save(outfile, 'PNG', compress_level=min(9, quality // 10), **metadata)
+        else:
+            img.save(outfile, 'TIFF', **metadata)
+
+
+class VipsBackend:
+    # Same pipeline as PillowBackend on libvips, which shrinks JPEGs while
+    # decoding them and streams the rest.
+    name = 'vips'
+    in_process = True
+    errors = (pyvips.Error, OSError) if pyvips else (OSError,)
+    # Mostly streamed, but the target search renders the whole image.
+    bytes_per_pixel = 8
+
+    @staticmethod
+    def available() -> bool:
+        return pyvips is not None
+
+    def prepare(self, infile: Path, output_format: str, preserve_metadata: bool, resize: bool = False,
+                in_memory: bool = False):
+        # Builds the pipeline; in_memory renders it once for repeated encodes.
+        if resize:
+            image = pyvips.Image.thumbnail(str(infile), MAX_WIDTH, height=MAX_HEIGHT, size='down', no_rotate=True)
+        else:
+            image = pyvips.Image.new_from_file(str(infile))
+
+        if output_format.lower() in ('jpg', 'jpeg'):
+            if image.hasalpha():
+                image = image.extract_band(0, n=image.bands - 1)
+            if image.interpretation not in ('srgb', 'b-w'):
+                image = image.colourspace('srgb')
+            image = image.cast('uchar')
+            stats = image.stats()
+            lut = pyvips.Image.new_from_array([_tone_lut(int(stats(0, 0)[0]), int(stats(1, 0)[0]))])
+            image = image.maplut(lut.cast('uchar'))
+        return image.copy_memory() if in_memory else image
+
+    def encode_jpeg(self, image, quality: int, preserve_metadata: bool) -> bytes:
+        return image.jpegsave_buffer(Q=quality, interlace=False, subsample_mode='on', strip=not preserve_metadata)
+
+    def luma(self, image):
+        if image.bands > 1:
+            image = image.colourspace('b-w').extract_band(0)
+        return np.ndarray(buffer=image.write_to_memory(), dtype=np.uint8, shape=(image.height, image.width))
+
+    def decoded_luma(self, data: bytes):
+        return self.luma(pyvips.Image.jpegload_buffer(data))
+
+    def encode(self, infile: Path, outfile: Path, output_format: str, quality: int,
+               preserve_metadata: bool, verbose: bool, resize: bool = False,
+               job_limits: Optional[Tuple[int, int]] = None) -> None:
+        # job_limits only applies to magick; each worker process runs one job at a time.
+        image = self.prepare(infile, output_format, preserve_metadata, resize)
+        if output_format.lower() in ('jpg', 'jpeg'):
+            image.jpegsave(str(outfile), Q=quality, interlace=False, subsample_mode='on',
+                           strip=not preserve_metadata)
+        elif output_format.lower() == 'png':
+            image.pngsave(str(outfile), compression=min(9, quality // 10), interlace=False,
+                          strip=not preserve_metadata)
+        else:
+            image.tiffsave(str(outfile), strip=not preserve_metadata)
+
+
+# Preferred first; 'auto' picks the first one that is installed.
+BACKENDS = {'vips': VipsBackend, 'pillow': PillowBackend, 'magick': MagickBackend}
+_backend_instances = {}
+
+
+def get_backend(name: str):
+    if name not in _backend_instances:
+        _backend_instances[name] = BACKENDS[name]()
+    return _backend_instances[name]
+
+
+def resolve_backend(name: str, single_pass: bool) -> str:
+    if name != 'auto':
+        if not BACKENDS[name].available():
+            logging.error(colored(f"The {name} backend is not installed.", 'red'))
+            sys.exit(1)
+        return name
+    # The older multi-command pipeline only exists for magick.
+    if not single_pass:
+        return 'magick'
+    return next((backend for backend, cls in BACKENDS.items() if cls.available()), 'magick')
+
+
+def content_hash(path: Path) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while block := f.read(MANIFEST_HASH_BLOCK):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def manifest_settings(args: argparse.Namespace) -> str:
+    # Everything that changes the bytes of an output. Output names and
+    # overwrite mode do not, so they are left out.
+    return json.dumps({
+        'format': args.format,
+        'quality': args.quality,
+        'preserve_metadata': args.preserve_metadata,
+        'backend': args.backend,
+        'single_pass': args.single_pass or BACKENDS[args.backend].in_process,
+        'max_size': [MAX_WIDTH, MAX_HEIGHT],
+        'target_ssim': args.target_ssim,
+        'target_size': args.target_size,
+        'min_quality': args.min_quality if args.target_ssim or args.target_size else None,
+    }, sort_keys=True)
+
+
+class Manifest:
+    # SQLite record of what has been optimized, with two tables:
+    #   files:   path -> size, mtime_ns and content hash, so unchanged files are not re-read
+    #   results: (content hash, settings) -> the output that content produced, with role
+    #            'source', or role 'output' when the content is itself an output
+    # An input is done when its content was already a source whose output is
+    # still intact, or is an output (overwrite mode, or outputs without -IM).
+    # Only the main process writes; workers open read-only connections.
+
+    def __init__(self, path: Path, readonly: bool = False):
+        self.path = path
+        if readonly:
+            self._db = sqlite3.connect(f"{path.absolute().as_uri()}?mode=ro", uri=True,
+                                       check_same_thread=False)
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path))
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                content_hash TEXT NOT NULL,
+                settings TEXT NOT NULL,
+                role TEXT NOT NULL,
+                output_path TEXT NOT NULL,
+                output_hash TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (content_hash, settings)
+            );
+        """)
+        self._db.commit()
+        self._uncommitted = 0
+
+    def close(self) -> None:
+        self._db.commit()
+        self._db.close()
+
+    def known_hash(self, path: str, stat_result: os.stat_result) -> Optional[str]:
+        row = self._db.execute(
+            "SELECT size, mtime_ns, content_hash FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None or row[0] != stat_result.st_size or row[1] != stat_result.st_mtime_ns:
+            return None
+        return row[2]
+
+    def is_done(self, digest: str, settings: str) -> bool:
+        row = self._db.execute(
+            "SELECT role, output_path, output_hash FROM results WHERE content_hash = ? AND settings = ?",
+            (digest, settings),
+        ).fetchone()
+        if row is None:
+            return False
+        role, output_path, output_hash = row
+        if role == 'output':
+            return True
+        try:
+            output_stat = os.stat(output_path)
+        except OSError:
+            return False
+        known = self.known_hash(output_path, output_stat)
+        return (known or content_hash(Path(output_path))) == output_hash
+
+    def record(self, record: tuple, settings: str) -> None:
+        entries, result = record
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, content_hash, updated_at) VALUES (?, ?, ?, ?, ?)",
+            [(*entry, now) for entry in entries],
+        )
+        if result is not None:
+            source_hash, output_path, output_hash = result
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results (content_hash, settings, role, output_path, output_hash, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(source_hash, settings, 'source', output_path, output_hash, now),
+                 (output_hash, settings, 'output', output_path, output_hash, now)],
+            )
+        self._uncommitted += 1
+        if self._uncommitted >= MANIFEST_COMMIT_EVERY:
+            self._db.commit()
+            self._uncommitted = 0
+
+
+_worker_state = threading.local()
+
+
+def _worker_manifest(path: Path) -> Manifest:
+    # One read-only connection per worker thread or process.
+    if getattr(_worker_state, 'manifest', None) is None:
+        _worker_state.manifest = Manifest(path, readonly=True)
+    return _worker_state.manifest
+
+
 def collect_image_files(directory: Path, recursive: bool) -> List[Path]:
     extensions = ['*.jpg', '*.jpeg', '*.png', '*.tiff', '*.tif']
     files = []
@@ -360,12 +1025,23 @@ def print_header(args: argparse.Namespace, file_count: int) -> None:
     logging.info(colored("=" * 60, 'cyan'))
     logging.info(f"  Directory:   {args.dir.absolute()}")
     logging.info(f"  Format:      {args.format.upper()}")
-    logging.info(f"  Quality:     {args.quality}")
+    if args.target_ssim is not None or args.target_size is not None:
+        targets = [f"SSIM >= {args.target_ssim}"] if args.target_ssim is not None else []
+        if args.target_size is not None:
+            targets.append(f"<= {format_bytes(args.target_size)}")
+        logging.info(f"  Quality:     {args.min_quality}-{args.quality}, {' and '.join(targets)}")
+    else:
+        logging.info(f"  Quality:     {args.quality}")
     logging.info(f"  Threads:     {min(args.threads, MAX_THREADS)}")
+    budget = 'unlimited' if args.memory_budget is None else format_bytes(args.memory_budget)
+    logging.info(f"  Memory:      {budget}, largest images first")
     logging.info(f"  Recursive:   {'yes' if args.recursive else 'no'}")
     logging.info(f"  Overwrite:   {'yes' if args.overwrite else 'no'}")
     logging.info(f"  Metadata:    {'preserve' if args.preserve_metadata else 'strip'}")
     logging.info(f"  Append -IM:  {'no' if args.no_append_text else 'yes'}")
+    logging.info(f"  Backend:     {args.backend}")
+    logging.info(f"  Manifest:    {'off' if args.no_manifest else args.manifest}")
+    logging.info(f"  Pipeline:    {'single pass' if args.single_pass else 'identify, resize, encode'}")
     if args.dry_run:
         logging.info(colored("  Mode:        DRY RUN (no changes will be made)", 'yellow'))
     logging.info(f"  Images:      {file_count}")
@@ -387,10 +1063,70 @@ def print_summary(elapsed: float) -> None:
     logging.info("")
 
 
+def _benchmark_one(backend_name: str, infile: Path, outfile: Path, output_format: str, quality: int,
+                   preserve_metadata: bool) -> bool:
+    return _encode_image(get_backend(backend_name), infile, outfile, output_format, quality,
+                         preserve_metadata, False, resize=True)
+
+
+def run_benchmark(image_files: List[Path], args: argparse.Namespace) -> None:
+    sample = image_files[:BENCHMARK_IMAGES]
+    workers = min(args.threads, MAX_THREADS)
+    # Read everything once so the first backend does not pay for a cold cache.
+    for infile in sample:
+        infile.read_bytes()
+
+    logging.info(f"Benchmarking {len(sample)} images -> {args.format.upper()} q{args.quality}, {workers} workers")
+    for name, backend_class in BACKENDS.items():
+        if not backend_class.available():
+            logging.info(f"  {name:<8} not installed")
+            continue
+
+        pool_class = (concurrent.futures.ProcessPoolExecutor if backend_class.in_process
+                      else concurrent.futures.ThreadPoolExecutor)
+        with tempfile.TemporaryDirectory() as out_dir:
+            outfiles = [Path(out_dir) / f"{index}.{args.format}" for index in range(len(sample))]
+            start = time.perf_counter()
+            with pool_class(max_workers=workers) as executor:
+                results = list(executor.map(
+                    _benchmark_one, itertools.repeat(name), sample, outfiles, itertools.repeat(args.format),
+                    itertools.repeat(args.quality), itertools.repeat(args.preserve_metadata),
+                ))
+            elapsed = time.perf_counter() - start
+            output_bytes = sum(outfile.stat().st_size for outfile in outfiles if outfile.exists())
+
+        failed = results.count(False)
+        logging.info(
+            f"  {name:<8} {len(sample) / elapsed:8.1f} images/sec  {format_bytes(output_bytes):>10} written"
+            + (colored(f"  ({failed} failed)", 'red') if failed else "")
+        )
+
+
 def main() -> None:
     args = parse_arguments()
     setup_logging(args.logfile, args.verbose)
-    check_system_dependencies()
+    if not args.benchmark:
+        args.backend = resolve_backend(args.backend, args.single_pass)
+        if args.backend == 'magick':
+            check_system_dependencies()
+
+    if args.memory_budget is None:
+        args.memory_budget = default_memory_budget()
+
+    if args.target_ssim is not None or args.target_size is not None:
+        # Candidates are encoded in memory, which only the in-process backends can do.
+        if args.format != 'jpg':
+            logging.error(colored("--target-ssim and --target-size only apply to JPEG output.", 'red'))
+            sys.exit(1)
+        if not args.benchmark and not BACKENDS[args.backend].in_process:
+            logging.error(colored("--target-ssim and --target-size need the vips or pillow backend.", 'red'))
+            sys.exit(1)
+        if args.target_ssim is not None and np is None:
+            logging.error(colored("--target-ssim needs numpy (pip install numpy).", 'red'))
+            sys.exit(1)
+        if not 1 <= args.min_quality <= args.quality:
+            logging.error(colored(f"--min-quality must be between 1 and -q ({args.quality}).", 'red'))
+            sys.exit(1)
 
     if not args.dir.is_dir():
         logging.error(colored(f"Directory does not exist: {args.dir}", 'red'))
@@ -402,28 +1138,77 @@ def main() -> None:
         logging.info(colored("No image files found.", 'yellow'))
         sys.exit(0)
 
+    if args.benchmark:
+        run_benchmark(image_files, args)
+        return
+
     _progress['total'] = len(image_files)
     print_header(args, len(image_files))
 
     start_time = time.time()
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=min(args.threads, MAX_THREADS)) as executor:
-        futures = {
-            executor.submit(
+    manifest = None
+    settings = manifest_settings(args)
+    if not args.no_manifest:
+        try:
+            manifest = Manifest(args.manifest)
+        except (OSError, sqlite3.Error) as e:
+            logging.error(colored(f"Cannot open manifest {args.manifest}, continuing without it: {e}", 'red'))
+
+    # Skip files whose size and mtime match a manifest entry without reading them.
+    if manifest is not None and not args.force:
+        pending = []
+        for infile in image_files:
+            try:
+                digest = manifest.known_hash(os.path.abspath(infile), infile.stat())
+            except OSError:
+                digest = None
+            if digest is None or not manifest.is_done(digest, settings):
+                pending.append(infile)
+        unchanged = len(image_files) - len(pending)
+        if unchanged:
+            _progress['skipped'] += unchanged
+            logging.info(colored(f"  Skipped {unchanged} unchanged images already in the manifest.", 'blue'))
+        image_files = pending
+
+    # In-process engines hold the GIL for much of their work, so they get processes;
+    # magick subprocesses only need threads to wait on them.
+    if BACKENDS[args.backend].in_process:
+        pool_class = concurrent.futures.ProcessPoolExecutor
+    else:
+        pool_class = concurrent.futures.ThreadPoolExecutor
+
+    workers = min(args.threads, MAX_THREADS)
+    estimates = {}
+    if not args.dry_run and image_files:
+        bytes_per_pixel = BACKENDS[args.backend].bytes_per_pixel
+        estimates = {infile: pixels * bytes_per_pixel
+                     for infile, pixels in read_pixel_counts(image_files, workers).items()}
+
+    with pool_class(max_workers=workers) as executor:
+        def submit(infile: Path, estimate: int, threads: int) -> concurrent.futures.Future:
+            return executor.submit(
                 process_image,
                 infile, args.overwrite, args.verbose, args.no_append_text,
                 args.format, args.quality, args.backup, args.preserve_metadata,
-                args.recursive, args.dir, args.dry_run,
-            ): infile
-            for infile in image_files
-        }
-        for future in concurrent.futures.as_completed(futures):
-            infile = futures[future]
+                args.recursive, args.dir, args.dry_run, args.single_pass, args.backend,
+                args.manifest if manifest is not None else None, settings, args.force,
+                args.target_ssim, args.target_size, args.min_quality, (estimate, threads),
+            )
+
+        for infile, future in schedule_jobs(image_files, estimates, workers, args.memory_budget, submit):
             try:
-                future.result()
+                status, saved, record = future.result()
             except Exception as e:
                 logging.error(colored(f"  Unhandled error processing {infile.name}: {e}", 'red'))
                 update_progress('failed')
+                continue
+            update_progress(status, saved)
+            if record is not None and manifest is not None and not args.dry_run:
+                manifest.record(record, settings)
+
+    if manifest is not None:
+        manifest.close()
 
     # Clear the progress bar line
     sys.stdout.write('\r' + ' ' * 100 + '\r')
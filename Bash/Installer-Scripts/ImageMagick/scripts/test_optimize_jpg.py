@@ -0,0 +1,21 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'optimize-jpg.py')
+spec = importlib.util.spec_from_file_location('optimize_jpg', SCRIPT)
+optimize_jpg = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(optimize_jpg)
+
+
+def test_help_renders(monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['optimize-jpg.py', '--help'])
+    with pytest.raises(SystemExit) as exit_info:
+        optimize_jpg.parse_arguments()
+
+    assert exit_info.value.code == 0
+    help_text = ' '.join(capsys.readouterr().out.split())
+    assert '--memory-budget' in help_text
+    assert f'{optimize_jpg.MEMORY_BUDGET_SHARE * 100:.0f}% of available memory' in help_text
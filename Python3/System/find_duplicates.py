@@ -1,18 +1,42 @@
 #!/usr/bin/env python3
 
 import argparse
-import cv2
+import contextlib
+import fcntl
+import functools
 import hashlib
-import mimetypes
+import itertools
 import multiprocessing
 import os
+import math
+import mmap
+import shutil
 import signal
+import sqlite3
+import stat
+import subprocess
 import sys
+import threading
+import time
 from collections import defaultdict
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from PIL import Image
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from tqdm import tqdm
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 # Global flag to indicate if the script should exit
 should_exit = False
 
@@ -21,57 +45,315 @@ def signal_handler(signum, frame):
     should_exit = True
     print("\nCtrl+C pressed. Gracefully exiting...")
 
-def get_file_signature(file_path):
-    """Get a quick signature of the file based on its type."""
-    mime_type, _ = mimetypes.guess_type(file_path)
-    file_size = os.path.getsize(file_path)
-    
-    if mime_type and mime_type.startswith('video'):
-        return get_video_signature(file_path, file_size)
-    elif mime_type and mime_type.startswith('image'):
-        return get_image_signature(file_path, file_size)
-    else:
-        return get_partial_hash(file_path, file_size)
+# get_partial_hash reads three chunks of this size: the start, middle and end.
+PARTIAL_CHUNK_SIZE = 65536
+# Files up to this size are read in full by get_partial_hash, so for them the
+# partial hash already identifies the whole content and no full hash is needed.
+PARTIAL_HASH_COVERS_FILE = 3 * PARTIAL_CHUNK_SIZE
+FULL_HASH_BLOCK_SIZE = 1024 * 1024
+# Content hashes. Duplicate detection needs speed, not cryptographic
+# strength: xxh3 is used when xxhash is installed, BLAKE2b otherwise.
+# --benchmark compares them all.
+HASH_FUNCTIONS = {
+    'md5': lambda: hashlib.md5(usedforsecurity=False),
+    'sha1': lambda: hashlib.sha1(usedforsecurity=False),
+    'blake2b': lambda: hashlib.blake2b(digest_size=16),
+}
+if xxhash is not None:
+    HASH_FUNCTIONS['xxh64'] = xxhash.xxh64
+    HASH_FUNCTIONS['xxh3_128'] = xxhash.xxh3_128
+HASH_NAME = 'xxh3_128' if xxhash is not None else 'blake2b'
+# Ways get_full_hash can read a file; readinto reuses one buffer per thread.
+READ_STRATEGIES = ('read', 'readinto', 'mmap')
+FULL_HASH_STRATEGY = 'readinto'
+# Hashing runs in threads, since both the reads and the hashing release the
+# GIL. Storage type -> (threads, full-hash read size): SSDs need many reads in
+# flight, while disks need few streams with long reads to limit seeking.
+IO_PROFILES = {'ssd': (16, 1024 * 1024), 'hdd': (2, 8 * 1024 * 1024)}
+# --benchmark reads at most this much, and tries these thread counts.
+BENCHMARK_BYTES = 1024 * 1024 * 1024
+BENCHMARK_THREADS = (1, 2, 4, 8, 16)
+# Files per worker task, and tasks queued per worker. Together they bound how
+# much work is in flight, so memory does not grow with the size of the tree.
+HASH_CHUNK_SIZE = 64
+MAX_PENDING_CHUNKS_PER_WORKER = 4
+# Persistent hash cache. Rows are keyed by (device, inode, hash kind) and are
+# only trusted while the file's size and mtime still match; a kind names the
+# algorithm and its parameters, so changing either simply misses the old rows.
+DEFAULT_CACHE_PATH = os.path.expanduser(
+    os.environ.get("FIND_DUPLICATES_CACHE", "~/.cache/find_duplicates/hashes.sqlite3"))
+CACHE_MAX_AGE_DAYS = 90
+CACHE_FLUSH_ROWS = 1000
+# Near-duplicate mode (--similar). Perceptual hashes are 64 bits; a video gets
+# one hash per sampled frame, and two files are similar when every pair of
+# corresponding hashes differs in at most the given number of bits.
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tif', '.tiff', '.webp', '.heic'}
+VIDEO_EXTENSIONS = {'.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.mpg', '.mpeg', '.ts'}
+DEFAULT_SIMILARITY_RADIUS = 6
+VIDEO_SAMPLE_FRAMES = 5
+# Decoding is far slower than hashing bytes, so perceptual tasks are smaller.
+PERCEPTUAL_HASH_CHUNK_SIZE = 8
+# Hashes looked up per vectorised batch when searching for similar pairs.
+SIMILAR_QUERY_BATCH = 65536
+# --link. FICLONE is _IOW(0x94, 9, int) from linux/fs.h; it makes the
+# destination share the source's extents on btrfs, XFS and similar.
+FICLONE = 0x40049409
+LINK_CHUNK_SIZE = 16
+LINK_TEMP_SUFFIX = ".dedupe-tmp"
+# Blocks up to this many bits are looked up through a dense table of buckets.
+BUCKET_TABLE_MAX_BITS = 22
 
-def get_video_signature(file_path, file_size):
-    """Get a signature for video files using metadata and partial content."""
-    try:
-        video = cv2.VideoCapture(file_path)
-        fps = video.get(cv2.CAP_PROP_FPS)
-        frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
-        width = int(video.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        video.release()
-        
-        # Combine metadata with partial hash
-        partial_hash = get_partial_hash(file_path, file_size)
-        return f"{file_size}_{fps}_{frame_count}_{width}_{height}_{partial_hash}"
-    except Exception:
-        return get_partial_hash(file_path, file_size)
-
-def get_image_signature(file_path, file_size):
-    """Get a signature for image files using metadata and partial content."""
+class HashCache:
+    """SQLite store of file hashes that survives between runs.
+
+    A file is identified by (st_dev, st_ino, st_size, st_mtime_ns), so renames
+    and moves within a filesystem keep their cached hashes, while any write
+    that changes the size or mtime makes the old row a miss. Rows that no run
+    has used for CACHE_MAX_AGE_DAYS are evicted. Writes and last-seen updates
+    are buffered and committed in batches.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, rebuild=False):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS hashes (
+                dev INTEGER NOT NULL,
+                ino INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                value TEXT NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (dev, ino, kind)
+            ) WITHOUT ROWID
+        """)
+        if rebuild:
+            self._db.execute("DELETE FROM hashes")
+        self._db.commit()
+        self._now = time.time()
+        self._pending_puts = []
+        self._pending_touches = []
+        self.hits = self.misses = 0
+
+    def get(self, file_id, kind):
+        """Return the cached hash for file_id, or None if it is missing or stale."""
+        dev, ino, size, mtime_ns = file_id
+        row = self._db.execute(
+            "SELECT size, mtime_ns, value FROM hashes WHERE dev = ? AND ino = ? AND kind = ?",
+            (dev, ino, kind)).fetchone()
+        if row is None or row[0] != size or row[1] != mtime_ns:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._pending_touches.append((self._now, dev, ino, kind))
+        if len(self._pending_touches) >= CACHE_FLUSH_ROWS:
+            self.flush()
+        return row[2]
+
+    def put(self, file_id, kind, value):
+        """Record a hash for file_id, replacing any stale row for the same inode."""
+        dev, ino, size, mtime_ns = file_id
+        self._pending_puts.append((dev, ino, kind, size, mtime_ns, value, self._now))
+        if len(self._pending_puts) >= CACHE_FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        """Commit buffered writes."""
+        if self._pending_puts:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO hashes (dev, ino, kind, size, mtime_ns, value, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", self._pending_puts)
+        if self._pending_touches:
+            self._db.executemany(
+                "UPDATE hashes SET last_seen = ? WHERE dev = ? AND ino = ? AND kind = ?",
+                self._pending_touches)
+        self._db.commit()
+        self._pending_puts.clear()
+        self._pending_touches.clear()
+
+    def evict_stale(self, max_age_days=CACHE_MAX_AGE_DAYS):
+        """Delete rows no run has used for max_age_days and return how many went."""
+        self.flush()
+        cursor = self._db.execute("DELETE FROM hashes WHERE last_seen < ?",
+                                  (self._now - max_age_days * 86400,))
+        self._db.commit()
+        return cursor.rowcount
+
+    def close(self):
+        """Flush pending writes and close the database."""
+        try:
+            self.flush()
+        finally:
+            self._db.close()
+
+_thread_buffers = threading.local()
+
+def thread_buffer(size):
+    """Return this thread's reusable read buffer of the given size."""
+    buffers = _thread_buffers.__dict__
+    if size not in buffers:
+        buffers[size] = bytearray(size)
+    return buffers[size]
+
+def get_partial_hash(file_path, file_size, hash_name=HASH_NAME):
+    """Hash the first, middle and last PARTIAL_CHUNK_SIZE bytes of a file."""
+    hasher = HASH_FUNCTIONS[hash_name]()
+    buffer = thread_buffer(PARTIAL_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(file_path, 'rb', buffering=0) as f:
+        for offset in (0, max(0, file_size // 2 - PARTIAL_CHUNK_SIZE // 2), max(0, file_size - PARTIAL_CHUNK_SIZE)):
+            f.seek(offset)
+            hasher.update(view[:f.readinto(buffer)])
+    return hasher.hexdigest()
+
+def get_full_hash(file_path, file_size=None, block_size=FULL_HASH_BLOCK_SIZE,
+                  strategy=FULL_HASH_STRATEGY, hash_name=HASH_NAME):
+    """Hash the whole file.
+
+    The default strategy reads block_size at a time into a buffer reused by
+    the thread, so large files cost no allocations; 'mmap' hashes a mapping
+    of the file and 'read' allocates a new bytes object per block.
+    """
+    hasher = HASH_FUNCTIONS[hash_name]()
+    with open(file_path, 'rb', buffering=0) as f:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        if strategy == 'mmap':
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mapped, 'madvise'):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    hasher.update(mapped)
+        elif strategy == 'read':
+            while chunk := f.read(block_size):
+                hasher.update(chunk)
+        else:
+            buffer = thread_buffer(block_size)
+            view = memoryview(buffer)
+            while count := f.readinto(buffer):
+                hasher.update(view[:count])
+    return hasher.hexdigest()
+
+def detect_storage(path):
+    """Return 'hdd' if path is on a rotational disk, otherwise 'ssd'.
+
+    Reads the block device's queue/rotational flag from sysfs, checking the
+    parent device for partitions. Anything without one (network and virtual
+    filesystems, non-Linux systems) is treated as 'ssd'.
+    """
     try:
-        with Image.open(file_path) as img:
-            width, height = img.size
-            format = img.format
-        
-        # Combine metadata with partial hash
-        partial_hash = get_partial_hash(file_path, file_size)
-        return f"{file_size}_{width}_{height}_{format}_{partial_hash}"
-    except Exception:
-        return get_partial_hash(file_path, file_size)
-
-def get_partial_hash(file_path, file_size):
-    """Calculate a partial MD5 hash of a file."""
+        dev = os.stat(path).st_dev
+        device_dir = os.path.realpath(f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}")
+        for candidate in (device_dir, os.path.dirname(device_dir)):
+            flag = os.path.join(candidate, 'queue', 'rotational')
+            if os.path.exists(flag):
+                with open(flag) as f:
+                    return 'hdd' if f.read().strip() == '1' else 'ssd'
+    except OSError:
+        pass
+    return 'ssd'
+
+def get_folder_size_key(dir_path):
+    """Return (file count, total bytes) for a folder tree, a cheap pre-filter for folder duplicates."""
+    count = total = 0
+    for root, _dirs, files in os.walk(dir_path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+            count += 1
+    return count, total
+
+def get_folder_signature(dir_path, file_size=None):
+    """Hash a folder tree's relative paths and full file contents."""
     hasher = hashlib.md5(usedforsecurity=False)
-    with open(file_path, 'rb') as f:
-        # Read first 64KB, middle 64KB, and last 64KB
-        for offset in (0, max(0, file_size // 2 - 32768), max(0, file_size - 65536)):
-            f.seek(offset)
-            hasher.update(f.read(65536))
+    for root, dirs, files in os.walk(dir_path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            hasher.update(os.path.relpath(file_path, dir_path).encode('utf-8', 'surrogateescape'))
+            hasher.update(b'\0')
+            hasher.update(get_full_hash(file_path).encode())
     return hasher.hexdigest()
 
+def decode_gray(file_path, width, height, seek_seconds=None):
+    """Decode an image, or the video frame at seek_seconds, to a height x width grayscale array.
+
+    Pillow is used for images when it is installed; everything else goes
+    through ffmpeg, which scales the frame before handing it over.
+    """
+    if seek_seconds is None and Image is not None:
+        # Oversized and malformed images are reported as unreadable like any other file.
+        try:
+            with Image.open(file_path) as img:
+                img = img.convert('L').resize((width, height), Image.Resampling.LANCZOS)
+                return np.asarray(img, dtype=np.float64)
+        except (Image.DecompressionBombError, ValueError) as e:
+            raise OSError(f"cannot decode {file_path}: {e}") from e
+
+    command = ['ffmpeg', '-v', 'error', '-nostdin']
+    if seek_seconds is not None:
+        command += ['-ss', f'{seek_seconds:.3f}']
+    command += ['-i', file_path, '-frames:v', '1', '-vf', f'scale={width}:{height}:flags=area,format=gray',
+                '-f', 'rawvideo', '-']
+    result = subprocess.run(command, capture_output=True)
+    if result.returncode != 0 or len(result.stdout) < width * height:
+        message = result.stderr.decode(errors='replace').strip() or 'no frame decoded'
+        raise OSError(f"ffmpeg could not decode {file_path}: {message}")
+    pixels = np.frombuffer(result.stdout[:width * height], dtype=np.uint8)
+    return pixels.reshape(height, width).astype(np.float64)
+
+def get_video_duration(file_path):
+    """Return a video's duration in seconds, as reported by ffprobe."""
+    result = subprocess.run(['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+                             '-of', 'default=noprint_wrappers=1:nokey=1', file_path],
+                            capture_output=True, text=True)
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        raise OSError(f"ffprobe could not read the duration of {file_path}: {result.stderr.strip()}") from None
+
+def bits_to_int(bits):
+    """Pack a boolean array of 64 bits into an integer, first bit most significant."""
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def dhash(pixels):
+    """Difference hash of a 8 x 9 image: whether each pixel is brighter than its left neighbour."""
+    return bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+@functools.lru_cache(maxsize=None)
+def dct_matrix(n):
+    """Orthonormal DCT-II matrix of size n."""
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+def phash(pixels):
+    """DCT hash of a 32 x 32 image: whether each low-frequency coefficient is above their median."""
+    matrix = dct_matrix(len(pixels))
+    low = (matrix @ pixels @ matrix.T)[:8, :8].ravel()
+    # The DC term only tracks overall brightness, so it is left out of the median.
+    return bits_to_int(low > np.median(low[1:]))
+
+# name -> (hash function, decode width, decode height)
+PERCEPTUAL_HASHES = {'dhash': (dhash, 9, 8), 'phash': (phash, 32, 32)}
+
+def get_perceptual_hash(file_path, file_size=None, algorithm='dhash'):
+    """Return comma-separated hex perceptual hashes: one for an image, one per sampled frame for a video."""
+    hash_pixels, width, height = PERCEPTUAL_HASHES[algorithm]
+    if os.path.splitext(file_path)[1].lower() in VIDEO_EXTENSIONS:
+        duration = get_video_duration(file_path)
+        seeks = [duration * (i + 0.5) / VIDEO_SAMPLE_FRAMES for i in range(VIDEO_SAMPLE_FRAMES)]
+    else:
+        seeks = [None]
+    return ','.join(f"{hash_pixels(decode_gray(file_path, width, height, seek)):016x}" for seek in seeks)
+
 def find_files(directory, file_types):
     """Recursively find files in the given directory with specified file types."""
     for root, dirs, files in os.walk(directory):
@@ -83,28 +365,394 @@ def find_files(directory, file_types):
             if not file_types or any(file.endswith(ft) for ft in file_types if ft != 'folder'):
                 yield os.path.join(root, file)
 
-def find_duplicates(directory, file_types):
-    """Find duplicate files using parallel processing."""
-    files = list(find_files(directory, file_types))
-    
-    # Use half of the available logical CPU cores
-    num_workers = max(1, multiprocessing.cpu_count() // 2)
-    
-    duplicates = defaultdict(list)
-    
-    with ProcessPoolExecutor(max_workers=num_workers) as executor:
-        futures = [executor.submit(get_file_signature, file) for file in files]
-        
-        for file, future in tqdm(zip(files, as_completed(futures)), total=len(files), desc="Scanning files", unit="file"):
+def group_by_size(paths, file_ids=None):
+    """Group paths by size (or folder shape), keeping only groups that could hold duplicates.
+
+    If file_ids is a dict, it is filled with (dev, inode, size, mtime_ns) for
+    every file that ends up in a returned group, for use as hash cache keys.
+    """
+    groups = defaultdict(list)
+    for path in paths:
+        if should_exit:
+            return None
+        try:
+            if os.path.isdir(path):
+                key = ('folder',) + get_folder_size_key(path)
+                file_id = None
+            else:
+                st = os.stat(path)
+                key = (st.st_size,)
+                file_id = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        except OSError as e:
+            print(f"Skipping {path}: {e}", file=sys.stderr)
+            continue
+        groups[key].append((path, file_id))
+
+    candidates = {}
+    for key, group in groups.items():
+        if len(group) > 1:
+            candidates[key] = [path for path, _file_id in group]
+            if file_ids is not None:
+                file_ids.update((path, file_id) for path, file_id in group if file_id is not None)
+    return candidates
+
+def hash_chunk(hash_file, tasks):
+    """Hash a batch of (key, path) tasks in a worker.
+
+    Each result carries its own key and path, so results can be consumed in
+    any completion order without being attached to the wrong file.
+    """
+    results = []
+    for key, path in tasks:
+        try:
+            results.append((key, path, hash_file(path, key[0]), None))
+        except OSError as e:
+            results.append((key, path, None, e))
+    return results
+
+def iter_chunk_results(executor, fn, items, num_workers, chunk_size=HASH_CHUNK_SIZE):
+    """Yield fn(chunk) for consecutive chunks of items, with a bounded number in flight."""
+    items = iter(items)
+    max_pending = num_workers * MAX_PENDING_CHUNKS_PER_WORKER
+    pending = set()
+    while True:
+        while len(pending) < max_pending:
+            chunk = list(itertools.islice(items, chunk_size))
+            if not chunk:
+                break
+            pending.add(executor.submit(fn, chunk))
+        if not pending:
+            return
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+def iter_hashes(groups, executor, num_workers, desc, hash_file, chunk_size=HASH_CHUNK_SIZE,
+                cache=None, cache_kind=None, file_ids=None):
+    """Yield (key, path, hash) for every file in groups, in completion order.
+
+    hash_file(path, size) runs in the worker pool, with size taken from the
+    first element of the group key. With a cache, files whose file_ids entry
+    has a cached hash of cache_kind are never sent to the pool, and newly
+    computed hashes are stored. Stops early if the scan is interrupted.
+    """
+    total = sum(len(paths) for paths in groups.values())
+    cached = []
+
+    with tqdm(total=total, desc=desc, unit="file") as progress_bar:
+        def uncached_tasks():
+            for key, paths in groups.items():
+                for path in paths:
+                    file_id = file_ids.get(path) if cache is not None else None
+                    cached_hash = cache.get(file_id, cache_kind) if file_id is not None else None
+                    if cached_hash is not None:
+                        cached.append((key, path, cached_hash))
+                    else:
+                        yield key, path
+
+        results = iter_chunk_results(executor, functools.partial(hash_chunk, hash_file),
+                                     uncached_tasks(), num_workers, chunk_size)
+        for chunk_results in itertools.chain(results, [[]]):
+            if should_exit:
+                executor.shutdown(wait=False, cancel_futures=True)
+                return
+
+            # Cache hits are collected while the task generator is consumed.
+            yield from cached
+            progress_bar.update(len(cached))
+            cached.clear()
+
+            for key, path, file_hash, error in chunk_results:
+                if error is not None:
+                    print(f"Skipping {path}: {error}", file=sys.stderr)
+                    continue
+                if cache is not None and path in file_ids:
+                    cache.put(file_ids[path], cache_kind, file_hash)
+                yield key, path, file_hash
+            progress_bar.update(len(chunk_results))
+
+def refine_groups(groups, executor, num_workers, desc, hash_file, chunk_size=HASH_CHUNK_SIZE,
+                  cache=None, cache_kind=None, file_ids=None):
+    """Hash every file in the candidate groups and split each group by hash.
+
+    See iter_hashes for the arguments. Groups left with a single file are
+    dropped, so later stages never open files that cannot be duplicates.
+    """
+    refined = defaultdict(list)
+    for key, path, file_hash in iter_hashes(groups, executor, num_workers, desc, hash_file, chunk_size,
+                                            cache, cache_kind, file_ids):
+        refined[key + (file_hash,)].append(path)
+    if should_exit:
+        return None
+
+    return {key: paths for key, paths in refined.items() if len(paths) > 1}
+
+def find_duplicates(directory, file_types, cache=None, storage='ssd', io_threads=None, hash_name=HASH_NAME):
+    """Find duplicate files with a staged size -> partial hash -> full hash pipeline.
+
+    Only files that share a size are opened at all, and only files that also
+    share a partial hash are read in full. With a HashCache, files hashed by an
+    earlier run are not opened again unless they have changed. storage picks
+    the thread count and read size from IO_PROFILES; io_threads overrides the
+    thread count. hash_name picks the content hash from HASH_FUNCTIONS.
+    """
+    file_ids = {}
+    size_groups = group_by_size(find_files(directory, file_types), file_ids)
+    if size_groups is None:
+        return None
+
+    file_groups = {key: paths for key, paths in size_groups.items() if key[0] != 'folder'}
+    folder_groups = {key: paths for key, paths in size_groups.items() if key[0] == 'folder'}
+    candidates = sum(len(paths) for paths in file_groups.values())
+    print(f"{candidates} files share a size with another file.")
+
+    num_workers, block_size = IO_PROFILES[storage]
+    num_workers = io_threads or num_workers
+    partial_hash = functools.partial(get_partial_hash, hash_name=hash_name)
+    full_hash = functools.partial(get_full_hash, block_size=block_size, hash_name=hash_name)
+
+    duplicates = {}
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        partial_groups = refine_groups(file_groups, executor, num_workers, "Partial hashing", partial_hash,
+                                       cache=cache, cache_kind=f"{hash_name}-partial-{PARTIAL_CHUNK_SIZE}",
+                                       file_ids=file_ids)
+        if partial_groups is None:
+            return None
+
+        # Files small enough to be covered by the partial hash are already confirmed.
+        full_candidates = {}
+        for (size, partial_hash), paths in partial_groups.items():
+            if size <= PARTIAL_HASH_COVERS_FILE:
+                duplicates[f"{size}_{partial_hash}"] = paths
+            else:
+                full_candidates[(size, partial_hash)] = paths
+
+        full_groups = refine_groups(full_candidates, executor, num_workers, "Full hashing", full_hash,
+                                    cache=cache, cache_kind=f"{hash_name}-full", file_ids=file_ids)
+        if full_groups is None:
+            return None
+        for (size, _partial_hash, full_hash), paths in full_groups.items():
+            duplicates[f"{size}_{full_hash}"] = paths
+
+        folder_matches = refine_groups(folder_groups, executor, num_workers, "Hashing folders",
+                                       get_folder_signature, chunk_size=1)
+        if folder_matches is None:
+            return None
+        for (_kind, _count, _total, folder_hash), paths in folder_matches.items():
+            duplicates[f"folder_{folder_hash}"] = paths
+
+    return duplicates
+
+def popcount64(values):
+    """Count the set bits of each element of a uint64 array."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+def choose_hash_blocks(count, radius):
+    """Pick how many blocks to split 64-bit hashes into for find_similar_pairs.
+
+    More blocks mean a smaller per-block radius and fewer bit-flip lookups,
+    but shorter blocks whose buckets hold more unrelated hashes. This picks
+    the split with the lowest estimated cost, where a lookup costs about as
+    much as two candidate comparisons.
+    """
+    def cost(blocks):
+        bits = 64 // blocks
+        lookups = sum(math.comb(bits, k) for k in range(radius // blocks + 1))
+        return blocks * lookups * (2 + count / 2 ** bits)
+    return min(range(1, min(radius + 1, 16) + 1), key=cost)
+
+def find_similar_pairs(hashes, radius):
+    """Return an (m, 2) array of index pairs i < j whose hash rows are all within radius bits.
+
+    hashes is an (n, frames) uint64 array. Pairs are found with multi-index
+    hashing on the middle column: it is split into blocks, and any two hashes
+    within radius bits agree to within radius // blocks bits on at least one
+    block. For each block, every hash looks up the bucket of each block value
+    within that smaller radius, and only those candidates are compared in
+    full, so the work grows far slower than n squared.
+    """
+    count, frames = hashes.shape
+    found = [np.empty((0, 2), dtype=np.int64)]
+    if count < 2:
+        return found[0]
+
+    indexed = np.ascontiguousarray(hashes[:, frames // 2])
+    blocks = choose_hash_blocks(count, radius)
+    bounds = [64 * i // blocks for i in range(blocks + 1)]
+    for start, end in zip(bounds, bounds[1:]):
+        bits = end - start
+        values = (indexed >> np.uint64(start)) & np.uint64((1 << bits) - 1)
+        order = np.argsort(values, kind='stable')
+        flips = np.array([sum(1 << bit for bit in flipped)
+                          for k in range(radius // blocks + 1)
+                          for flipped in itertools.combinations(range(bits), k)], dtype=np.uint64)
+
+        # Buckets are runs of equal values in sorted order. Short blocks get a
+        # direct table of bucket starts and sizes; long ones use binary search.
+        if bits <= BUCKET_TABLE_MAX_BITS:
+            bucket_sizes = np.bincount(values.astype(np.int64), minlength=1 << bits)
+            bucket_starts = np.cumsum(bucket_sizes) - bucket_sizes
+            def find_buckets(keys):
+                keys = keys.astype(np.int64)
+                return bucket_starts[keys], bucket_sizes[keys]
+        else:
+            sorted_values = values[order]
+            def find_buckets(keys):
+                left = np.searchsorted(sorted_values, keys, side='left')
+                return left, np.searchsorted(sorted_values, keys, side='right') - left
+
+        batch_size = max(1, SIMILAR_QUERY_BATCH // len(flips))
+        for batch_start in range(0, count, batch_size):
             if should_exit:
-                executor.shutdown(wait=False)
                 return None
-            
-            file_signature = future.result()
-            if file_signature:
-                duplicates[file_signature].append(file)
-    
-    return {sig: paths for sig, paths in duplicates.items() if len(paths) > 1}
+            queries = np.arange(batch_start, min(count, batch_start + batch_size))
+            left, matches = find_buckets((values[queries, None] ^ flips[None, :]).ravel())
+            total = int(matches.sum())
+            if not total:
+                continue
+            # Expand each lookup's run of sorted positions into candidate pairs.
+            first = np.repeat(np.repeat(queries, len(flips)), matches)
+            offsets = np.arange(total) - np.repeat(np.cumsum(matches) - matches, matches)
+            second = order[np.repeat(left, matches) + offsets]
+            keep = first < second
+            first, second = first[keep], second[keep]
+            distance = popcount64(hashes[first] ^ hashes[second]).max(axis=1)
+            close = distance <= radius
+            found.append(np.stack([first[close], second[close]], axis=1))
+
+    # A pair close on several blocks is found once per block.
+    return np.unique(np.concatenate(found), axis=0)
+
+def connected_components(count, pairs):
+    """Group indices 0..count-1 joined by pairs, returning only groups of two or more."""
+    parent = list(range(count))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs.tolist():
+        parent[root(i)] = root(j)
+
+    components = defaultdict(list)
+    for i in range(count):
+        components[root(i)].append(i)
+    return [members for members in components.values() if len(members) > 1]
+
+def collect_media(paths, file_ids):
+    """Split paths into image and video groups, recording hash cache keys in file_ids."""
+    media = defaultdict(list)
+    for path in paths:
+        if should_exit:
+            return None
+        extension = os.path.splitext(path)[1].lower()
+        if extension in IMAGE_EXTENSIONS:
+            kind = 'image'
+        elif extension in VIDEO_EXTENSIONS:
+            kind = 'video'
+        else:
+            continue
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            print(f"Skipping {path}: {e}", file=sys.stderr)
+            continue
+        # Directories named like media files, FIFOs and devices are not decoded.
+        if stat.S_ISREG(st.st_mode):
+            file_ids[path] = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+            media[(kind,)].append(path)
+    return media
+
+def find_similar(directory, file_types, radius=DEFAULT_SIMILARITY_RADIUS, algorithm='dhash', cache=None):
+    """Find visually similar images and videos by comparing perceptual hashes.
+
+    Catches re-encoded, resized and recompressed copies that byte comparison
+    misses. Similarity is transitive here: files joined by a chain of close
+    pairs end up in one group, largest file first.
+    """
+    file_ids = {}
+    media = collect_media(find_files(directory, file_types), file_ids)
+    if media is None:
+        return None
+    print(f"{sum(len(paths) for paths in media.values())} images and videos to compare.")
+
+    num_workers = max(1, multiprocessing.cpu_count() // 2)
+    hash_file = functools.partial(get_perceptual_hash, algorithm=algorithm)
+    cache_kind = f"{algorithm}-{VIDEO_SAMPLE_FRAMES}"
+
+    # Rows are grouped by media kind and frame count, so every matrix is rectangular.
+    hashed = defaultdict(lambda: ([], []))
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        for (kind,), path, value in iter_hashes(media, executor, num_workers, "Perceptual hashing", hash_file,
+                                                PERCEPTUAL_HASH_CHUNK_SIZE, cache, cache_kind, file_ids):
+            frame_hashes = [int(frame_hash, 16) for frame_hash in value.split(',')]
+            paths, rows = hashed[(kind, len(frame_hashes))]
+            paths.append(path)
+            rows.append(frame_hashes)
+    if should_exit:
+        return None
+
+    similar = {}
+    for (kind, _frames), (paths, rows) in hashed.items():
+        pairs = find_similar_pairs(np.array(rows, dtype=np.uint64), radius)
+        if pairs is None:
+            return None
+        for number, members in enumerate(connected_components(len(paths), pairs), 1):
+            group = sorted((paths[i] for i in members), key=lambda path: file_ids[path][2], reverse=True)
+            similar[f"similar_{kind}_{number}"] = group
+    return similar
+
+def benchmark_hashing(directory, file_types):
+    """Print full-hash throughput in GB/s for each hash, read strategy and thread count.
+
+    Reads up to BENCHMARK_BYTES of the largest matching files. They are read
+    once beforehand, so unless they exceed the page cache the numbers compare
+    hashing and copying rather than the disk.
+    """
+    files = []
+    for path in find_files(directory, [ft for ft in file_types if ft != 'folder']):
+        try:
+            if os.path.isfile(path):
+                files.append((os.path.getsize(path), path))
+        except OSError:
+            continue
+    files.sort(reverse=True)
+    selected, total = [], 0
+    for size, path in files:
+        if total >= BENCHMARK_BYTES:
+            break
+        selected.append(path)
+        total += size
+    if not total:
+        print("No files to benchmark.")
+        return
+
+    for path in selected:
+        get_full_hash(path, hash_name='md5')
+    print(f"Hashing {len(selected)} files, {total / 1e9:.2f} GB, storage looks like {detect_storage(directory)}.")
+
+    def measure(hash_file, threads):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(hash_file, selected))
+        return total / 1e9 / (time.perf_counter() - start)
+
+    print(f"\n{'hash':<10} " + " ".join(f"{strategy:>9}" for strategy in READ_STRATEGIES) + "   (GB/s, 1 thread)")
+    for hash_name in HASH_FUNCTIONS:
+        rates = [measure(functools.partial(get_full_hash, hash_name=hash_name, strategy=strategy), 1)
+                 for strategy in READ_STRATEGIES]
+        print(f"{hash_name:<10} " + " ".join(f"{rate:>9.2f}" for rate in rates))
+
+    print(f"\n{HASH_NAME} with {FULL_HASH_STRATEGY}, by read size and threads (GB/s):")
+    print(f"{'threads':<10} " + " ".join(f"{block_size // 1024 // 1024:>7} MiB" for _, block_size in IO_PROFILES.values()))
+    for threads in BENCHMARK_THREADS:
+        rates = [measure(functools.partial(get_full_hash, block_size=block_size), threads)
+                 for _, block_size in IO_PROFILES.values()]
+        print(f"{threads:<10} " + " ".join(f"{rate:>11.2f}" for rate in rates))
 
 def delete_duplicates(duplicates):
     """Delete duplicate files, keeping the first occurrence."""
@@ -130,10 +778,127 @@ def delete_duplicates(duplicates):
         except ValueError:
             print("Invalid input. Skipping this set of duplicates.")
 
+def files_identical(path_a, path_b):
+    """Compare two files byte for byte."""
+    with open(path_a, 'rb') as file_a, open(path_b, 'rb') as file_b:
+        while True:
+            block_a = file_a.read(FULL_HASH_BLOCK_SIZE)
+            if block_a != file_b.read(FULL_HASH_BLOCK_SIZE):
+                return False
+            if not block_a:
+                return True
+
+def clone_file(source, destination):
+    """Create destination as a reflink of source, sharing its data extents."""
+    with open(source, 'rb') as src, open(destination, 'xb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+def link_file(keep, target, mode, dry_run=False):
+    """Replace target with a hard link or reflink to keep, returning (bytes reclaimed, status).
+
+    The target is only replaced after a full byte comparison, through a
+    temporary name and an atomic rename, so an interrupted run leaves every
+    path either untouched or linked and can simply be run again. Targets that
+    are already links to keep, or that changed during verification, are
+    left alone. Bytes count as reclaimed only when the target's last link
+    goes away.
+    """
+    keep_stat = os.stat(keep)
+    target_stat = os.lstat(target)
+    if not stat.S_ISREG(target_stat.st_mode):
+        return 0, "skipped: not a regular file"
+    if target_stat.st_size == 0:
+        return 0, "skipped: empty file"
+    if (keep_stat.st_dev, keep_stat.st_ino) == (target_stat.st_dev, target_stat.st_ino):
+        return 0, "already linked"
+    if keep_stat.st_size != target_stat.st_size:
+        return 0, "skipped: size changed since the scan"
+    if keep_stat.st_dev != target_stat.st_dev:
+        return 0, "skipped: on a different filesystem"
+
+    reclaimed = target_stat.st_size if target_stat.st_nlink == 1 else 0
+    if dry_run:
+        return reclaimed, "would link"
+    if not files_identical(keep, target):
+        return 0, "skipped: contents differ"
+
+    temp = os.path.join(os.path.dirname(target), f".{os.path.basename(target)}{LINK_TEMP_SUFFIX}")
+    # A leftover from an interrupted run holds nothing the target does not.
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(temp)
+    try:
+        if mode == 'hardlink':
+            os.link(keep, temp)
+        else:
+            clone_file(keep, temp)
+            shutil.copystat(target, temp)
+            with contextlib.suppress(PermissionError):
+                os.chown(temp, target_stat.st_uid, target_stat.st_gid)
+
+        current = os.lstat(target)
+        if (current.st_ino, current.st_size, current.st_mtime_ns) != \
+                (target_stat.st_ino, target_stat.st_size, target_stat.st_mtime_ns):
+            os.unlink(temp)
+            return 0, "skipped: changed during verification"
+        os.replace(temp, target)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temp)
+        raise
+    return reclaimed, "linked"
+
+def link_chunk(mode, dry_run, tasks):
+    """Run link_file over a batch of (keep, target) tasks in a worker."""
+    results = []
+    for keep, target in tasks:
+        try:
+            reclaimed, status = link_file(keep, target, mode, dry_run)
+        except OSError as e:
+            reclaimed, status = 0, f"failed: {e}"
+        results.append((target, reclaimed, status))
+    return results
+
+def link_duplicates(duplicates, mode='hardlink', dry_run=False):
+    """Replace every duplicate file with a link to the first file of its group.
+
+    Every path is kept, so nothing is lost. Folder groups and empty files are
+    left alone: linking empty files reclaims nothing and would tie unrelated
+    files together, so writing to one would change all of them. With
+    dry_run nothing is read or changed; the report shows what would be
+    reclaimed, trusting the hashes from the scan. Targets that already have
+    other hard links are not counted, so the estimate can fall short.
+    """
+    tasks = [(paths[0], target) for sig, paths in duplicates.items()
+             if not sig.startswith(('folder_', '0_')) for target in paths[1:]]
+    num_workers = max(1, multiprocessing.cpu_count() // 2)
+    counts = defaultdict(int)
+    reclaimed = 0
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor, \
+            tqdm(total=len(tasks), desc="Checking links" if dry_run else "Linking", unit="file") as progress_bar:
+        results = iter_chunk_results(executor, functools.partial(link_chunk, mode, dry_run), tasks,
+                                     num_workers, LINK_CHUNK_SIZE)
+        for chunk_results in results:
+            for target, target_reclaimed, status in chunk_results:
+                if status.startswith(("skipped", "failed")):
+                    tqdm.write(f"{target}: {status}", file=sys.stderr)
+                counts[status.split(':')[0]] += 1
+                reclaimed += target_reclaimed
+            progress_bar.update(len(chunk_results))
+            if should_exit:
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+
+    verb = "Would reclaim" if dry_run else "Reclaimed"
+    print(f"\n{verb} {reclaimed:,} bytes ({reclaimed / 1024 ** 3:.2f} GiB) using {mode}s.")
+    for status in ("would link", "linked", "already linked", "skipped", "failed"):
+        if counts[status]:
+            print(f"  {status}: {counts[status]}")
+
 def main():
     parser = argparse.ArgumentParser(
         description="Find and optionally delete duplicate files in a specified directory.",
-        epilog="""
+        epilog=f"""
 Examples:
   Find duplicates in all files:
     python find_duplicates.py -d /path/to/directory
@@ -144,19 +909,75 @@ Examples:
   Find duplicates in PDF files and folders:
     python find_duplicates.py -d /path/to/directory -f .pdf folder
 
+  Replace duplicates with hard links after a dry run:
+    python find_duplicates.py -d /path/to/backups --link --dry-run
+    python find_duplicates.py -d /path/to/backups --link
+
+  Find resized or re-encoded copies of photos and videos:
+    python find_duplicates.py -d /path/to/directory --similar
+
 Note:
   - The script uses parallel processing to improve performance on multi-core systems.
   - You can interrupt the scan at any time by pressing Ctrl+C.
   - When specifying file types, you can use the format '.ext' or just 'ext'.
   - Use 'folder' as a file type to include directories in the search.
-  - The script uses a combination of file size, metadata, and partial content for faster duplicate detection.
-  - You will be prompted before any files are deleted.
+  - Files are compared in stages: size, then a partial hash, then a full hash. Files with a
+    unique size are never opened, and only partial-hash matches are read in full.
+  - Files are hashed with xxh3 (if the xxhash package is installed, otherwise BLAKE2b) by
+    a thread pool sized for the storage: many threads for SSDs, two long sequential streams
+    for spinning disks. --benchmark shows the throughput of each hash, read strategy and
+    thread count on your files; --hash picks another hash if one is faster on your CPU.
+  - Hashes are cached between runs (see --cache-file), keyed by device, inode, size and
+    modification time, so unchanged files are not read again. Entries unused for
+    {CACHE_MAX_AGE_DAYS} days are evicted; --rebuild-cache starts over and --no-cache disables it.
+  - --similar finds images and videos that look alike rather than match byte for byte, such
+    as resized or re-encoded copies, by comparing perceptual hashes (dHash by default, or
+    pHash). Videos are compared on {VIDEO_SAMPLE_FRAMES} sampled frames. This needs numpy and ffmpeg;
+    Pillow is used for images when installed.
+  - --link keeps every path and replaces each duplicate with a hard link (or a reflink with
+    --link reflink, on btrfs or XFS) to the first file of its group. Each file is compared
+    byte for byte first and swapped in atomically, so an interrupted run can be re-run.
+    Hard-linked paths share permissions and timestamps; reflinks keep their own.
+  - Otherwise, you will be prompted before any files are deleted.
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     parser.add_argument("-d", "--dir", required=True, help="Directory to scan for duplicates")
     parser.add_argument("-f", "--file-types", nargs='+', help="File types to search for (e.g., .mp4 .png folder)")
+    parser.add_argument("--cache-file", default=DEFAULT_CACHE_PATH,
+                        help=f"Hash cache database (default: {DEFAULT_CACHE_PATH}, or $FIND_DUPLICATES_CACHE)")
+    parser.add_argument("--rebuild-cache", action="store_true", help="Discard all cached hashes before scanning")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the hash cache")
+    parser.add_argument("--io", choices=['auto', 'ssd', 'hdd'], default='auto',
+                        help="Storage type used to tune hashing threads and read sizes (default: detect)")
+    parser.add_argument("--hash", choices=sorted(HASH_FUNCTIONS), default=HASH_NAME,
+                        help=f"Content hash for duplicate detection (default: {HASH_NAME})")
+    parser.add_argument("--io-threads", type=int, metavar="N", help="Override the number of hashing threads")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Measure hashing throughput on the largest files in --dir and exit")
+    parser.add_argument("--link", nargs='?', const='hardlink', choices=['hardlink', 'reflink'],
+                        help="Replace duplicates with hard links (default) or reflinks instead of deleting them")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="With --link, report what would be linked and reclaimed without changing anything")
+    parser.add_argument("--similar", nargs='?', type=int, const=DEFAULT_SIMILARITY_RADIUS, metavar="BITS",
+                        help=f"Find near-duplicate images and videos whose 64-bit perceptual hashes differ in at "
+                             f"most BITS bits (default: {DEFAULT_SIMILARITY_RADIUS})")
+    parser.add_argument("--perceptual-hash", choices=sorted(PERCEPTUAL_HASHES), default='dhash',
+                        help="Perceptual hash used by --similar (default: dhash)")
     args = parser.parse_args()
+    if args.no_cache and args.rebuild_cache:
+        parser.error("--rebuild-cache cannot be combined with --no-cache")
+    if args.io_threads is not None and args.io_threads < 1:
+        parser.error("--io-threads must be at least 1")
+    if args.dry_run and not args.link:
+        parser.error("--dry-run requires --link")
+    if args.link and args.similar is not None:
+        parser.error("--link cannot be combined with --similar; similar files are not identical")
+    if args.similar is not None:
+        if not 0 <= args.similar < 64:
+            parser.error("--similar must be between 0 and 63 bits")
+        if np is None:
+            parser.error("--similar requires numpy (pip install numpy)")
 
     directory = os.path.abspath(args.dir)
     if not os.path.isdir(directory):
@@ -166,6 +987,10 @@ Note:
     file_types = args.file_types if args.file_types else []
     file_types = [ft if ft.startswith('.') or ft == 'folder' else f'.{ft}' for ft in file_types]
 
+    if args.benchmark:
+        benchmark_hashing(directory, file_types)
+        return
+
     # Set up the signal handler for Ctrl+C
     signal.signal(signal.SIGINT, signal_handler)
 
@@ -175,8 +1000,30 @@ Note:
     else:
         print("Searching for all file types")
     print("Press Ctrl+C to stop the scan at any time.")
-    
-    duplicates = find_duplicates(directory, file_types)
+
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = HashCache(args.cache_file, rebuild=args.rebuild_cache)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: hash cache {args.cache_file} unavailable, continuing without it: {e}", file=sys.stderr)
+
+    try:
+        if args.similar is not None:
+            duplicates = find_similar(directory, file_types, args.similar, args.perceptual_hash, cache)
+        else:
+            storage = detect_storage(directory) if args.io == 'auto' else args.io
+            print(f"Hashing with {args.hash}, tuned for {storage.upper()} storage.")
+            duplicates = find_duplicates(directory, file_types, cache, storage, args.io_threads, args.hash)
+        if cache is not None:
+            print(f"Hash cache: {cache.hits} hits, {cache.misses} misses.")
+            if not should_exit:
+                evicted = cache.evict_stale()
+                if evicted:
+                    print(f"Evicted {evicted} stale hash cache entries.")
+    finally:
+        if cache is not None:
+            cache.close()
 
     if should_exit:
         print("Scan interrupted. Exiting...")
@@ -188,6 +1035,10 @@ Note:
 
     print(f"\nFound {sum(len(paths) for paths in duplicates.values()) - len(duplicates)} potential duplicate files.")
 
+    if args.link:
+        link_duplicates(duplicates, args.link, args.dry_run)
+        return
+
     delete = input("Do you want to delete duplicate files? (y/n): ").strip().lower()
     if delete == 'y':
         delete_duplicates(duplicates)
@@ -0,0 +1,121 @@
+import errno
+import functools
+import hashlib
+import os
+import random
+import shutil
+import sys
+
+import pytest
+
+pytest.importorskip("tqdm")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import find_duplicates  # noqa: E402
+
+
+def make_duplicate_pair(tmp_path):
+    keep = tmp_path / "keep.bin"
+    target = tmp_path / "target.bin"
+    data = os.urandom(200_000)
+    keep.write_bytes(data)
+    target.write_bytes(data)
+    os.utime(target, ns=(1_000_000_000, 2_000_000_000))
+    return keep, target, data
+
+
+def test_link_file_reflink(tmp_path):
+    keep, target, data = make_duplicate_pair(tmp_path)
+    probe = tmp_path / "probe.bin"
+    try:
+        find_duplicates.clone_file(keep, probe)
+    except OSError as e:
+        if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL):
+            pytest.skip(f"{tmp_path} does not support reflinks")
+        raise
+    probe.unlink()
+
+    reclaimed, status = find_duplicates.link_file(str(keep), str(target), 'reflink')
+
+    assert status == "linked"
+    assert reclaimed == len(data)
+    assert target.read_bytes() == data
+    assert os.stat(target).st_ino != os.stat(keep).st_ino
+    assert os.stat(target).st_mtime_ns == 2_000_000_000
+    assert not list(tmp_path.glob(f"*{find_duplicates.LINK_TEMP_SUFFIX}"))
+
+
+def test_link_file_reflink_replacement(tmp_path, monkeypatch):
+    # Everything after the clone itself, on filesystems without reflinks.
+    keep, target, data = make_duplicate_pair(tmp_path)
+    monkeypatch.setattr(find_duplicates, "clone_file", shutil.copyfile)
+
+    reclaimed, status = find_duplicates.link_file(str(keep), str(target), 'reflink')
+
+    assert status == "linked"
+    assert reclaimed == len(data)
+    assert target.read_bytes() == data
+    assert os.stat(target).st_mtime_ns == 2_000_000_000
+    assert not list(tmp_path.glob(f"*{find_duplicates.LINK_TEMP_SUFFIX}"))
+
+
+def test_link_duplicates_leaves_empty_files_alone(tmp_path):
+    for name in ("empty1", "empty2"):
+        (tmp_path / name).write_bytes(b"")
+    for name in ("copy1", "copy2"):
+        (tmp_path / name).write_bytes(b"duplicate")
+
+    duplicates = find_duplicates.find_duplicates(str(tmp_path), [])
+    find_duplicates.link_duplicates(duplicates, 'hardlink')
+
+    assert os.stat(tmp_path / "copy1").st_ino == os.stat(tmp_path / "copy2").st_ino
+    assert os.stat(tmp_path / "empty1").st_ino != os.stat(tmp_path / "empty2").st_ino
+    assert find_duplicates.link_file(str(tmp_path / "empty1"), str(tmp_path / "empty2"), 'hardlink') == \
+        (0, "skipped: empty file")
+
+
+def test_find_duplicates_matches_brute_force(tmp_path, monkeypatch):
+    # Tiny chunks spread every group over many out-of-order worker results.
+    monkeypatch.setattr(find_duplicates, "refine_groups",
+                        functools.partial(find_duplicates.refine_groups, chunk_size=3))
+    rng = random.Random(1186)
+    sizes = [1, 100, 4096, find_duplicates.PARTIAL_HASH_COVERS_FILE + 1, 400_000]
+    blobs = [rng.randbytes(size) for size in sizes for _ in range(2)]
+
+    for index, blob in enumerate(blobs):
+        directory = tmp_path / f"d{index % 3}"
+        directory.mkdir(exist_ok=True)
+        for copy in range(rng.randint(1, 4)):
+            (directory / f"blob{index}-copy{copy}.bin").write_bytes(blob)
+        # Same size, one byte different: at the start, and away from the partial hash samples.
+        for offset in {0, len(blob) // 4}:
+            flipped = bytearray(blob)
+            flipped[offset] ^= 0xFF
+            (directory / f"blob{index}-flip{offset}.bin").write_bytes(bytes(flipped))
+
+    by_content = {}
+    for path in tmp_path.rglob("*.bin"):
+        by_content.setdefault(hashlib.sha256(path.read_bytes()).digest(), set()).add(str(path))
+    expected = {frozenset(paths) for paths in by_content.values() if len(paths) > 1}
+
+    duplicates = find_duplicates.find_duplicates(str(tmp_path), [], io_threads=4)
+
+    assert {frozenset(paths) for paths in duplicates.values()} == expected
+    assert all(len(paths) == len(set(paths)) for paths in duplicates.values())
+
+
+def test_find_similar_skips_decompression_bombs(tmp_path, monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+    gradient = Image.linear_gradient('L').resize((20, 20))
+    gradient.save(tmp_path / "a.png")
+    gradient.save(tmp_path / "b.png")
+    Image.new('L', (200, 200)).save(tmp_path / "bomb.png")
+
+    with pytest.raises(OSError):
+        find_duplicates.decode_gray(str(tmp_path / "bomb.png"), 9, 8)
+
+    similar = find_duplicates.find_similar(str(tmp_path), [])
+
+    assert [sorted(paths) for paths in similar.values()] == [[str(tmp_path / "a.png"), str(tmp_path / "b.png")]]
@@ -5,6 +5,7 @@
 import argparse
 import os
 import re
+import sqlite3
 import subprocess
 import sys
 import json
@@ -25,6 +26,16 @@ except ImportError:
 # Initialize colorama
 init(autoreset=True)
 
+# The shared video library index module lives with the FFmpeg scripts in this repository.
+# It is optional; without it only the --library options are unavailable.
+FFMPEG_SCRIPTS_DIR = Path(__file__).resolve().parents[2] / 'Bash' / 'Installer-Scripts' / 'FFmpeg'
+if FFMPEG_SCRIPTS_DIR.is_dir() and str(FFMPEG_SCRIPTS_DIR) not in sys.path:
+    sys.path.append(str(FFMPEG_SCRIPTS_DIR))
+try:
+    import video_library
+except ImportError:
+    video_library = None
+
 # Define color constants with clear contrasts
 GREEN = Fore.GREEN + Style.BRIGHT
 RED = Fore.RED + Style.BRIGHT
@@ -136,7 +147,7 @@ def get_video_files(start_dir, video_extensions, recursive=True, verbose=False):
             print(f"  - {vf}")
     return video_files
 
-def get_video_info(path, verbose=False):
+def get_video_info(path, verbose=False, library=None, probe=None):
     """
     Retrieves video metadata using ffprobe in JSON format.
     Extracts duration, resolution, codec, bitrate, fps, bit-depth.
@@ -144,32 +155,42 @@ def get_video_info(path, verbose=False):
     Args:
         path (Path): The video file path.
         verbose (bool): Whether to print verbose logs.
+        library (VideoLibrary, optional): Shared index to reuse ffprobe results from.
+            ffprobe only runs when the file is new or changed since it was indexed.
+        probe (dict, optional): An ffprobe result already read from the index.
 
     Returns:
         dict: Dictionary containing video metadata.
     """
     try:
-        if verbose:
-            print(f"{CYAN}Running ffprobe on '{path}'...{RESET_ALL}")
-        
-        # Use the raw string representation of the path
-        escaped_path = str(path)
-        
-        # Run ffprobe to get detailed metadata in JSON
-        result = subprocess.run(
-            [
-                'ffprobe',
-                '-v', 'error',
-                '-print_format', 'json',
-                '-show_format',
-                '-show_streams',
-                escaped_path
-            ],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        data = json.loads(result.stdout)
+        if probe is not None:
+            data = probe
+        elif library is not None:
+            if verbose:
+                print(f"{CYAN}Looking up '{path}' in the video library...{RESET_ALL}")
+            data = library.probe(path)
+        else:
+            if verbose:
+                print(f"{CYAN}Running ffprobe on '{path}'...{RESET_ALL}")
+
+            # Use the raw string representation of the path
+            escaped_path = str(path)
+
+            # Run ffprobe to get detailed metadata in JSON
+            result = subprocess.run(
+                [
+                    'ffprobe',
+                    '-v', 'error',
+                    '-print_format', 'json',
+                    '-show_format',
+                    '-show_streams',
+                    escaped_path
+                ],
+                capture_output=True,
+                text=True,
+                check=True
+            )
+            data = json.loads(result.stdout)
         
         # Extract format information
         format_info = data.get('format', {})
@@ -214,6 +235,9 @@ def get_video_info(path, verbose=False):
     except (ValueError, IndexError, KeyError) as e:
         print(f"\n{RED}Invalid info format for {path}: {e}{RESET_ALL}", file=sys.stderr)
         return {'duration': 0, 'resolution': (0, 0), 'codec': 'unknown', 'bitrate': 0, 'fps': 0.0, 'bit_depth': 0}
+    except sqlite3.Error as e:
+        print(f"\n{RED}Video library error for {path}: {e}{RESET_ALL}", file=sys.stderr)
+        return {'duration': 0, 'resolution': (0, 0), 'codec': 'unknown', 'bitrate': 0, 'fps': 0.0, 'bit_depth': 0}
 
 def calculate_quality_score(info):
     """
@@ -487,6 +511,12 @@ Usage Examples:
     - Enable verbose logging:
         python3 vlc_playlist_creator.py -v
 
+    - Reuse ffprobe results from the shared video library index:
+        python3 vlc_playlist_creator.py -r -q --library
+
+    - Build the playlist from the index alone, without walking the directory:
+        python3 vlc_playlist_creator.py -r -q --library-only
+
     - Display help message:
         python3 vlc_playlist_creator.py -h
         """,
@@ -508,6 +538,13 @@ Usage Examples:
     parser.add_argument('-v', '--verbose', action='store_true',
         help='Enable verbose logging for detailed output.'
     )
+    parser.add_argument('--library', nargs='?', const='', default=None, metavar='INDEX',
+        help='Reuse and update ffprobe results in the shared video library index. '
+             'Default INDEX: ~/.cache/video-library/index.sqlite3 or $VIDEO_LIBRARY_INDEX.'
+    )
+    parser.add_argument('--library-only', action='store_true',
+        help='Take the video files from the video library index instead of scanning the directory.'
+    )
 
     return parser.parse_args()
 
@@ -560,8 +597,31 @@ def main():
         print(f"\n{RED}Error creating directories for the output file: {e}{RESET_ALL}", file=sys.stderr)
         sys.exit(1)
 
+    # Open the shared video library index if requested
+    library = None
+    if args.library is not None or args.library_only:
+        if video_library is None:
+            print(f"{RED}The --library options need video_library.py from Bash/Installer-Scripts/FFmpeg.{RESET_ALL}", file=sys.stderr)
+            sys.exit(1)
+        try:
+            library = video_library.VideoLibrary(args.library or video_library.DEFAULT_INDEX_PATH)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"{RED}Error opening video library: {e}{RESET_ALL}", file=sys.stderr)
+            sys.exit(1)
+        if verbose:
+            print(f"{CYAN}Using video library index: {library.path}{RESET_ALL}")
+
     # Get list of video files
-    video_files = get_video_files(start_dir, video_extensions, recursive=recursive_search, verbose=verbose)
+    cached_probes = {}
+    if args.library_only:
+        records = library.query(start_dir, recursive=recursive_search,
+                                extensions=[extension.lstrip('.') for extension in video_extensions])
+        cached_probes = {Path(record.path): record.probe for record in records}
+        video_files = sorted(cached_probes, key=natural_sort_key)
+        if verbose:
+            print(f"{CYAN}Found {len(video_files)} video file{'s' if len(video_files) != 1 else ''} in the video library index.{RESET_ALL}")
+    else:
+        video_files = get_video_files(start_dir, video_extensions, recursive=recursive_search, verbose=verbose)
 
     if not video_files:
         if recursive_search:
@@ -588,7 +648,8 @@ def main():
     # Process video files and retrieve durations and resolutions with colorized output
     video_infos = [{'duration': 0, 'resolution': (0, 0), 'codec': 'unknown', 'bitrate': 0, 'fps': 0.0, 'bit_depth': 0} for _ in video_files]
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_index = {executor.submit(get_video_info, path, verbose): idx for idx, path in enumerate(video_files)}
+        future_to_index = {executor.submit(get_video_info, path, verbose, library, cached_probes.get(path)): idx
+                           for idx, path in enumerate(video_files)}
 
         for future in as_completed(future_to_index):
             idx = future_to_index[future]
@@ -603,6 +664,9 @@ def main():
                 print(f"{Fore.BLUE}Processing:{RESET_ALL} {video_files[idx].name.ljust(fixed_width)} {FAILURE_SYMBOL}")
                 print(f"{Fore.BLUE}Duration:{RESET_ALL} [Error] {FAILURE_SYMBOL}\n")
 
+    if library is not None:
+        library.close()
+
     # Now sort the video_files and video_infos based on the sort_by_quality flag
     if sort_by_quality:
         if verbose:
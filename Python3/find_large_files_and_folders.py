@@ -17,20 +17,39 @@ import csv
 import math
 import re
 import signal
+import stat
+import copy
+import shutil
+import tempfile
+import sqlite3
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import heapq
+import struct
+import itertools
+from array import array
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime
-from fnmatch import fnmatch
+from fnmatch import translate
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Tuple, Set
+from typing import List, Dict, Iterator, Optional, Tuple, Set
 from enum import Enum
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # ────────────────────────────────────────────────────────────────
 # Configuration & Constants
 # ────────────────────────────────────────────────────────────────
 
 VERSION = "2.0.0"
 DEFAULT_TOP_N = 20
+DEFAULT_INDEX_FILE = Path.home() / '.cache' / 'dsa' / 'index.sqlite3'
+INDEX_SCHEMA_VERSION = 1
 MAX_WORKERS = min(os.cpu_count() or 4, 64)
 CHUNK_SIZE = 256
 
@@ -115,6 +134,38 @@ class FolderEntry:
     def name(self) -> str:
         return self.path.name or str(self.path)
 
+    def add_file(self, f: FileEntry):
+        """Fold a single file into this folder's aggregates."""
+        self.total_size += f.size
+        self.file_count += 1
+        self.extensions[f.extension] += 1
+        if f.size > self.max_file_size:
+            self.max_file_size = f.size
+        if self.min_file_size is None or f.size < self.min_file_size:
+            self.min_file_size = f.size
+        if self.oldest_file is None or f.modified < self.oldest_file:
+            self.oldest_file = f.modified
+        if self.newest_file is None or f.modified > self.newest_file:
+            self.newest_file = f.modified
+
+    def merge(self, other: 'FolderEntry'):
+        """Fold another folder's partial aggregates (a chunk or a child) into this one."""
+        if other.file_count == 0:
+            return
+        self.total_size += other.total_size
+        self.file_count += other.file_count
+        for ext, count in other.extensions.items():
+            self.extensions[ext] += count
+        if other.max_file_size > self.max_file_size:
+            self.max_file_size = other.max_file_size
+        if self.min_file_size is None or other.min_file_size < self.min_file_size:
+            self.min_file_size = other.min_file_size
+        if self.oldest_file is None or other.oldest_file < self.oldest_file:
+            self.oldest_file = other.oldest_file
+        if self.newest_file is None or other.newest_file > self.newest_file:
+            self.newest_file = other.newest_file
+        self.avg_file_size = self.total_size / self.file_count
+
 
 # ────────────────────────────────────────────────────────────────
 # Signal Handling
@@ -184,120 +235,421 @@ def format_age(days: float) -> str:
         return f"{days / 365:.1f}y ago"
 
 
-def matches_patterns(name: str, patterns: List[str]) -> bool:
-    """Check if name matches any of the glob patterns."""
-    return any(fnmatch(name, pat) for pat in patterns)
+class ExcludeMatcher:
+    """All --exclude globs and --exclude-path entries compiled once per engine.
+
+    Literal names, `*suffix` and `prefix*` globs (the vast majority in
+    practice) become set lookups keyed by length; any remaining globs are
+    fnmatch-translated into one alternation regex.  Excluded paths are a set
+    of strings: excluded directories are never descended into, so entries
+    inside the traversal only need an exact path check rather than a walk
+    over their parents, and roots get the full ancestor check once.
+    """
+
+    _GLOB_CHARS = frozenset('*?[')
+
+    def __init__(self, patterns: List[str], paths: List[Path]):
+        self._names: Set[str] = set()
+        self._suffixes: Dict[int, Set[str]] = defaultdict(set)
+        self._prefixes: Dict[int, Set[str]] = defaultdict(set)
+        globs = []
+
+        for pat in patterns:
+            pat = os.path.normcase(pat)
+            body = pat.strip('*')
+            if self._GLOB_CHARS.intersection(body) or not body:
+                globs.append(pat)
+            elif pat == body:
+                self._names.add(pat)
+            elif pat == '*' + body:
+                self._suffixes[len(body)].add(body)
+            elif pat == body + '*':
+                self._prefixes[len(body)].add(body)
+            else:
+                globs.append(pat)
+
+        self._regex = re.compile('|'.join(translate(p) for p in globs)).match if globs else None
+        self._paths = frozenset(str(p) for p in paths)
+
+    def matches_name(self, name: str) -> bool:
+        """Check if name matches any of the glob patterns."""
+        name = os.path.normcase(name)
+        if name in self._names:
+            return True
+        for length, suffixes in self._suffixes.items():
+            if name[-length:] in suffixes:
+                return True
+        for length, prefixes in self._prefixes.items():
+            if name[:length] in prefixes:
+                return True
+        return self._regex is not None and self._regex(name) is not None
+
+    def excludes(self, path: str, name: str) -> bool:
+        """Check a directory entry whose parent has already passed the matcher."""
+        return path in self._paths or self.matches_name(name)
+
+    def excludes_tree(self, path: Path) -> bool:
+        """Check if path or any of its ancestors is an excluded path."""
+        return str(path) in self._paths or any(str(p) in self._paths for p in path.parents)
 
 
-def should_exclude(path: Path, exclude_patterns: List[str], exclude_paths: List[Path]) -> bool:
-    """Check if path should be excluded."""
-    try:
-        for ex_path in exclude_paths:
-            if path == ex_path or ex_path in path.parents:
-                return True
-    except (ValueError, OSError):
-        pass
-    return matches_patterns(path.name, exclude_patterns)
+# ────────────────────────────────────────────────────────────────
+# Incremental Scan Index
+# ────────────────────────────────────────────────────────────────
+
+class ScanIndex:
+    """On-disk SQLite index of directory mtimes and per-file metadata records.
+
+    A directory whose (dev, ino, mtime_ns) still matches its row has the same
+    entries as on the last scan, so its subdirectory names and file records
+    are reused without listing it or stat'ing its files.  Rewriting an
+    existing file in place does not touch its directory's mtime; such size
+    changes are picked up the next time that directory itself changes.
+
+    With defer_writes, record() only queues updates in `deferred`; process
+    shards hand them back so the parent is the index's only writer.
+    """
+
+    def __init__(self, path: Path, fingerprint: str, defer_writes: bool = False):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.deferred: Optional[List[tuple]] = [] if defer_writes else None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS dirs (
+                path BLOB PRIMARY KEY, dev INTEGER, ino INTEGER, mtime_ns INTEGER, subdirs BLOB
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS files (
+                dir BLOB, name BLOB, size INTEGER, modified REAL, created REAL,
+                nlink INTEGER, dev INTEGER, ino INTEGER, link_target BLOB,
+                PRIMARY KEY (dir, name)
+            ) WITHOUT ROWID;
+        """)
+
+        # Cached listings depend on symlink/exclusion settings; start over if they changed
+        stored = dict(self._conn.execute('SELECT key, value FROM meta'))
+        if stored.get('version') != str(INDEX_SCHEMA_VERSION) or stored.get('fingerprint') != fingerprint:
+            with self._conn:
+                self._conn.execute('DELETE FROM dirs')
+                self._conn.execute('DELETE FROM files')
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                    [('version', str(INDEX_SCHEMA_VERSION)), ('fingerprint', fingerprint)],
+                )
+
+    @staticmethod
+    def fingerprint(args) -> str:
+        return json.dumps({
+            'follow_symlinks': args.follow_symlinks,
+            'exclude': sorted(args.exclude),
+            'exclude_path': sorted(str(p) for p in args.exclude_path),
+        }, sort_keys=True)
+
+    def lookup(self, path: Path, st) -> Optional[Tuple[List[str], List[tuple]]]:
+        """Return (subdir names, file records) if the directory is unchanged."""
+        key = os.fsencode(str(path))
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT dev, ino, mtime_ns, subdirs FROM dirs WHERE path = ?', (key,)
+            ).fetchone()
+            if row is None or row[:3] != (st.st_dev, st.st_ino, st.st_mtime_ns):
+                return None
+            rows = self._conn.execute(
+                'SELECT name, size, modified, created, nlink, dev, ino, link_target FROM files WHERE dir = ?',
+                (key,),
+            ).fetchall()
+
+        subdirs = [os.fsdecode(n) for n in row[3].split(b'\0')] if row[3] else []
+        records = [
+            (os.fsdecode(r[0]), r[1], r[2], r[3], r[4], r[5], r[6],
+             os.fsdecode(r[7]) if r[7] is not None else None)
+            for r in rows
+        ]
+        return subdirs, records
+
+    def record(self, path: Path, st, subdirs: List[str], records: List[tuple]):
+        """Replace a directory's row and file records after a fresh listing."""
+        update = (path, (st.st_dev, st.st_ino, st.st_mtime_ns), subdirs, records)
+        if self.deferred is not None:
+            with self._lock:
+                self.deferred.append(update)
+            return
+        self.record_many([update])
+
+    def record_many(self, updates: List[tuple]):
+        """Apply (path, (dev, ino, mtime_ns), subdirs, records) updates in one transaction."""
+        with self._lock, self._conn:
+            for path, dir_id, subdirs, records in updates:
+                key = os.fsencode(str(path))
+                encoded = [os.fsencode(n) for n in subdirs]
+
+                row = self._conn.execute('SELECT subdirs FROM dirs WHERE path = ?', (key,)).fetchone()
+                if row is not None and row[0]:
+                    for gone in set(row[0].split(b'\0')) - set(encoded):
+                        self._prune(os.fsencode(str(path / os.fsdecode(gone))))
+
+                self._conn.execute('DELETE FROM files WHERE dir = ?', (key,))
+                self._conn.executemany(
+                    'INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(key, os.fsencode(r[0]), r[1], r[2], r[3], r[4], r[5], r[6],
+                      os.fsencode(r[7]) if r[7] is not None else None) for r in records],
+                )
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?)',
+                    (key, *dir_id, b'\0'.join(encoded)),
+                )
+
+    def _prune(self, key: bytes):
+        """Drop a removed directory and everything indexed below it."""
+        lo, hi = key + b'/', key + b'0'  # '0' sorts right after '/'
+        self._conn.execute('DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)', (key, lo, hi))
+        self._conn.execute('DELETE FROM files WHERE dir = ? OR (dir >= ? AND dir < ?)', (key, lo, hi))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
 
 
 # ────────────────────────────────────────────────────────────────
 # Core Scanning Engine
 # ────────────────────────────────────────────────────────────────
 
+class WorkStealingPool:
+    """Engine-wide worker threads fed by per-worker deques with work stealing.
+
+    Each worker pops its own newest task (depth-first, good locality) and,
+    when empty, steals the oldest task from a peer (usually a large subtree
+    near the root), so every thread stays busy at any depth of the tree.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self._deques = [deque() for _ in range(self.workers)]
+        self._cond = threading.Condition()
+        self._outstanding = 0
+        self._idle = 0
+        self._local = threading.local()
+        # Written only by the owning worker; read without locking by metrics
+        self.busy_seconds = [0.0] * self.workers
+        self.tasks_done = [0] * self.workers
+
+    def queue_depth(self) -> int:
+        """Tasks queued but not yet picked up by a worker."""
+        return sum(len(dq) for dq in self._deques)
+
+    def submit(self, task):
+        """Queue a task on the calling worker's deque (worker 0 if called from outside)."""
+        dq = self._deques[getattr(self._local, 'index', 0)]
+        with self._cond:
+            self._outstanding += 1
+            dq.append(task)
+            if self._idle:
+                self._cond.notify()
+
+    def _next_task(self, index: int):
+        try:
+            return self._deques[index].pop()
+        except IndexError:
+            pass
+        for offset in range(1, self.workers):
+            try:
+                return self._deques[(index + offset) % self.workers].popleft()
+            except IndexError:
+                continue
+        return None
+
+    def _worker(self, index: int, handler):
+        self._local.index = index
+        while not _shutdown_requested.is_set():
+            task = self._next_task(index)
+            if task is None:
+                with self._cond:
+                    if self._outstanding == 0:
+                        return
+                    self._idle += 1
+                    self._cond.wait(0.05)
+                    self._idle -= 1
+                continue
+
+            started = time.perf_counter()
+            try:
+                handler(task)
+            finally:
+                self.busy_seconds[index] += time.perf_counter() - started
+                self.tasks_done[index] += 1
+                with self._cond:
+                    self._outstanding -= 1
+                    if self._outstanding == 0:
+                        self._cond.notify_all()
+
+    def run(self, handler):
+        """Process queued tasks (and any they submit) until the queues drain."""
+        if self.workers == 1:
+            self._worker(0, handler)
+            return
+
+        threads = [
+            threading.Thread(target=self._worker, args=(i, handler), name=f"dsa-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+
+class _DirNode:
+    """A directory in flight: pending child tasks plus its running aggregates."""
+    __slots__ = ('path', 'depth', 'parent', 'pending', 'folder', 'dir_stat', 'subdirs', 'records')
+
+    def __init__(self, path: Path, depth: int, parent: Optional['_DirNode']):
+        self.path = path
+        self.depth = depth
+        self.parent = parent
+        self.pending = 0
+        self.folder: Optional[FolderEntry] = FolderEntry(path=path, depth=depth)
+        # Set only when the directory was freshly listed and must be written to the index
+        self.dir_stat = None
+        self.subdirs: List[str] = []
+        self.records: List[tuple] = []
+
+
+STAT_LATENCY_BUCKETS = [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0]
+
+
+class ThreadCounters:
+    """Scan counters owned by one thread; other threads only ever read them."""
+    __slots__ = ('name', 'counts', 'latency_buckets', 'latency_sum')
+
+    KEYS = (
+        'files_scanned', 'folders_scanned', 'errors', 'skipped',
+        'symlinks_followed', 'hardlinks_detected', 'folders_reused',
+        'sys_scandir', 'sys_lstat', 'sys_stat', 'sys_readlink',
+    )
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counts = dict.fromkeys(self.KEYS, 0)
+        self.latency_buckets = [0] * (len(STAT_LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+
+    def observe_latency(self, seconds: float):
+        # bisect_left so a sample equal to a bound lands in that bucket (Prometheus 'le')
+        self.latency_buckets[bisect_left(STAT_LATENCY_BUCKETS, seconds)] += 1
+        self.latency_sum += seconds
+
+
 class ScanEngine:
     """High-performance parallel file system scanner."""
 
-    def __init__(self, args):
+    def __init__(self, args, collector=None, snapshot: Optional['SnapshotWriter'] = None):
         self.args = args
-        self.stats = {
-            'files_scanned': 0,
-            'folders_scanned': 0,
-            'errors': 0,
-            'skipped': 0,
-            'start_time': time.time(),
-            'symlinks_followed': 0,
-            'hardlinks_detected': 0,
-        }
+        self.collector = collector
+        self.snapshot = snapshot
+        self.start_time = time.time()
         self._lock = threading.Lock()
+        self._tls = threading.local()
+        self._thread_counters: List[ThreadCounters] = []
+        self._counters_lock = threading.Lock()
+        self._time_stats = getattr(args, 'metrics', None) is not None
         self._seen_inodes: Set[Tuple[int, int]] = set()
+        self._exclude = ExcludeMatcher(args.exclude, args.exclude_path)
         self._progress_interval = 0.5
         self._last_progress = 0
+        self._pool: Optional[WorkStealingPool] = None
+        self._index: Optional[ScanIndex] = None
+        self._files: List[FileEntry] = []
+        self._folders: List[FolderEntry] = []
+
+    def _counters(self) -> 'ThreadCounters':
+        counters = getattr(self._tls, 'counters', None)
+        if counters is None:
+            counters = self._tls.counters = ThreadCounters(threading.current_thread().name)
+            # Separate from _lock: callers may already hold _lock when they first count
+            with self._counters_lock:
+                self._thread_counters.append(counters)
+        return counters
 
     def _update_stat(self, key: str, increment: int = 1):
-        with self._lock:
-            self.stats[key] += increment
+        # Lock-free: each thread only ever writes its own counters
+        self._counters().counts[key] += increment
 
-    def _is_duplicate(self, st) -> bool:
+    @property
+    def stats(self) -> Dict:
+        """Snapshot of all per-thread counters summed, plus start_time."""
+        totals = dict.fromkeys(ThreadCounters.KEYS, 0)
+        for counters in list(self._thread_counters):
+            for key, value in counters.counts.items():
+                totals[key] += value
+        totals['start_time'] = self.start_time
+        return totals
+
+    def stat_latency(self) -> Tuple[List[int], float, int]:
+        """Summed stat latency histogram: (bucket counts, total seconds, samples)."""
+        buckets = [0] * (len(STAT_LATENCY_BUCKETS) + 1)
+        total = 0.0
+        for counters in list(self._thread_counters):
+            for i, count in enumerate(counters.latency_buckets):
+                buckets[i] += count
+            total += counters.latency_sum
+        return buckets, total, sum(buckets)
+
+    def _is_duplicate(self, dev: int, ino: int) -> bool:
         """Check if this is a hardlink we've already counted."""
         if not self.args.deduplicate_hardlinks:
             return False
-        key = (st.st_dev, st.st_ino)
+        key = (dev, ino)
         with self._lock:
             if key in self._seen_inodes:
                 return True
             self._seen_inodes.add(key)
             return False
 
-    def _scan_file(self, path: Path, depth: int = 0) -> Optional[FileEntry]:
-        """Scan a single file and return its metadata."""
-        if _shutdown_requested.is_set():
-            return None
+    def _count_syscall(self, key: str):
+        if self.args.stat_profile:
+            self._update_stat(key)
+
+    def _stat_file(self, path: Path, entry: Optional[os.DirEntry] = None) -> Optional[tuple]:
+        """Stat a single file and return its unfiltered metadata record.
 
+        Records are (name, size, modified, created, nlink, dev, ino, link_target)
+        tuples, the same shape ScanIndex stores, so cached and fresh files go
+        through identical filtering in _build_entry.  With a scandir entry the
+        symlink check comes from d_type and the single stat result is cached on
+        the entry, so a regular file costs one lstat and a followed link one
+        stat plus one readlink.
+        """
         try:
-            st = os.lstat(path)
+            if entry is not None:
+                is_link = entry.is_symlink()
+            else:
+                st = os.lstat(path)
+                self._count_syscall('sys_lstat')
+                is_link = stat.S_ISLNK(st.st_mode)
 
-            if os.path.islink(path):
+            link_target = None
+            if is_link:
                 if not self.args.follow_symlinks:
                     self._update_stat('skipped')
                     return None
                 try:
-                    resolved = path.resolve(strict=False)
-                    if resolved.exists():
-                        st = os.stat(resolved)
-                        self._update_stat('symlinks_followed')
-                    else:
-                        return None
+                    link_target = os.readlink(path)
+                    self._count_syscall('sys_readlink')
+                    st = entry.stat() if entry is not None else os.stat(path)
+                    self._count_syscall('sys_stat')
                 except (OSError, ValueError):
+                    # Dangling or unreadable link
                     return None
+            elif entry is not None:
+                st = entry.stat(follow_symlinks=False)
+                self._count_syscall('sys_lstat')
 
-            size = st.st_size
-            if self.args.min_size is not None and size < self.args.min_size:
-                return None
-            if self.args.max_size is not None and size > self.args.max_size:
-                return None
-
-            mtime = st.st_mtime
-            if self.args.min_age_days is not None:
-                age = (time.time() - mtime) / 86400
-                if age < self.args.min_age_days:
-                    return None
-            if self.args.max_age_days is not None:
-                age = (time.time() - mtime) / 86400
-                if age > self.args.max_age_days:
-                    return None
-
-            if self.args.extensions:
-                ext = path.suffix.lower().lstrip('.')
-                if ext not in self.args.extensions:
-                    return None
-
-            is_hardlink = st.st_nlink > 1
-            if is_hardlink and self._is_duplicate(st):
-                self._update_stat('hardlinks_detected')
-                return None
-
-            self._update_stat('files_scanned')
-
-            return FileEntry(
-                path=path,
-                size=size,
-                modified=mtime,
-                created=getattr(st, 'st_birthtime', st.st_ctime),
-                is_symlink=os.path.islink(path),
-                is_hardlink=is_hardlink,
-                link_target=Path(os.readlink(path)) if os.path.islink(path) else None,
-                inode=st.st_ino
-            )
+            return (path.name, st.st_size, st.st_mtime, getattr(st, 'st_birthtime', st.st_ctime),
+                    st.st_nlink, st.st_dev, st.st_ino, link_target)
 
         except (OSError, PermissionError) as e:
             if self.args.verbose:
@@ -306,35 +658,81 @@ class ScanEngine:
             self._update_stat('errors')
             return None
 
-    def _scan_directory_recursive(self, root: Path, depth: int = 0) -> Tuple[List[FileEntry], List[FolderEntry]]:
-        """Recursively scan a directory tree."""
-        files = []
-        folders = []
+    def _build_entry(self, path: Path, record: tuple) -> Optional[FileEntry]:
+        """Apply size/age/extension/hardlink filters to a metadata record."""
+        _, size, mtime, created, nlink, dev, ino, link_target = record
+
+        if link_target is not None:
+            self._update_stat('symlinks_followed')
+
+        if self.args.min_size is not None and size < self.args.min_size:
+            return None
+        if self.args.max_size is not None and size > self.args.max_size:
+            return None
+
+        if self.args.min_age_days is not None:
+            age = (time.time() - mtime) / 86400
+            if age < self.args.min_age_days:
+                return None
+        if self.args.max_age_days is not None:
+            age = (time.time() - mtime) / 86400
+            if age > self.args.max_age_days:
+                return None
+
+        if self.args.extensions:
+            ext = path.suffix.lower().lstrip('.')
+            if ext not in self.args.extensions:
+                return None
+
+        is_hardlink = nlink > 1
+        if is_hardlink and self._is_duplicate(dev, ino):
+            self._update_stat('hardlinks_detected')
+            return None
+
+        self._update_stat('files_scanned')
+
+        return FileEntry(
+            path=path,
+            size=size,
+            modified=mtime,
+            created=created,
+            is_symlink=link_target is not None,
+            is_hardlink=is_hardlink,
+            link_target=Path(link_target) if link_target is not None else None,
+            inode=ino
+        )
 
+    def _scan_file(self, path: Path, depth: int = 0) -> Optional[FileEntry]:
+        """Scan a single file and return its metadata."""
         if _shutdown_requested.is_set():
-            return files, folders
+            return None
 
-        if self.args.max_depth is not None and depth > self.args.max_depth:
-            return files, folders
+        record = self._stat_file(path)
+        if record is None:
+            return None
+        return self._build_entry(path, record)
 
+    def _list_directory(self, node: '_DirNode') -> Optional[Tuple[List[Path], List[os.DirEntry]]]:
+        """Read one directory and split its entries into subdirectory paths and file entries."""
         try:
-            entries = list(os.scandir(root))
+            self._count_syscall('sys_scandir')
+            entries = list(os.scandir(node.path))
         except (OSError, PermissionError) as e:
             if self.args.verbose:
-                print(f"  [Error] Cannot access {root}: {e}", file=sys.stderr)
+                print(f"  [Error] Cannot access {node.path}: {e}", file=sys.stderr)
             self._update_stat('errors')
-            return files, folders
+            return None
 
         dirs = []
-        file_paths = []
+        file_entries = []
 
         for entry in entries:
             if _shutdown_requested.is_set():
+                # A truncated listing must never reach the index
+                node.dir_stat = None
                 break
 
-            path = Path(entry.path)
-
-            if should_exclude(path, self.args.exclude, self.args.exclude_path):
+            if self._exclude.excludes(entry.path, entry.name):
                 self._update_stat('skipped')
                 continue
 
@@ -343,159 +741,189 @@ class ScanEngine:
 
             try:
                 if entry.is_dir(follow_symlinks=self.args.follow_symlinks):
-                    dirs.append(path)
+                    dirs.append(Path(entry.path))
                 elif entry.is_file(follow_symlinks=self.args.follow_symlinks):
-                    file_paths.append(path)
+                    file_entries.append(entry)
             except OSError:
                 self._update_stat('errors')
                 continue
 
-        # Process files in parallel batches
-        if file_paths and not self.args.no_parallel and len(file_paths) > 1:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=self.args.workers) as executor:
-                futures = {executor.submit(self._scan_file, fp, depth): fp for fp in file_paths}
-                for future in concurrent.futures.as_completed(futures):
-                    result = future.result()
-                    if result:
-                        files.append(result)
-        else:
-            for fp in file_paths:
-                result = self._scan_file(fp, depth)
-                if result:
-                    files.append(result)
+        return dirs, file_entries
 
-        folder_entry = FolderEntry(path=root, depth=depth)
+    def _listing_from_index(self, node: '_DirNode') -> Optional[Tuple[List[Path], List[os.DirEntry]]]:
+        """Reuse an unchanged directory's cached listing, or arm the node for re-indexing."""
+        try:
+            st = os.stat(node.path)
+            self._count_syscall('sys_stat')
+        except OSError:
+            return None
 
-        # Process subdirectories — only parallelize at shallow depths to avoid thread explosion
-        if self.args.recursive and dirs:
-            should_parallelize = (
-                not self.args.no_parallel
-                and len(dirs) > 1
-                and depth < 2  # Only parallelize top-level branches
-            )
+        cached = self._index.lookup(node.path, st)
+        if cached is None:
+            node.dir_stat = st
+            return None
 
-            if should_parallelize:
-                with concurrent.futures.ThreadPoolExecutor(max_workers=min(self.args.workers, len(dirs))) as executor:
-                    futures = {executor.submit(self._scan_directory_recursive, d, depth + 1): d for d in dirs}
-                    for future in concurrent.futures.as_completed(futures):
-                        sub_files, sub_folders = future.result()
-                        files.extend(sub_files)
-                        folders.extend(sub_folders)
-            else:
-                for d in dirs:
-                    sub_files, sub_folders = self._scan_directory_recursive(d, depth + 1)
-                    files.extend(sub_files)
-                    folders.extend(sub_folders)
+        subdirs, records = cached
+        node.records = records
+        self._update_stat('folders_reused')
+        return [node.path / name for name in subdirs], []
+
+    def _scan_directory(self, node: '_DirNode'):
+        """Pool task: list a directory, queue its children, scan its first file chunk."""
+        listing = None
+        reused = False
+        if not _shutdown_requested.is_set():
+            if self._index is not None:
+                listing = self._listing_from_index(node)
+                reused = listing is not None
+            if listing is None:
+                listing = self._list_directory(node)
+
+        if listing is None:
+            node.folder = None
+            node.dir_stat = None
+            node.pending = 1
+            self._complete(node)
+            return
 
-            folder_entry.folder_count = len(dirs)
+        dirs, file_entries = listing
+        node.folder.folder_count = len(dirs)
+        if node.dir_stat is not None:
+            node.subdirs = [d.name for d in dirs]
 
-        # Aggregate stats from ALL files under this folder (not just direct children)
-        for f in files:
-            try:
-                if root in f.path.parents or f.path.parent == root:
-                    folder_entry.total_size += f.size
-                    folder_entry.file_count += 1
-                    folder_entry.extensions[f.extension] += 1
-                    if f.size > folder_entry.max_file_size:
-                        folder_entry.max_file_size = f.size
-                    if folder_entry.min_file_size is None or f.size < folder_entry.min_file_size:
-                        folder_entry.min_file_size = f.size
-                    if folder_entry.oldest_file is None or f.modified < folder_entry.oldest_file:
-                        folder_entry.oldest_file = f.modified
-                    if folder_entry.newest_file is None or f.modified > folder_entry.newest_file:
-                        folder_entry.newest_file = f.modified
-            except (ValueError, OSError):
+        descend = self.args.recursive and (
+            self.args.max_depth is None or node.depth < self.args.max_depth
+        )
+        children = [_DirNode(d, node.depth + 1, node) for d in dirs] if descend else []
+        chunks = [file_entries[i:i + CHUNK_SIZE] for i in range(CHUNK_SIZE, len(file_entries), CHUNK_SIZE)]
+
+        # One slot per queued child/chunk plus one for the inline chunk below
+        node.pending = len(children) + len(chunks) + 1
+        for child in children:
+            self._pool.submit(child)
+        for chunk in chunks:
+            self._pool.submit((node, chunk))
+
+        if reused:
+            self._reuse_records(node)
+        else:
+            self._scan_file_chunk(node, file_entries[:CHUNK_SIZE])
+
+    def _scan_file_chunk(self, node: '_DirNode', file_entries: List[os.DirEntry]):
+        """Pool task: scan a slice of one directory's files."""
+        results = []
+        records = []
+        partial = FolderEntry(path=node.path)
+        interrupted = False
+        for entry in file_entries:
+            if _shutdown_requested.is_set():
+                interrupted = True
+                break
+            fp = Path(entry.path)
+            if self._time_stats:
+                started = time.perf_counter()
+                record = self._stat_file(fp, entry)
+                self._counters().observe_latency(time.perf_counter() - started)
+            else:
+                record = self._stat_file(fp, entry)
+            if record is None:
                 continue
+            records.append(record)
+            result = self._build_entry(fp, record)
+            if result:
+                results.append(result)
+                partial.add_file(result)
 
-        if folder_entry.file_count > 0:
-            folder_entry.avg_file_size = folder_entry.total_size / folder_entry.file_count
-
-        folders.append(folder_entry)
-        self._update_stat('folders_scanned')
-
-        if self.args.progress and time.time() - self._last_progress > self._progress_interval:
-            self._print_progress()
-            self._last_progress = time.time()
-
-        return files, folders
-
-    def _scan_directory_flat(self, root: Path) -> Tuple[List[FileEntry], List[FolderEntry]]:
-        """Non-recursive flat scan of a single directory."""
-        files = []
-        folder_entry = FolderEntry(path=root)
-
-        try:
-            entries = list(os.scandir(root))
-        except (OSError, PermissionError) as e:
-            if self.args.verbose:
-                print(f"  [Error] Cannot access {root}: {e}", file=sys.stderr)
-            self._update_stat('errors')
-            return files, [folder_entry]
-
-        file_paths = []
-        for entry in entries:
-            path = Path(entry.path)
-
-            if should_exclude(path, self.args.exclude, self.args.exclude_path):
-                self._update_stat('skipped')
-                continue
+        with self._lock:
+            self._emit(results)
+            node.folder.merge(partial)
+            if interrupted:
+                # Some of this directory's files were never stat'ed, so it must not be indexed
+                node.dir_stat = None
+                node.records = []
+            elif node.dir_stat is not None:
+                node.records.extend(records)
+        self._complete(node)
+
+    def _reuse_records(self, node: '_DirNode'):
+        """Build entries for an unchanged directory from its indexed records."""
+        results = []
+        partial = FolderEntry(path=node.path)
+        for record in node.records:
+            result = self._build_entry(node.path / record[0], record)
+            if result:
+                results.append(result)
+                partial.add_file(result)
+        node.records = []
 
-            try:
-                if entry.is_file(follow_symlinks=self.args.follow_symlinks):
-                    file_paths.append(path)
-                elif entry.is_dir(follow_symlinks=self.args.follow_symlinks):
-                    folder_entry.folder_count += 1
-            except OSError:
-                self._update_stat('errors')
-                continue
+        with self._lock:
+            self._emit(results)
+            node.folder.merge(partial)
+        self._complete(node)
+
+    def _emit(self, results: List[FileEntry]):
+        """Hand finished entries to the collector (streaming/compact) or the file list (caller holds _lock)."""
+        if self.snapshot is not None:
+            self.snapshot.add_files(results)
+        if self.collector is not None:
+            self.collector.add_many(results)
+        else:
+            self._files.extend(results)
 
-        if file_paths and not self.args.no_parallel and len(file_paths) > 1:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=self.args.workers) as executor:
-                futures = {executor.submit(self._scan_file, fp): fp for fp in file_paths}
-                for future in concurrent.futures.as_completed(futures):
-                    result = future.result()
-                    if result:
-                        files.append(result)
+    def _run_task(self, task):
+        if isinstance(task, _DirNode):
+            self._scan_directory(task)
         else:
-            for fp in file_paths:
-                result = self._scan_file(fp)
-                if result:
-                    files.append(result)
-
-        for f in files:
-            folder_entry.total_size += f.size
-            folder_entry.file_count += 1
-            folder_entry.extensions[f.extension] += 1
-            if f.size > folder_entry.max_file_size:
-                folder_entry.max_file_size = f.size
-            if folder_entry.min_file_size is None or f.size < folder_entry.min_file_size:
-                folder_entry.min_file_size = f.size
-            if folder_entry.oldest_file is None or f.modified < folder_entry.oldest_file:
-                folder_entry.oldest_file = f.modified
-            if folder_entry.newest_file is None or f.modified > folder_entry.newest_file:
-                folder_entry.newest_file = f.modified
-
-        if folder_entry.file_count > 0:
-            folder_entry.avg_file_size = folder_entry.total_size / folder_entry.file_count
-
-        self._update_stat('folders_scanned')
-        return files, [folder_entry]
+            self._scan_file_chunk(*task)
+
+    def _complete(self, node: '_DirNode'):
+        """Release one pending slot; finished folders hand their aggregates to the parent."""
+        while node is not None:
+            with self._lock:
+                node.pending -= 1
+                if node.pending:
+                    return
+
+                parent = node.parent
+                if node.folder is not None:
+                    self._folders.append(node.folder)
+                    self._update_stat('folders_scanned')
+                    if parent is not None:
+                        parent.folder.merge(node.folder)
+
+            # dir_stat is cleared when a shutdown cut the listing or any file chunk short,
+            # so only fully scanned directories are indexed
+            if node.dir_stat is not None:
+                self._index.record(node.path, node.dir_stat, node.subdirs, node.records)
+                node.records = []
+
+            if self.args.progress and time.time() - self._last_progress > self._progress_interval:
+                self._print_progress()
+                self._last_progress = time.time()
+
+            node = parent
 
     def _print_progress(self):
         """Print scanning progress."""
-        elapsed = time.time() - self.stats['start_time']
-        rate = self.stats['files_scanned'] / elapsed if elapsed > 0 else 0
-        print(f"\r  Scanned: {self.stats['files_scanned']:,} files, "
-              f"{self.stats['folders_scanned']:,} folders | "
+        stats = self.stats
+        elapsed = time.time() - stats['start_time']
+        rate = stats['files_scanned'] / elapsed if elapsed > 0 else 0
+        print(f"\r  Scanned: {stats['files_scanned']:,} files, "
+              f"{stats['folders_scanned']:,} folders | "
               f"{rate:,.0f} files/sec | "
-              f"Errors: {self.stats['errors']}",
+              f"Errors: {stats['errors']}",
               end='', file=sys.stderr, flush=True)
 
     def scan(self, paths: List[Path]) -> Tuple[List[FileEntry], List[FolderEntry]]:
         """Main entry point for scanning."""
-        all_files = []
-        all_folders = []
-
+        self._files = []
+        self._folders = []
+        workers = 1 if self.args.no_parallel else self.args.workers
+        self._pool = WorkStealingPool(workers)
+        if self.args.incremental:
+            self._index = ScanIndex(self.args.index_file, ScanIndex.fingerprint(self.args))
+
+        roots = []
         for path in paths:
             if not path.exists():
                 print(f"[Warning] Path does not exist: {path}", file=sys.stderr)
@@ -504,25 +932,277 @@ class ScanEngine:
             if path.is_file():
                 result = self._scan_file(path)
                 if result:
-                    all_files.append(result)
+                    self._emit([result])
             elif path.is_dir():
-                if self.args.recursive:
-                    files, folders = self._scan_directory_recursive(path)
-                else:
-                    files, folders = self._scan_directory_flat(path)
-                all_files.extend(files)
-                all_folders.extend(folders)
+                if self._exclude.excludes_tree(path):
+                    print(f"[Warning] Path is inside an excluded path, skipping: {path}", file=sys.stderr)
+                    continue
+                roots.append(path)
+
+        try:
+            if self.args.processes > 1 and self.args.recursive:
+                self._scan_processes(roots)
+            else:
+                for root in roots:
+                    self._pool.submit(_DirNode(root, 0, None))
+                self._pool.run(self._run_task)
+        finally:
+            if self._index is not None:
+                self._index.close()
+                self._index = None
 
         if self.args.progress:
             print(file=sys.stderr)
 
-        return all_files, all_folders
+        return self._files, self._folders
+
+    def scan_subtree(self, root: Path, depth: int) -> Tuple[List[FolderEntry], List[tuple]]:
+        """Scan one subtree whose root sits at `depth`; files go to the collector.
+
+        Returns the folders and the index updates for the caller to write.
+        """
+        self._folders = []
+        self._pool = WorkStealingPool(self.args.workers)
+        index_updates = []
+        if self.args.incremental:
+            self._index = ScanIndex(self.args.index_file, ScanIndex.fingerprint(self.args), defer_writes=True)
+        try:
+            self._pool.submit(_DirNode(root, depth, None))
+            self._pool.run(self._run_task)
+        finally:
+            if self._index is not None:
+                index_updates = self._index.deferred
+                self._index.close()
+                self._index = None
+        return self._folders, index_updates
+
+    def _scan_processes(self, roots: List[Path]):
+        """Process backend: shard each root's subdirectories across worker processes.
+
+        The roots' own files are scanned by the local thread pool while the
+        shards run; each shard comes back as a pickled FileStore plus its
+        folders, counters and index updates and is merged into this engine,
+        which writes each shard's updates to the index in one transaction.
+        """
+        processes = self.args.processes
+        child_args = copy.copy(self.args)
+        child_args.processes = 1
+        child_args.progress = False
+        child_args.workers = max(1, self.args.workers // processes)
+
+        shards = []
+        for root in roots:
+            node = _DirNode(root, 0, None)
+            listing = None
+            reused = False
+            if self._index is not None:
+                listing = self._listing_from_index(node)
+                reused = listing is not None
+            if listing is None:
+                listing = self._list_directory(node)
+            if listing is None:
+                continue
+
+            dirs, file_entries = listing
+            node.folder.folder_count = len(dirs)
+            if node.dir_stat is not None:
+                node.subdirs = [d.name for d in dirs]
+            descend = self.args.max_depth is None or self.args.max_depth > 0
+            chunks = [file_entries[i:i + CHUNK_SIZE] for i in range(0, len(file_entries), CHUNK_SIZE)]
+
+            node.pending = len(chunks) + (len(dirs) if descend else 0) + 1
+            for chunk in chunks:
+                self._pool.submit((node, chunk))
+            if descend:
+                shards.extend((node, d) for d in dirs)
+            # Release the listing's own slot
+            if reused:
+                self._reuse_records(node)
+            else:
+                self._complete(node)
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = {executor.submit(_scan_subtree_process, child_args, d, 1): (node, d) for node, d in shards}
+            self._pool.run(self._run_task)
+
+            for future in concurrent.futures.as_completed(futures):
+                node, shard_root = futures[future]
+                try:
+                    store, folders, stats, index_updates = future.result()
+                except Exception as e:
+                    print(f"  [Error] Worker process failed: {e}", file=sys.stderr)
+                    self._update_stat('errors')
+                    self._complete(node)
+                    continue
+
+                if index_updates:
+                    self._index.record_many(index_updates)
+                with self._lock:
+                    for key, value in stats.items():
+                        self._update_stat(key, value)
+                    if isinstance(self.collector, FileStore):
+                        self.collector.extend(store)
+                        if self.snapshot is not None:
+                            self.snapshot.add_files(store.entry(i) for i in range(len(store)))
+                    else:
+                        for i in range(0, len(store), CHUNK_SIZE):
+                            self._emit([store.entry(j) for j in range(i, min(i + CHUNK_SIZE, len(store)))])
+                    self._folders.extend(folders)
+                    shard_folder = next((f for f in reversed(folders) if f.path == shard_root), None)
+                    if shard_folder is not None:
+                        node.folder.merge(shard_folder)
+                self._complete(node)
+
+                if self.args.progress and time.time() - self._last_progress > self._progress_interval:
+                    self._print_progress()
+                    self._last_progress = time.time()
+
+
+def _scan_subtree_process(args, root: Path, depth: int):
+    """Process-backend worker: scan one subtree with a local threaded ScanEngine."""
+    store = FileStore()
+    engine = ScanEngine(args, store)
+    folders, index_updates = engine.scan_subtree(root, depth)
+    stats = {k: v for k, v in engine.stats.items() if k != 'start_time'}
+    return store, folders, stats, index_updates
+
+
+# ────────────────────────────────────────────────────────────────
+# Metrics Endpoint
+# ────────────────────────────────────────────────────────────────
+
+def render_metrics(engine: ScanEngine) -> str:
+    """Render an engine's live counters in Prometheus text exposition format."""
+    stats = engine.stats
+    elapsed = max(time.time() - stats['start_time'], 1e-9)
+    pool = engine._pool
+    lines = []
+
+    def metric(name: str, kind: str, help_text: str, samples):
+        lines.append(f"# HELP dsa_{name} {help_text}")
+        lines.append(f"# TYPE dsa_{name} {kind}")
+        for labels, value in samples:
+            lines.append(f"dsa_{name}{labels} {value}")
+
+    metric('files_scanned_total', 'counter', 'Files that passed all filters.', [('', stats['files_scanned'])])
+    metric('folders_scanned_total', 'counter', 'Folders fully scanned.', [('', stats['folders_scanned'])])
+    metric('errors_total', 'counter', 'Entries that could not be read.', [('', stats['errors'])])
+    metric('skipped_total', 'counter', 'Entries excluded or skipped.', [('', stats['skipped'])])
+    metric('files_per_second', 'gauge', 'Average files/sec since the scan started.',
+           [('', f"{stats['files_scanned'] / elapsed:.3f}")])
+    metric('folders_per_second', 'gauge', 'Average folders/sec since the scan started.',
+           [('', f"{stats['folders_scanned'] / elapsed:.3f}")])
+    metric('elapsed_seconds', 'gauge', 'Seconds since the scan started.', [('', f"{elapsed:.3f}")])
+    metric('queue_depth', 'gauge', 'Directory and file-chunk tasks waiting for a worker.',
+           [('', pool.queue_depth() if pool else 0)])
+
+    if pool is not None:
+        metric('worker_busy_seconds_total', 'counter', 'Seconds each worker spent running tasks.',
+               [(f'{{worker="{i}"}}', f"{busy:.6f}") for i, busy in enumerate(pool.busy_seconds)])
+        metric('worker_tasks_total', 'counter', 'Tasks completed by each worker.',
+               [(f'{{worker="{i}"}}', done) for i, done in enumerate(pool.tasks_done)])
+
+    buckets, total, count = engine.stat_latency()
+    samples = []
+    cumulative = 0
+    for bound, n in zip(STAT_LATENCY_BUCKETS + ['+Inf'], buckets):
+        cumulative += n
+        samples.append((f'_bucket{{le="{bound}"}}', cumulative))
+    samples.append(('_sum', f"{total:.6f}"))
+    samples.append(('_count', count))
+    metric('stat_latency_seconds', 'histogram', 'Per-file stat/readlink latency.', samples)
+
+    return "\n".join(lines) + "\n"
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class MetricsServer:
+    """Background HTTP server exposing /metrics for a running ScanEngine.
+
+    ADDR is PORT or HOST:PORT (TCP, host defaults to 127.0.0.1) or
+    unix:/path/to.sock.
+    """
+
+    def __init__(self, address: str, engine: ScanEngine):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = render_metrics(engine).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._socket_path = None
+        if address.startswith('unix:'):
+            self._socket_path = address[len('unix:'):]
+            if os.path.exists(self._socket_path):
+                os.unlink(self._socket_path)
+            self._server = _UnixHTTPServer(self._socket_path, Handler)
+        else:
+            host, _, port = address.rpartition(':')
+            self._server = ThreadingHTTPServer((host or '127.0.0.1', int(port)), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="dsa-metrics", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._socket_path and os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
 
 
 # ────────────────────────────────────────────────────────────────
 # Results Processing & Analysis
 # ────────────────────────────────────────────────────────────────
 
+SIZE_BUCKETS = [
+    '< 1 KB', '1 KB - 1 MB', '1 MB - 10 MB', '10 MB - 100 MB',
+    '100 MB - 1 GB', '1 GB - 10 GB', '> 10 GB',
+]
+SIZE_BUCKET_BOUNDS = [1024, 1024**2, 10 * 1024**2, 100 * 1024**2, 1024**3, 10 * 1024**3]
+
+AGE_BUCKETS = [
+    '< 1 day', '1-7 days', '1-4 weeks', '1-3 months',
+    '3-12 months', '1-2 years', '> 2 years',
+]
+AGE_BUCKET_BOUNDS = [1, 7, 30, 90, 365, 730]
+
+
+def size_bucket(s: int) -> str:
+    """Return the SIZE_BUCKETS label for a file size."""
+    return SIZE_BUCKETS[bisect_right(SIZE_BUCKET_BOUNDS, s)]
+
+
+def age_bucket(age_days: float) -> str:
+    """Return the AGE_BUCKETS label for a file age."""
+    return AGE_BUCKETS[bisect_right(AGE_BUCKET_BOUNDS, age_days)]
+
+
+def file_sort_key(sort_by: SortBy):
+    """Key function ordering FileEntry objects by the given criteria."""
+    if sort_by == SortBy.MODIFIED:
+        return lambda f: f.modified
+    elif sort_by == SortBy.CREATED:
+        return lambda f: f.created
+    elif sort_by == SortBy.NAME:
+        return lambda f: f.name.lower()
+    elif sort_by == SortBy.EXTENSION:
+        return lambda f: f.extension
+    return lambda f: f.size
+
+
 class ResultsAnalyzer:
     """Analyzes and formats scan results."""
 
@@ -533,24 +1213,14 @@ class ResultsAnalyzer:
         self.total_size = sum(f.size for f in files)
         self.total_files = len(files)
 
+    def iter_files(self):
+        """Files written by the CSV export."""
+        return self.files
+
     def get_top_files(self, n: int, sort_by: SortBy) -> List[FileEntry]:
         """Get top N files sorted by criteria."""
         reverse = not self.args.reverse
-
-        if sort_by == SortBy.SIZE:
-            key = lambda f: f.size
-        elif sort_by == SortBy.MODIFIED:
-            key = lambda f: f.modified
-        elif sort_by == SortBy.CREATED:
-            key = lambda f: f.created
-        elif sort_by == SortBy.NAME:
-            key = lambda f: f.name.lower()
-        elif sort_by == SortBy.EXTENSION:
-            key = lambda f: f.extension
-        else:
-            key = lambda f: f.size
-
-        return sorted(self.files, key=key, reverse=reverse)[:n]
+        return sorted(self.files, key=file_sort_key(sort_by), reverse=reverse)[:n]
 
     def get_top_folders(self, n: int, sort_by: SortBy) -> List[FolderEntry]:
         """Get top N folders sorted by criteria."""
@@ -585,63 +1255,508 @@ class ResultsAnalyzer:
 
     def get_size_distribution(self) -> Tuple[Dict[str, int], Dict[str, int]]:
         """Get file size distribution buckets (counts and total sizes)."""
-        bucket_keys = [
-            '< 1 KB', '1 KB - 1 MB', '1 MB - 10 MB', '10 MB - 100 MB',
-            '100 MB - 1 GB', '1 GB - 10 GB', '> 10 GB',
-        ]
-        buckets = {k: 0 for k in bucket_keys}
-        bucket_sizes = {k: 0 for k in bucket_keys}
+        buckets = {k: 0 for k in SIZE_BUCKETS}
+        bucket_sizes = {k: 0 for k in SIZE_BUCKETS}
 
         for f in self.files:
-            s = f.size
-            if s < 1024:
-                key = '< 1 KB'
-            elif s < 1024**2:
-                key = '1 KB - 1 MB'
-            elif s < 10 * 1024**2:
-                key = '1 MB - 10 MB'
-            elif s < 100 * 1024**2:
-                key = '10 MB - 100 MB'
-            elif s < 1024**3:
-                key = '100 MB - 1 GB'
-            elif s < 10 * 1024**3:
-                key = '1 GB - 10 GB'
-            else:
-                key = '> 10 GB'
+            key = size_bucket(f.size)
             buckets[key] += 1
-            bucket_sizes[key] += s
+            bucket_sizes[key] += f.size
 
         return buckets, bucket_sizes
 
     def get_age_distribution(self) -> Dict[str, int]:
         """Get file age distribution."""
         now = time.time()
-        bucket_keys = [
-            '< 1 day', '1-7 days', '1-4 weeks', '1-3 months',
-            '3-12 months', '1-2 years', '> 2 years',
-        ]
-        buckets = {k: 0 for k in bucket_keys}
+        buckets = {k: 0 for k in AGE_BUCKETS}
 
         for f in self.files:
-            age_days = (now - f.modified) / 86400
-            if age_days < 1:
-                buckets['< 1 day'] += 1
-            elif age_days < 7:
-                buckets['1-7 days'] += 1
-            elif age_days < 30:
-                buckets['1-4 weeks'] += 1
-            elif age_days < 90:
-                buckets['1-3 months'] += 1
-            elif age_days < 365:
-                buckets['3-12 months'] += 1
-            elif age_days < 730:
-                buckets['1-2 years'] += 1
-            else:
-                buckets['> 2 years'] += 1
+            buckets[age_bucket((now - f.modified) / 86400)] += 1
 
         return buckets
 
 
+class _Descending:
+    """Inverts ordering of a sort key so a min-heap keeps the smallest keys."""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+    def __gt__(self, other):
+        return self.value < other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+class TopN:
+    """Bounded min-heap holding the N best entries seen so far for one sort key."""
+
+    def __init__(self, n: int, key, largest: bool = True):
+        self.n = n
+        self.key = key
+        self.largest = largest
+        self._heap = []
+        self._seq = itertools.count()
+
+    def add(self, item):
+        k = self.key(item)
+        if not self.largest:
+            k = _Descending(k)
+        # Negated sequence ranks earlier arrivals ahead on ties, matching a stable sort
+        entry = (k, -next(self._seq), item)
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> list:
+        return [e[2] for e in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+
+class StreamingCollector:
+    """Incremental top-N heaps and histograms fed by ScanEngine as files are scanned.
+
+    Memory is O(N) per sort key plus one counter per extension, so a
+    streaming scan never holds the full file list.
+    """
+
+    FILE_SORT_KEYS = (SortBy.SIZE, SortBy.MODIFIED, SortBy.CREATED, SortBy.NAME, SortBy.EXTENSION)
+
+    def __init__(self, n: int, reverse: bool = False):
+        self.now = time.time()
+        self.total_size = 0
+        self.total_files = 0
+        self.top = {sort_by: TopN(n, file_sort_key(sort_by), largest=not reverse)
+                    for sort_by in self.FILE_SORT_KEYS}
+        self.ext_stats: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        self.size_buckets = {k: 0 for k in SIZE_BUCKETS}
+        self.size_bucket_bytes = {k: 0 for k in SIZE_BUCKETS}
+        self.age_buckets = {k: 0 for k in AGE_BUCKETS}
+
+    def add_many(self, entries: List[FileEntry]):
+        for f in entries:
+            self.total_size += f.size
+            self.total_files += 1
+            for heap in self.top.values():
+                heap.add(f)
+
+            ext = self.ext_stats[f.extension or '(no extension)']
+            ext[0] += 1
+            ext[1] += f.size
+
+            key = size_bucket(f.size)
+            self.size_buckets[key] += 1
+            self.size_bucket_bytes[key] += f.size
+            self.age_buckets[age_bucket((self.now - f.modified) / 86400)] += 1
+
+
+class StreamingAnalyzer(ResultsAnalyzer):
+    """ResultsAnalyzer view over a StreamingCollector instead of a full file list."""
+
+    def __init__(self, collector: StreamingCollector, folders: List[FolderEntry], args):
+        self.collector = collector
+        self.files = []
+        self.folders = folders
+        self.args = args
+        self.total_size = collector.total_size
+        self.total_files = collector.total_files
+
+    def iter_files(self):
+        return self.get_top_files(self.args.top, self.args.sort_files)
+
+    def get_top_files(self, n: int, sort_by: SortBy) -> List[FileEntry]:
+        heap = self.collector.top.get(sort_by, self.collector.top[SortBy.SIZE])
+        return heap.items()[:n]
+
+    def get_extension_summary(self) -> List[Tuple[str, int, int]]:
+        return sorted(
+            [(ext, count, size) for ext, (count, size) in self.collector.ext_stats.items()],
+            key=lambda x: x[2],
+            reverse=True
+        )
+
+    def get_size_distribution(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        return dict(self.collector.size_buckets), dict(self.collector.size_bucket_bytes)
+
+    def get_age_distribution(self) -> Dict[str, int]:
+        return dict(self.collector.age_buckets)
+
+
+class FileStore:
+    """Columnar, array-backed storage for scanned files.
+
+    Numeric metadata lives in typed arrays, directory prefixes and
+    extensions are interned into id columns, and names are packed into one
+    byte buffer addressed by offsets.  That is well under 100 bytes per file
+    against several hundred for a FileEntry; entries are materialised only
+    for the rows that get displayed or exported.
+    """
+
+    FLAG_SYMLINK = 1
+    FLAG_HARDLINK = 2
+
+    def __init__(self):
+        self.sizes = array('q')
+        self.modified = array('d')
+        self.created = array('d')
+        self.inodes = array('Q')
+        self.flags = array('B')
+        self.dir_ids = array('I')
+        self.ext_ids = array('I')
+        self.dirs: List[str] = []
+        self.exts: List[str] = []
+        self._dir_lookup: Dict[str, int] = {}
+        self._ext_lookup: Dict[str, int] = {}
+        self._names = bytearray()
+        self._name_offsets = array('Q', [0])
+        self._link_targets: Dict[int, Path] = {}
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    @property
+    def total_files(self) -> int:
+        return len(self.sizes)
+
+    @staticmethod
+    def _intern(value: str, table: List[str], lookup: Dict[str, int]) -> int:
+        idx = lookup.get(value)
+        if idx is None:
+            idx = lookup[value] = len(table)
+            table.append(value)
+        return idx
+
+    def add_many(self, entries: List[FileEntry]):
+        for f in entries:
+            row = len(self.sizes)
+            self.sizes.append(f.size)
+            self.modified.append(f.modified)
+            self.created.append(f.created)
+            self.inodes.append(f.inode or 0)
+            self.flags.append((self.FLAG_SYMLINK if f.is_symlink else 0)
+                              | (self.FLAG_HARDLINK if f.is_hardlink else 0))
+            self.dir_ids.append(self._intern(str(f.path.parent), self.dirs, self._dir_lookup))
+            self.ext_ids.append(self._intern(f.extension, self.exts, self._ext_lookup))
+            self._names += os.fsencode(f.path.name)
+            self._name_offsets.append(len(self._names))
+            if f.link_target is not None:
+                self._link_targets[row] = f.link_target
+
+    def extend(self, other: 'FileStore'):
+        """Append another store's rows column by column (process-backend merge)."""
+        dir_map = [self._intern(d, self.dirs, self._dir_lookup) for d in other.dirs]
+        ext_map = [self._intern(e, self.exts, self._ext_lookup) for e in other.exts]
+        base_row = len(self.sizes)
+        base_name = len(self._names)
+
+        self.sizes.extend(other.sizes)
+        self.modified.extend(other.modified)
+        self.created.extend(other.created)
+        self.inodes.extend(other.inodes)
+        self.flags.extend(other.flags)
+        self.dir_ids.extend(dir_map[i] for i in other.dir_ids)
+        self.ext_ids.extend(ext_map[i] for i in other.ext_ids)
+        self._names += other._names
+        self._name_offsets.extend(base_name + off for off in other._name_offsets[1:])
+        for row, target in other._link_targets.items():
+            self._link_targets[base_row + row] = target
+
+    def name(self, i: int) -> str:
+        return os.fsdecode(bytes(self._names[self._name_offsets[i]:self._name_offsets[i + 1]]))
+
+    def extension(self, i: int) -> str:
+        return self.exts[self.ext_ids[i]]
+
+    def entry(self, i: int) -> FileEntry:
+        """Materialise row i as a FileEntry for display/export."""
+        flags = self.flags[i]
+        return FileEntry(
+            path=Path(self.dirs[self.dir_ids[i]]) / self.name(i),
+            size=self.sizes[i],
+            modified=self.modified[i],
+            created=self.created[i],
+            is_symlink=bool(flags & self.FLAG_SYMLINK),
+            is_hardlink=bool(flags & self.FLAG_HARDLINK),
+            link_target=self._link_targets.get(i),
+            inode=self.inodes[i],
+        )
+
+
+class ColumnarAnalyzer(ResultsAnalyzer):
+    """ResultsAnalyzer over a FileStore; sorts and histograms run on whole columns.
+
+    Uses NumPy views of the arrays when it is installed, plain loops over
+    the arrays otherwise.
+    """
+
+    def __init__(self, store: FileStore, folders: List[FolderEntry], args):
+        self.store = store
+        self.files = []
+        self.folders = folders
+        self.args = args
+        self.total_size = int(np.frombuffer(store.sizes, dtype=np.int64).sum()) if np and len(store) else sum(store.sizes)
+        self.total_files = len(store)
+
+    def iter_files(self):
+        return (self.store.entry(i) for i in range(len(self.store)))
+
+    def _column(self, sort_by: SortBy):
+        if sort_by == SortBy.MODIFIED:
+            return self.store.modified
+        elif sort_by == SortBy.CREATED:
+            return self.store.created
+        elif sort_by in (SortBy.NAME, SortBy.EXTENSION):
+            return None
+        return self.store.sizes
+
+    def get_top_files(self, n: int, sort_by: SortBy) -> List[FileEntry]:
+        store = self.store
+        descending = not self.args.reverse
+        column = self._column(sort_by)
+
+        if column is not None and np is not None and len(store):
+            values = np.frombuffer(column, dtype=np.int64 if column.typecode == 'q' else np.float64)
+            # Stable sort on the (negated) column keeps ties in scan order like sorted()
+            order = np.argsort(-values if descending else values, kind='stable')[:n]
+            rows = order.tolist()
+        else:
+            if column is not None:
+                key = column.__getitem__
+            elif sort_by == SortBy.NAME:
+                key = lambda i: store.name(i).lower()
+            else:
+                key = store.extension
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            rows = pick(n, range(len(store)), key=key)
+
+        return [store.entry(i) for i in rows]
+
+    def get_extension_summary(self) -> List[Tuple[str, int, int]]:
+        store = self.store
+        if np is not None and len(store):
+            ids = np.frombuffer(store.ext_ids, dtype=np.uint32)
+            counts = np.bincount(ids, minlength=len(store.exts))
+            # float64 weights are exact below 2**53 bytes (8 PiB) per extension
+            sizes = np.bincount(ids, weights=np.frombuffer(store.sizes, dtype=np.int64),
+                                minlength=len(store.exts))
+            totals = [(int(counts[i]), int(sizes[i])) for i in range(len(store.exts))]
+        else:
+            totals = [[0, 0] for _ in store.exts]
+            for ext_id, size in zip(store.ext_ids, store.sizes):
+                totals[ext_id][0] += 1
+                totals[ext_id][1] += size
+
+        return sorted(
+            [(ext or '(no extension)', count, size) for ext, (count, size) in zip(store.exts, totals)],
+            key=lambda x: x[2],
+            reverse=True
+        )
+
+    def get_size_distribution(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        store = self.store
+        if np is None or not len(store):
+            buckets = {k: 0 for k in SIZE_BUCKETS}
+            bucket_sizes = {k: 0 for k in SIZE_BUCKETS}
+            for s in store.sizes:
+                key = size_bucket(s)
+                buckets[key] += 1
+                bucket_sizes[key] += s
+            return buckets, bucket_sizes
+
+        sizes = np.frombuffer(store.sizes, dtype=np.int64)
+        idx = np.searchsorted(SIZE_BUCKET_BOUNDS, sizes, side='right')
+        counts = np.bincount(idx, minlength=len(SIZE_BUCKETS))
+        totals = np.bincount(idx, weights=sizes, minlength=len(SIZE_BUCKETS))
+        return ({k: int(counts[i]) for i, k in enumerate(SIZE_BUCKETS)},
+                {k: int(totals[i]) for i, k in enumerate(SIZE_BUCKETS)})
+
+    def get_age_distribution(self) -> Dict[str, int]:
+        store = self.store
+        now = time.time()
+        if np is None or not len(store):
+            buckets = {k: 0 for k in AGE_BUCKETS}
+            for m in store.modified:
+                buckets[age_bucket((now - m) / 86400)] += 1
+            return buckets
+
+        ages = (now - np.frombuffer(store.modified, dtype=np.float64)) / 86400
+        counts = np.bincount(np.searchsorted(AGE_BUCKET_BOUNDS, ages, side='right'), minlength=len(AGE_BUCKETS))
+        return {k: int(counts[i]) for i, k in enumerate(AGE_BUCKETS)}
+
+
+# ────────────────────────────────────────────────────────────────
+# Snapshots & Diffing
+# ────────────────────────────────────────────────────────────────
+
+SNAPSHOT_MAGIC = b'DSASNAP\x01'
+SNAPSHOT_KIND_FILE = 0
+SNAPSHOT_KIND_FOLDER = 1
+# kind, bytes shared with the previous path, suffix length, size, mtime, file count
+_SNAPSHOT_RECORD = struct.Struct('<BIIqdq')
+SNAPSHOT_RUN_SIZE = 500_000
+
+
+def _write_snapshot_records(fh, records):
+    """Write (path, kind, size, mtime, count) records, front-coding sorted paths."""
+    fh.write(SNAPSHOT_MAGIC)
+    prev = b''
+    pack = _SNAPSHOT_RECORD.pack
+    for key, kind, size, mtime, count in records:
+        shared = len(os.path.commonprefix((prev, key)))
+        suffix = key[shared:]
+        fh.write(pack(kind, shared, len(suffix), size, mtime, count))
+        fh.write(suffix)
+        prev = key
+
+
+def iter_snapshot(path) -> Iterator[Tuple[bytes, int, int, float, int]]:
+    """Stream (path, kind, size, mtime, count) records from a snapshot file."""
+    with open(path, 'rb') as fh:
+        if fh.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a DSA snapshot")
+        header_size = _SNAPSHOT_RECORD.size
+        unpack = _SNAPSHOT_RECORD.unpack
+        prev = b''
+        while True:
+            header = fh.read(header_size)
+            if len(header) < header_size:
+                return
+            kind, shared, suffix_len, size, mtime, count = unpack(header)
+            key = prev[:shared] + fh.read(suffix_len)
+            yield key, kind, size, mtime, count
+            prev = key
+
+
+class SnapshotWriter:
+    """Builds a path-sorted snapshot with an external merge sort.
+
+    Records are buffered and spilled as sorted runs every SNAPSHOT_RUN_SIZE
+    entries; close() k-way merges the runs into the final file, so memory
+    stays bounded however many files the scan finds.
+    """
+
+    def __init__(self, path: Path, run_size: int = SNAPSHOT_RUN_SIZE):
+        self.path = path
+        self.run_size = run_size
+        self._buffer = []
+        self._runs: List[str] = []
+        self._tmpdir = tempfile.mkdtemp(prefix="dsa-snap-", dir=str(path.parent) if path.parent.exists() else None)
+
+    def _add(self, record):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self):
+        self._buffer.sort()
+        run = os.path.join(self._tmpdir, f"run{len(self._runs):05d}")
+        with open(run, 'wb') as fh:
+            _write_snapshot_records(fh, self._buffer)
+        self._runs.append(run)
+        self._buffer = []
+
+    def add_files(self, entries):
+        for f in entries:
+            self._add((os.fsencode(str(f.path)), SNAPSHOT_KIND_FILE, f.size, f.modified, 1))
+
+    def add_folders(self, folders: List[FolderEntry]):
+        for f in folders:
+            self._add((os.fsencode(str(f.path)), SNAPSHOT_KIND_FOLDER, f.total_size,
+                       f.newest_file or 0.0, f.file_count))
+
+    def close(self):
+        try:
+            self._buffer.sort()
+            streams = [iter_snapshot(run) for run in self._runs] + [iter(self._buffer)]
+            with open(self.path, 'wb') as fh:
+                _write_snapshot_records(fh, heapq.merge(*streams))
+        finally:
+            self.discard()
+
+    def discard(self):
+        """Drop buffered records and spilled runs; safe to call after close()."""
+        self._buffer = []
+        self._runs = []
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+
+@dataclass
+class SnapshotDiff:
+    """Largest changes between two snapshots."""
+    folders_grown: List[Tuple[str, int, int]] = field(default_factory=list)
+    folders_shrunk: List[Tuple[str, int, int]] = field(default_factory=list)
+    extensions: List[Tuple[str, int, int]] = field(default_factory=list)
+    new_files: List[Tuple[str, int]] = field(default_factory=list)
+    deleted_files: List[Tuple[str, int]] = field(default_factory=list)
+
+
+def _snapshot_extension(key: bytes) -> str:
+    ext = os.path.splitext(key)[1].lower()
+    return os.fsdecode(ext) if len(ext) > 1 else ''
+
+
+def diff_snapshots(old_path, new_path, n: int) -> SnapshotDiff:
+    """Merge-join two path-sorted snapshots in one linear pass.
+
+    Only top-N heaps and per-extension totals are held in memory.
+    """
+    grown = TopN(n, key=lambda r: r[2] - r[1])
+    shrunk = TopN(n, key=lambda r: r[2] - r[1], largest=False)
+    added = TopN(n, key=lambda r: r[1])
+    deleted = TopN(n, key=lambda r: r[1])
+    ext_totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+
+    def change(key: bytes, kind: int, old_size: int, new_size: int):
+        if kind == SNAPSHOT_KIND_FOLDER:
+            record = (os.fsdecode(key), old_size, new_size)
+            if new_size > old_size:
+                grown.add(record)
+            elif new_size < old_size:
+                shrunk.add(record)
+            return
+        totals = ext_totals[_snapshot_extension(key) or '(no extension)']
+        totals[0] += old_size
+        totals[1] += new_size
+
+    old_iter = iter_snapshot(old_path)
+    new_iter = iter_snapshot(new_path)
+    old = next(old_iter, None)
+    new = next(new_iter, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[:2] < new[:2]):
+            change(old[0], old[1], old[2], 0)
+            if old[1] == SNAPSHOT_KIND_FILE:
+                deleted.add((os.fsdecode(old[0]), old[2]))
+            old = next(old_iter, None)
+        elif old is None or new[:2] < old[:2]:
+            change(new[0], new[1], 0, new[2])
+            if new[1] == SNAPSHOT_KIND_FILE:
+                added.add((os.fsdecode(new[0]), new[2]))
+            new = next(new_iter, None)
+        else:
+            change(new[0], new[1], old[2], new[2])
+            old = next(old_iter, None)
+            new = next(new_iter, None)
+
+    extensions = sorted(
+        [(ext, old_size, new_size) for ext, (old_size, new_size) in ext_totals.items() if old_size != new_size],
+        key=lambda x: abs(x[2] - x[1]),
+        reverse=True,
+    )[:n]
+    return SnapshotDiff(
+        folders_grown=grown.items(),
+        folders_shrunk=shrunk.items(),
+        extensions=extensions,
+        new_files=added.items(),
+        deleted_files=deleted.items(),
+    )
+
+
 # ────────────────────────────────────────────────────────────────
 # Output Formatting
 # ────────────────────────────────────────────────────────────────
@@ -780,6 +1895,14 @@ class OutputFormatter:
             lines.append(f"  Symlinks Followed: {stats['symlinks_followed']:,}")
         if stats['hardlinks_detected'] > 0:
             lines.append(f"  Hardlinks Deduped: {stats['hardlinks_detected']:,}")
+        if self.args.stat_profile:
+            calls = stats['sys_scandir'] + stats['sys_lstat'] + stats['sys_stat'] + stats['sys_readlink']
+            per_file = calls / stats['files_scanned'] if stats['files_scanned'] else 0
+            lines.append(f"  Syscalls:          {calls:,} ({per_file:.2f}/file) - "
+                         f"scandir {stats['sys_scandir']:,}, lstat {stats['sys_lstat']:,}, "
+                         f"stat {stats['sys_stat']:,}, readlink {stats['sys_readlink']:,}")
+        if stats['folders_reused'] > 0:
+            lines.append(f"  Folders Reused:    {stats['folders_reused']:,} (unchanged since last index)")
 
         for line in lines:
             print(line)
@@ -848,6 +1971,45 @@ class OutputFormatter:
             pct = (count / analyzer.total_files * 100) if analyzer.total_files > 0 else 0
             print(f"  {bucket:>15} │ {count:>6,} ({pct:>5.1f}%) │ {self._color(bar, Colors.BLUE)}")
 
+    def _delta(self, old_size: int, new_size: int) -> str:
+        delta = new_size - old_size
+        sign = '+' if delta >= 0 else '-'
+        return f"{sign}{format_size(abs(delta), self.args.unit)}"
+
+    def print_snapshot_diff(self, diff: SnapshotDiff, snapshot: str):
+        """Print the largest changes since a previous snapshot."""
+        self.print_header(f"Changes Since {snapshot}")
+
+        sections = [
+            ("Folders That Grew Most", diff.folders_grown, Colors.RED),
+            ("Folders That Shrank Most", diff.folders_shrunk, Colors.GREEN),
+        ]
+        for title, rows, color in sections:
+            if not rows:
+                continue
+            print(self._color(f"\n  {title}", Colors.BOLD))
+            for path, old_size, new_size in rows:
+                if len(path) > 50:
+                    path = "..." + path[-47:]
+                delta = self._color(f"{self._delta(old_size, new_size):>12}", color)
+                print(f"  {delta} │ {format_size(new_size, self.args.unit):>10} │ {path}")
+
+        if diff.extensions:
+            print(self._color("\n  Extension Changes", Colors.BOLD))
+            for ext, old_size, new_size in diff.extensions:
+                color = Colors.RED if new_size > old_size else Colors.GREEN
+                delta = self._color(f"{self._delta(old_size, new_size):>12}", color)
+                print(f"  {delta} │ {format_size(new_size, self.args.unit):>10} │ {ext}")
+
+        for title, rows in (("New Large Files", diff.new_files), ("Deleted Large Files", diff.deleted_files)):
+            if not rows:
+                continue
+            print(self._color(f"\n  {title}", Colors.BOLD))
+            for path, size in rows:
+                if len(path) > 60:
+                    path = "..." + path[-57:]
+                print(f"  {format_size(size, self.args.unit):>12} │ {path}")
+
     def export_json(self, analyzer: ResultsAnalyzer, filepath: str):
         """Export results to JSON."""
         data = {
@@ -905,7 +2067,7 @@ class OutputFormatter:
             writer = csv.writer(f)
             writer.writerow(['Type', 'Path', 'Size (bytes)', 'Size (human)', 'Files', 'Modified'])
 
-            for file_entry in analyzer.files:
+            for file_entry in analyzer.iter_files():
                 writer.writerow([
                     'file',
                     str(file_entry.path),
@@ -986,6 +2148,12 @@ Examples:
   %(prog)s --max-age 30 /backups            Files modified within 30 days
   %(prog)s --dedup-hardlinks /photos        Count hardlinked files once
   %(prog)s --show-distribution --show-age-distribution ~/Downloads
+  %(prog)s --streaming -n 100 /srv/nas     Bounded-memory top 100 on huge trees
+  %(prog)s --metrics 9180 /srv/nas          Prometheus metrics at http://127.0.0.1:9180/metrics
+  %(prog)s --snapshot today.snap --diff-against yesterday.snap /srv/nas
+  %(prog)s --incremental /srv/nas           Rescan only directories changed since last run
+  %(prog)s -P 16 -w 64 /srv/nas            16 processes x 4 threads each
+  %(prog)s --benchmark --workers 16         Compare thread/process backends by files/sec
 """,
     )
 
@@ -1020,6 +2188,30 @@ Examples:
         '--no-parallel', action='store_true',
         help='Disable parallel scanning (single-threaded)',
     )
+    scan_group.add_argument(
+        '-P', '--processes', type=int, default=1, metavar='N',
+        help='Shard top-level subdirectories across N worker processes, '
+             'each with --workers/N threads (default: 1, threads only)',
+    )
+    scan_group.add_argument(
+        '--streaming', action='store_true',
+        help='Keep only the top-N files and running histograms in memory '
+             '(bounded memory on huge trees; --csv then lists only the top files)',
+    )
+    scan_group.add_argument(
+        '--compact', action='store_true',
+        help='Store results in compact columnar arrays (much less memory; '
+             'vectorised with NumPy when installed)',
+    )
+    scan_group.add_argument(
+        '--incremental', action='store_true',
+        help='Reuse cached metadata for directories whose mtime is unchanged '
+             '(in-place file rewrites are seen once their directory changes)',
+    )
+    scan_group.add_argument(
+        '--index-file', type=Path, default=DEFAULT_INDEX_FILE, metavar='FILE',
+        help=f'Index database for --incremental (default: {DEFAULT_INDEX_FILE})',
+    )
 
     # Filter options
     filter_group = parser.add_argument_group('Filter Options')
@@ -1125,6 +2317,15 @@ Examples:
         '--csv', dest='csv_output', metavar='FILE',
         help='Export results to CSV file',
     )
+    output_group.add_argument(
+        '--snapshot', metavar='FILE', type=Path, default=None,
+        help='Write a compact path-sorted binary snapshot of this scan',
+    )
+    output_group.add_argument(
+        '--diff-against', metavar='SNAPSHOT', type=Path, default=None,
+        help='Report folders/extensions that grew or shrank most and new/deleted '
+             'large files since SNAPSHOT',
+    )
     output_group.add_argument(
         '-q', '--quiet', action='store_true',
         help='Suppress console output (use with --json/--csv)',
@@ -1137,6 +2338,15 @@ Examples:
         '--no-progress', dest='progress', action='store_false',
         help='Disable progress display',
     )
+    output_group.add_argument(
+        '--metrics', metavar='ADDR', default=None,
+        help='Serve live Prometheus metrics during the scan at PORT, HOST:PORT '
+             'or unix:/path.sock (process-backend shards report as they finish)',
+    )
+    output_group.add_argument(
+        '--stat-profile', action='store_true',
+        help='Count scandir/lstat/stat/readlink calls and report syscalls per file',
+    )
     output_group.add_argument(
         '-v', '--verbose', action='store_true',
         help='Verbose error messages',
@@ -1145,11 +2355,31 @@ Examples:
         '--version', action='version', version=f'%(prog)s {VERSION}',
     )
 
+    # Benchmark options
+    bench_group = parser.add_argument_group('Benchmark Options')
+    bench_group.add_argument(
+        '--benchmark', action='store_true',
+        help='Scan a synthetic tree with 1..--workers threads and report files/sec',
+    )
+    bench_group.add_argument(
+        '--benchmark-files', type=int, default=50000, metavar='N',
+        help='Files in the synthetic benchmark tree (default: 50000)',
+    )
+    bench_group.add_argument(
+        '--benchmark-depth', type=int, default=None, metavar='N',
+        help='Build an N-level-deep benchmark tree to measure folder rollup cost (e.g., 10)',
+    )
+
     args = parser.parse_args()
 
     # Normalize paths
     args.paths = [Path(p).expanduser().resolve() for p in args.paths]
     args.exclude_path = [Path(p).expanduser().resolve() for p in args.exclude_path]
+    args.index_file = args.index_file.expanduser()
+    if args.snapshot is not None:
+        args.snapshot = args.snapshot.expanduser()
+    if args.diff_against is not None:
+        args.diff_against = args.diff_against.expanduser()
 
     # Normalize extensions (lowercase, no leading dot)
     if args.extensions:
@@ -1164,6 +2394,12 @@ Examples:
     # Validate worker count
     if args.workers < 1:
         parser.error("--workers must be >= 1")
+    if args.processes < 1:
+        parser.error("--processes must be >= 1")
+    if args.processes > 1 and args.deduplicate_hardlinks:
+        parser.error("--dedup-hardlinks needs one shared inode set; it cannot be combined with --processes")
+    if args.no_parallel:
+        args.processes = 1
 
     # Quiet implies no progress
     if args.quiet:
@@ -1172,6 +2408,120 @@ Examples:
     return args
 
 
+# ────────────────────────────────────────────────────────────────
+# Benchmark
+# ────────────────────────────────────────────────────────────────
+
+def build_synthetic_tree(root: Path, file_count: int, fanout: int = 8, files_per_dir: int = 64,
+                         depth: Optional[int] = None) -> int:
+    """Create a tree of small files under root; returns files written.
+
+    By default the tree is balanced with `fanout` children per folder.  With
+    `depth`, a binary tree exactly that many levels deep is built instead and
+    the files are spread evenly over all of its folders.
+    """
+    if depth is not None:
+        dirs = [root]
+        level = [root]
+        for _ in range(depth):
+            level = [d / f"d{i}" for d in level for i in range(2)]
+            dirs.extend(level)
+        for d in dirs:
+            d.mkdir(exist_ok=True)
+        for n in range(file_count):
+            with open(dirs[n % len(dirs)] / f"f{n:07d}.dat", 'wb') as fh:
+                fh.write(b'\0' * (n % 4096))
+        return file_count
+
+    written = 0
+    level = [root]
+    while written < file_count:
+        next_level = []
+        for d in level:
+            for i in range(min(files_per_dir, file_count - written)):
+                with open(d / f"f{i:04d}.dat", 'wb') as fh:
+                    fh.write(b'\0' * (written % 4096))
+                written += 1
+            for i in range(fanout):
+                sub = d / f"d{i:02d}"
+                sub.mkdir()
+                next_level.append(sub)
+            if written >= file_count:
+                break
+        level = next_level
+    return written
+
+
+def _benchmark_worker_counts(max_workers: int) -> List[int]:
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def _benchmark_run(args, root: Path, workers: int, processes: int) -> Tuple[int, float]:
+    """Time one scan of root; returns (files, seconds)."""
+    bench_args = copy.copy(args)
+    bench_args.workers = workers
+    bench_args.processes = processes
+    bench_args.no_parallel = False
+    bench_args.progress = False
+    bench_args.incremental = False
+    bench_args.deduplicate_hardlinks = False
+    bench_args.paths = [root]
+
+    engine = ScanEngine(bench_args)
+    start = time.perf_counter()
+    files, folders = engine.scan([root])
+    elapsed = time.perf_counter() - start
+
+    root_folder = next((f for f in folders if f.path == root), None)
+    if root_folder is None or root_folder.file_count != len(files):
+        print(f"  [!] Folder rollup mismatch with {workers} workers / {processes} processes", file=sys.stderr)
+    return len(files), elapsed
+
+
+def run_benchmark(args) -> int:
+    """Scan a synthetic tree with the thread and process backends and report files/sec.
+
+    Thread rows use 1, 2, 4, ... --workers threads in one process.  Process
+    rows use 2, 4, ... --processes (default: --workers) processes sharing
+    the same total thread budget.
+    """
+    tmp_root = Path(tempfile.mkdtemp(prefix="dsa-bench-"))
+    try:
+        shape = f"{args.benchmark_depth} levels deep" if args.benchmark_depth else "balanced"
+        print(f"  Building synthetic tree ({shape}): {args.benchmark_files:,} files in {tmp_root}")
+        total = build_synthetic_tree(tmp_root, args.benchmark_files, depth=args.benchmark_depth)
+
+        runs = [('threads', n, 1) for n in _benchmark_worker_counts(args.workers)]
+        max_processes = args.processes if args.processes > 1 else args.workers
+        runs += [('processes', args.workers, n) for n in _benchmark_worker_counts(max_processes)[1:]]
+
+        print()
+        print(f"  {'Backend':>9} │ {'N':>4} │ {'Time':>8} │ {'Files/sec':>12} │ {'Speedup':>7}")
+        print(f"  {'─' * 53}")
+
+        baseline = None
+        for backend, workers, processes in runs:
+            if _shutdown_requested.is_set():
+                break
+            count, elapsed = _benchmark_run(args, tmp_root, workers, processes)
+            rate = count / elapsed if elapsed > 0 else 0
+            baseline = baseline or rate
+            speedup = rate / baseline if baseline else 0
+            n = workers if backend == 'threads' else processes
+            print(f"  {backend:>9} │ {n:>4} │ {elapsed:>7.2f}s │ {rate:>12,.0f} │ {speedup:>6.2f}x")
+
+        print(f"\n  Scanned {total:,} files per run.")
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+    return 0
+
+
 # ────────────────────────────────────────────────────────────────
 # Main
 # ────────────────────────────────────────────────────────────────
@@ -1188,11 +2538,17 @@ def _print_banner(args, formatter: OutputFormatter):
     print()
     print(f"  Scanning:  {', '.join(str(p) for p in args.paths)}")
     print(f"  Workers:   {args.workers}{' (parallel disabled)' if args.no_parallel else ''}")
+    if args.processes > 1:
+        print(f"  Processes: {args.processes} ({max(1, args.workers // args.processes)} threads each)")
     if args.recursive:
         depth_str = f" (max depth: {args.max_depth})" if args.max_depth is not None else ""
         print(f"  Mode:      Recursive{depth_str}")
     else:
         print("  Mode:      Top-level only")
+    if args.incremental:
+        print(f"  Index:     {args.index_file}")
+    if args.metrics:
+        print(f"  Metrics:   {args.metrics}")
 
     filters = []
     if args.min_size is not None:
@@ -1216,6 +2572,9 @@ def main() -> int:
     args = parse_args()
     formatter = OutputFormatter(args)
 
+    if args.benchmark:
+        return run_benchmark(args)
+
     if not args.quiet:
         _print_banner(args, formatter)
 
@@ -1226,15 +2585,56 @@ def main() -> int:
         return 1
 
     # Run scan
-    engine = ScanEngine(args)
-    files, folders = engine.scan(args.paths)
+    if args.streaming:
+        collector = StreamingCollector(args.top, args.reverse)
+    elif args.compact:
+        collector = FileStore()
+    else:
+        collector = None
+    snapshot_path = args.snapshot
+    if args.diff_against is not None and snapshot_path is None:
+        fd, tmp_name = tempfile.mkstemp(prefix="dsa-", suffix=".snap")
+        os.close(fd)
+        snapshot_path = Path(tmp_name)
+    snapshot = SnapshotWriter(snapshot_path) if snapshot_path is not None else None
+    try:
+        return _scan_and_report(args, formatter, collector, snapshot, snapshot_path)
+    finally:
+        # Remove spilled runs and the temporary diff snapshot on every exit path
+        if snapshot is not None:
+            snapshot.discard()
+            if args.snapshot is None:
+                snapshot_path.unlink(missing_ok=True)
+
+
+def _scan_and_report(args, formatter, collector, snapshot: Optional[SnapshotWriter], snapshot_path) -> int:
+    engine = ScanEngine(args, collector, snapshot)
+    metrics_server = None
+    if args.metrics:
+        try:
+            metrics_server = MetricsServer(args.metrics, engine)
+        except (OSError, ValueError) as e:
+            print(f"[!] Cannot start metrics endpoint on {args.metrics}: {e}", file=sys.stderr)
+            return 1
+        metrics_server.start()
 
-    if not files and not folders:
+    try:
+        files, folders = engine.scan(args.paths)
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
+
+    if not files and not folders and not (collector and collector.total_files):
         print("\n[!] No files matched the criteria.", file=sys.stderr)
         return 1
 
     # Analyze
-    analyzer = ResultsAnalyzer(files, folders, args)
+    if args.streaming:
+        analyzer = StreamingAnalyzer(collector, folders, args)
+    elif args.compact:
+        analyzer = ColumnarAnalyzer(collector, folders, args)
+    else:
+        analyzer = ResultsAnalyzer(files, folders, args)
 
     if not args.quiet:
         if args.target in ('files', 'both'):
@@ -1257,6 +2657,22 @@ def main() -> int:
         formatter.print_summary(analyzer, engine.stats)
         print()
 
+    # Snapshot & diff
+    if snapshot is not None:
+        snapshot.add_folders(folders)
+        snapshot.close()
+        if args.snapshot is not None:
+            print(f"[✓] Wrote snapshot to: {args.snapshot}")
+        if args.diff_against is not None:
+            try:
+                diff = diff_snapshots(args.diff_against, snapshot_path, args.top)
+            except (OSError, ValueError) as e:
+                print(f"[!] Cannot diff against {args.diff_against}: {e}", file=sys.stderr)
+                diff = None
+            if diff is not None and not args.quiet:
+                formatter.print_snapshot_diff(diff, str(args.diff_against))
+                print()
+
     # Exports
     if args.json_output:
         formatter.export_json(analyzer, args.json_output)
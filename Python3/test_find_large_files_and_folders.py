@@ -0,0 +1,97 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import find_large_files_and_folders as dsa  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clear_shutdown():
+    dsa._shutdown_requested.clear()
+    yield
+    dsa._shutdown_requested.clear()
+
+
+def make_args(monkeypatch, root, index_file):
+    monkeypatch.setattr(sys, 'argv', ['dsa', '--incremental', '--index-file', str(index_file),
+                                      '--no-parallel', str(root)])
+    return dsa.parse_args()
+
+
+def scanned_file_count(args):
+    files, _folders = dsa.ScanEngine(args).scan(args.paths)
+    return len(files)
+
+
+def test_interrupted_scan_does_not_index_partial_directories(tmp_path, monkeypatch):
+    root = tmp_path / 'tree'
+    for name in ('a', 'b'):
+        (root / name).mkdir(parents=True)
+        for i in range(50):
+            (root / name / f'{i}.bin').write_bytes(b'x' * i)
+    args = make_args(monkeypatch, root, tmp_path / 'index.sqlite3')
+
+    engine = dsa.ScanEngine(args)
+    stat_file = engine._stat_file
+    calls = []
+
+    def interrupting_stat_file(path, entry=None):
+        calls.append(path)
+        if len(calls) == 10:
+            dsa._shutdown_requested.set()
+        return stat_file(path, entry)
+
+    engine._stat_file = interrupting_stat_file
+    engine.scan(args.paths)
+    assert dsa._shutdown_requested.is_set()
+
+    dsa._shutdown_requested.clear()
+    assert scanned_file_count(args) == 100
+    # The complete run indexed everything, and the index reproduces it
+    assert scanned_file_count(args) == 100
+
+
+def test_empty_scan_leaves_no_snapshot_temp_files(tmp_path, monkeypatch):
+    root = tmp_path / 'tree'
+    root.mkdir()
+    temp = tmp_path / 'tmp'
+    temp.mkdir()
+    old = tmp_path / 'old.snap'
+    with open(old, 'wb') as fh:
+        dsa._write_snapshot_records(fh, [])
+    monkeypatch.setattr(dsa.tempfile, 'tempdir', str(temp))
+    monkeypatch.setattr(dsa.ScanEngine, 'scan', lambda self, paths: ([], []))
+    monkeypatch.setattr(sys, 'argv', ['dsa', '--quiet', '--no-parallel', '--diff-against', str(old), str(root)])
+
+    assert dsa.main() == 1
+    assert not list(temp.iterdir())
+
+
+def test_process_backend_indexes_root_and_shards(tmp_path, monkeypatch):
+    root = tmp_path / 'tree'
+    for name in ('a', 'b', 'c/d'):
+        (root / name).mkdir(parents=True)
+        for i in range(5):
+            (root / name / f'{i}.bin').write_bytes(b'x' * i)
+    (root / 'top.bin').write_bytes(b'top')
+    monkeypatch.setattr(sys, 'argv', ['dsa', '--incremental', '--index-file', str(tmp_path / 'index.sqlite3'),
+                                      '-P', '2', '-w', '2', str(root)])
+    args = dsa.parse_args()
+
+    def scan():
+        engine = dsa.ScanEngine(args)
+        files, folders = engine.scan(args.paths)
+        return sorted(str(f.path) for f in files), len(folders), engine.stats['folders_reused']
+
+    first_files, folder_count, reused = scan()
+    assert len(first_files) == 16 and reused == 0
+
+    # Every directory, the root included, was written to the index by the parent
+    assert scan() == (first_files, folder_count, folder_count)
+
+    (root / 'c' / 'd' / 'new.bin').write_bytes(b'new')
+    files, _folders, reused = scan()
+    assert len(files) == 17 and reused == folder_count - 1